@@ -1,5 +1,6 @@
 # backend/app.py
 import io
+import atexit
 import traceback
 from pathlib import Path
 import os
@@ -15,16 +16,14 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / ".env")
 
 import threading
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import torch
 import torchaudio
 import numpy as np
-from sklearn.neighbors import NearestNeighbors
-from sklearn.metrics.pairwise import cosine_distances
 from pydantic import ValidationError
 
-from param_graph.graph import ParameterGraph
+from param_graph.graph import ParameterGraph, HEAVY_FIELDS
 from param_graph.elements.models.base_model_element import Model
 from param_graph.elements.models.stylegan_element import StyleGANModel
 from param_graph.elements.artifacts.audio_element import Audio
@@ -37,13 +36,14 @@ from param_graph.elements.collections.directory_element import Directory
 from param_graph.elements.local_path import LocalPath
 from param_graph.utils import save_artifact_asset, resolve_element
 from engine.engine_provider import EngineProvider
-from engine.encoders.clap_encoder import CLAPEncoder
-from engine.encoders.clip_encoder import CLIPEncoder
+from engine.encoders.registry import encoder_registry
 from utils.audio import load_audio, save_audio_to_buffer, save_audio
 from utils.form import create_dynamic_model
 from utils.uid import XXH3_64, path_from_uid
 from utils.migrations import run_global_migrations, run_project_migrations
 from utils.semantic_interrogation import SemanticInterrogator
+from utils.embedding_scheduler import EmbeddingUpdateScheduler
+from utils.graph_saver import GraphSaver
 
 from operations.registry import SyncRegistry
 from diffracture import Actant
@@ -97,6 +97,12 @@ torch_ext_dir = data_cache_root / "torch_extensions"
 torch_ext_dir.mkdir(parents=True, exist_ok=True)
 os.environ["TORCH_EXTENSIONS_DIR"] = str(torch_ext_dir)
 
+# Persist torch.compile (Inductor) artifacts so compiled models don't recompile from scratch on restart.
+torch_compile_dir = data_cache_root / "torch_compile"
+torch_compile_dir.mkdir(parents=True, exist_ok=True)
+os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(torch_compile_dir)
+os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
 # Global state
 device_type_accelerator = "cuda" if torch.cuda.is_available() else "cpu"
 device_accelerator = torch.device(device_type_accelerator)
@@ -120,6 +126,47 @@ local_jobs = {}
 
 graph_lock = threading.Lock()
 
+# Endpoints only mark the graph dirty; saves are coalesced and written off the request path
+BACKGROUND_GRAPH_SAVE = os.environ.get("GRAPH_BACKGROUND_SAVE", "true").lower() == "true"
+graph_saver = GraphSaver(graph_lock)
+atexit.register(graph_saver.flush)
+
+
+# Bumped whenever an endpoint or job finished changing the graph; wakes /graph/stream clients
+graph_changed = threading.Condition()
+graph_change_count = 0
+
+
+def notify_graph_changed():
+    global graph_change_count
+    with graph_changed:
+        graph_change_count += 1
+        graph_changed.notify_all()
+
+
+def save_graph():
+    """Queues a save of the current graph (or saves it right away if background saving is off)."""
+    if BACKGROUND_GRAPH_SAVE:
+        graph_saver.request(param_graph)
+    else:
+        param_graph.save()
+    notify_graph_changed()
+
+# Similarity springs are maintained incrementally. A group is rebuilt from scratch on its first
+# update in a session, whenever its neighbour counts change, and every N incremental updates.
+SIMILARITY_FULL_REBUILD_INTERVAL = int(os.environ.get("SIMILARITY_FULL_REBUILD_INTERVAL", 50))
+SIMILARITY_REVERSE_CANDIDATES = int(os.environ.get("SIMILARITY_REVERSE_CANDIDATES", 8))
+# Rows per similarity query; full rebuilds release the index between chunks
+SIMILARITY_QUERY_CHUNK = int(os.environ.get("SIMILARITY_QUERY_CHUNK", 1024))
+# Also keep the per-window embeddings of windowed encoders (CLAP) for time-localised similarity
+STORE_WINDOW_EMBEDDINGS = os.environ.get("CLAP_STORE_WINDOWS", "false").lower() == "true"
+similarity_state = {}
+
+# The label interrogator stays resident between embedding passes (encoders live in encoder_registry)
+label_interrogator: SemanticInterrogator = None
+label_bank_mtime = None
+embedding_resources_lock = threading.Lock()
+
 
 # --------------------
 #  Health Check
@@ -174,11 +221,15 @@ def load_project():
             return jsonify({"error": f"Project path '{project_path_str}' does not exist or is not a directory."}), 404
 
         with graph_lock:
+            # Write out the previous project before its files could be read again
+            graph_saver.flush(holding_lock=True)
             run_project_migrations(project_path)
             param_graph = ParameterGraph(str(project_path))
             initialize_engine(str(project_path))
 
-            if param_graph.load():
+            loaded = param_graph.load()
+            notify_graph_changed()
+            if loaded:
                 return jsonify({
                     "message": f"Project '{project_path.name}' loaded successfully.",
                     "project_name": project_path.name,
@@ -225,10 +276,12 @@ def create_project():
         final_project_name = project_name or project_path.name
 
         with graph_lock:
+            graph_saver.flush(holding_lock=True)
             param_graph = ParameterGraph(str(project_path))
             param_graph.project_name = final_project_name
             initialize_engine(str(project_path))
             param_graph.save()
+            notify_graph_changed()
 
         return jsonify({
             "message": f"Project '{final_project_name}' created successfully.",
@@ -265,18 +318,65 @@ def get_project():
 #  Graph Data
 # --------------------
 
+def _list_arg(name: str):
+    """Reads a comma-separated query parameter; None if absent, [] if given empty."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return [item for item in value.split(",") if item]
+
+
+def _graph_projection_args() -> dict:
+    """The fields / exclude parameters of the graph read endpoints."""
+    exclude = _list_arg("exclude")
+    return {
+        "fields": _list_arg("fields"),
+        "exclude": HEAVY_FIELDS if exclude is None else exclude,
+    }
+
+
+def _graph_query_args() -> dict:
+    """Common filter, projection and paging parameters of the graph read endpoints."""
+    limit = request.args.get("limit")
+    return {
+        "types": _list_arg("types"),
+        "parent": request.args.get("parent"),
+        "name": request.args.get("name"),
+        **_graph_projection_args(),
+        "limit": int(limit) if limit else None,
+        "cursor": request.args.get("cursor"),
+    }
+
+
 @app.route("/graph", methods=["GET"])
 def get_graph():
-    """Get graph data in batch mode"""
+    """
+    Get graph data in batch mode. Optional query parameters:
+    - types: comma-separated node types to include (edges between them are kept)
+    - fields: comma-separated node attributes to return (id, type, name and parent are always kept)
+    - exclude: attributes to leave out; defaults to embeddings, embedding_windows and layers,
+      pass an empty value to get everything
+    - limit / cursor: page through the nodes; pass back next_cursor for the next page
+    """
     if param_graph is None:
         return jsonify({"error": "No project loaded"}), 400
-    
+
+    try:
+        query_args = _graph_query_args()
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
     try:
         with graph_lock:
-            graph_data = param_graph.to_json(mode='batch')
+            graph_data = param_graph.query(**query_args)
+            revisions = param_graph.G.revisions
+            revision, epoch = revisions.revision, revisions.epoch
         return jsonify({
             "message": "success",
             "graph_data": graph_data,
+            "next_cursor": graph_data["next_cursor"],
+            "revision": revision,
+            "epoch": epoch,
             "success": True
         })
     except Exception as e:
@@ -285,6 +385,102 @@ def get_graph():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/graph/elements", methods=["GET"])
+def query_graph_elements():
+    """
+    Looks up node attributes without the graph structure: by ?ids=a,b,c or by the types /
+    parent / name filters, with the same fields, exclude and limit / cursor parameters as /graph.
+    """
+    if param_graph is None:
+        return jsonify({"error": "No project loaded"}), 400
+
+    try:
+        query_args = _graph_query_args()
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    try:
+        with graph_lock:
+            result = param_graph.query(ids=_list_arg("ids"), edges=False, **query_args)
+        return jsonify({
+            "message": "success",
+            "elements": [node["data"] for node in result["elements"]["nodes"]],
+            "total": result["total"],
+            "next_cursor": result["next_cursor"],
+            "success": True
+        })
+    except Exception as e:
+        print(f"Failed to query graph elements: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/graph/changes", methods=["GET"])
+def get_graph_changes():
+    """
+    Returns the nodes and edges changed after ?since=<revision> (as returned by /graph or a
+    previous call) and the keys of removed ones. Pass the epoch as well; if it doesn't match
+    or the revision is too old, the response has full=true and the whole graph_data instead.
+    Takes the same fields / exclude parameters as /graph.
+    """
+    if param_graph is None:
+        return jsonify({"error": "No project loaded"}), 400
+
+    try:
+        since = int(request.args.get("since", -1))
+    except ValueError:
+        return jsonify({"error": "since must be an integer revision"}), 400
+
+    try:
+        with graph_lock:
+            changes = param_graph.changes_since(since, request.args.get("epoch"), **_graph_projection_args())
+        return jsonify({"message": "success", **changes, "success": True})
+    except Exception as e:
+        print(f"Failed to get graph changes: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/graph/stream", methods=["GET"])
+def stream_graph_changes():
+    """
+    Server-sent events: pushes a 'changes' event in the /graph/changes format whenever the
+    graph changed after ?since=<revision>&epoch=<epoch>, and a comment as keep-alive.
+    Takes the same fields / exclude parameters as /graph.
+    """
+    try:
+        since = int(request.args.get("since", -1))
+    except ValueError:
+        return jsonify({"error": "since must be an integer revision"}), 400
+    epoch = request.args.get("epoch")
+    projection = _graph_projection_args()
+    keepalive = float(os.environ.get("GRAPH_STREAM_KEEPALIVE", 15))
+
+    def events():
+        revision, current_epoch = since, epoch
+        seen = -1
+        while True:
+            with graph_changed:
+                graph_changed.wait_for(lambda: graph_change_count != seen, timeout=keepalive)
+                changed, seen = graph_change_count != seen, graph_change_count
+            if not changed:
+                yield ": keep-alive\n\n"
+                continue
+
+            payload = None
+            with graph_lock:
+                if param_graph is not None:
+                    revisions = param_graph.G.revisions
+                    if revisions.epoch != current_epoch or revisions.revision != revision:
+                        payload = param_graph.changes_since(revision, current_epoch, **projection)
+            if payload is not None:
+                revision, current_epoch = payload["revision"], payload["epoch"]
+                yield f"event: changes\ndata: {json.dumps(payload)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route("/graph/create_batch", methods=["POST"])
 def batch_elements():
     """Create a batch from a selection of nodes."""
@@ -300,7 +496,7 @@ def batch_elements():
             batch_id = uid_generator.from_uids(member_ids)
             member_type = None
             for member_id in member_ids:
-                member = param_graph.get_element(member_id)
+                member = param_graph.view(member_id)
                 if member_type is None:
                     member_type = member.type
                 elif member_type != member.type:
@@ -319,7 +515,7 @@ def batch_elements():
                 param_graph.update_element(member_id, {"parent": batch_id})
             
             update_batch_labels(batch_id)
-            param_graph.save()
+            save_graph()
             
             updated_batch = param_graph.get_element(batch_id).to_dict()
 
@@ -365,7 +561,7 @@ def update_batch_endpoint(batch_id=None):
             # Validate types of new members
             member_type = None
             for m_id in new_member_ids:
-                member = param_graph.get_element(m_id)
+                member = param_graph.view(m_id)
                 if member_type is None:
                     member_type = member.type
                 elif member_type != member.type:
@@ -387,7 +583,7 @@ def update_batch_endpoint(batch_id=None):
             batch_node_attrs['member_type'] = member_type
             
             update_batch_labels(batch_id)
-            param_graph.save()
+            save_graph()
             
             updated_batch = param_graph.get_element(batch_id).to_dict()
 
@@ -444,7 +640,7 @@ async def import_model():
 
             with graph_lock:
                 param_graph.add_element(model_artifact)
-                param_graph.save()
+                save_graph()
             return jsonify({
                 "message": "Shared model registered successfully",
                 "success": True
@@ -483,7 +679,7 @@ async def import_model():
 
         with graph_lock:
             param_graph.add_element(model_artifact)
-            param_graph.save()
+            save_graph()
         
         return jsonify({
             "message": "Model registered successfully",
@@ -618,7 +814,7 @@ def register_grating():
 
             param_graph.add_element(grating_artifact)
             param_graph.link(base_model, grating_artifact, relation='binds_to')
-            param_graph.save()
+            save_graph()
         
         return jsonify({
             "message": "Grating registered successfully",
@@ -655,7 +851,7 @@ async def get_model_layers(model_id):
         # Cache the layers in the graph element
         with graph_lock:
             param_graph.update_element(model_id, {"layers": layers})
-            param_graph.save()
+            save_graph()
             
         return jsonify({
             "success": True,
@@ -692,7 +888,7 @@ async def create_grating():
         with graph_lock:
             param_graph.add_element(grating_artifact)
             param_graph.link(model_element, grating_artifact, relation='binds_to')
-            param_graph.save()
+            save_graph()
             
         return jsonify({
             "success": True,
@@ -744,52 +940,93 @@ async def get_job_status(job_id):
             print(f"Job {job_id} completed. Processing artifact...")
             job_context = active_jobs.pop(job_id, {})
             
-            result_dict = status_info.get("result", {})
-            artifact_data = result_dict.get('artifact', result_dict)
+            result_data = status_info.get("result", {})
 
-            if not artifact_data:
-                raise Exception("Completed job did not return a valid artifact.")
+            # Multi-artifact operations (e.g. interpolate) return a list of elements
+            if isinstance(result_data, list):
+                artifacts_data = result_data
+            else:
+                artifacts_data = [result_data.get('artifact', result_data)]
 
-            temp_artifact = resolve_element(artifact_data) if isinstance(artifact_data, dict) else artifact_data
+            if not artifacts_data or not all(artifacts_data):
+                raise Exception("Completed job did not return a valid artifact.")
 
             output_dir = param_graph.root / "generate"
-            final_artifact = save_artifact_asset(temp_artifact, output_dir, asset_name="file")
-            
-            # Ensure context is populated for labelling, and merge job-level validated params (like model_id, operation, gratings)
-            if hasattr(final_artifact, 'context'):
-                current_context = final_artifact.context or {}
-                merged_context = {**job_context.get("validated_params", {}), **current_context}
-                final_artifact = replace(final_artifact, context=merged_context)
+            final_artifacts = []
+            for artifact_data in artifacts_data:
+                temp_artifact = resolve_element(artifact_data) if isinstance(artifact_data, dict) else artifact_data
+                final_artifact = save_artifact_asset(temp_artifact, output_dir, asset_name="file")
+                
+                # Ensure context is populated for labelling, and merge job-level validated params (like model_id, operation, gratings)
+                if hasattr(final_artifact, 'context'):
+                    current_context = final_artifact.context or {}
+                    merged_context = {**job_context.get("validated_params", {}), **current_context}
+                    final_artifact = replace(final_artifact, context=merged_context)
+                final_artifacts.append(final_artifact)
+
+            is_batch = len(final_artifacts) > 1
+            collection_dict = None
             
             with graph_lock:
-                param_graph.add_element(final_artifact)
+                for final_artifact in final_artifacts:
+                    param_graph.add_element(final_artifact)
+
+                    for element in job_context.get("linked_elements", []):
+                        print(f"Linking {element.id} to {final_artifact.id}")
+                        param_graph.link(element, final_artifact, relation='source')
 
                 batch_id = job_context.get("batch_id")
                 if batch_id:
-                    param_graph.update_element(final_artifact.id, {"parent": batch_id})
-                    batch_node_attrs = param_graph.G.nodes[batch_id]
-                    if 'member_ids' not in batch_node_attrs or not isinstance(batch_node_attrs['member_ids'], list):
-                        batch_node_attrs['member_ids'] = []
-                    if final_artifact.id not in batch_node_attrs['member_ids']:
-                        batch_node_attrs['member_ids'].append(final_artifact.id)
+                    for final_artifact in final_artifacts:
+                        param_graph.update_element(final_artifact.id, {"parent": batch_id})
+                        batch_node_attrs = param_graph.G.nodes[batch_id]
+                        if 'member_ids' not in batch_node_attrs or not isinstance(batch_node_attrs['member_ids'], list):
+                            batch_node_attrs['member_ids'] = []
+                        if final_artifact.id not in batch_node_attrs['member_ids']:
+                            # Reassign rather than append so the change is picked up by the graph's change log
+                            batch_node_attrs['member_ids'] = [*batch_node_attrs['member_ids'], final_artifact.id]
                         
                     update_batch_labels(batch_id)
+                    if is_batch:
+                        collection_dict = param_graph.get_element(batch_id).to_dict()
+                elif is_batch:
+                    member_ids = [a.id for a in final_artifacts]
+                    batch_id = uid_generator.from_uids(member_ids)
+                    batch = Batch(id=batch_id, member_ids=member_ids, member_type=final_artifacts[0].type)
+                    param_graph.add_element(batch)
+
+                    # Try to position it near one of the source elements
+                    for el in job_context.get("linked_elements", []):
+                        if param_graph.G.has_node(el.id):
+                            el_pos = param_graph.G.nodes[el.id].get('position')
+                            if el_pos:
+                                param_graph.update_element(batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
+                                break
+
+                    for m_id in member_ids:
+                        param_graph.update_element(m_id, {"parent": batch_id})
+
+                    update_batch_labels(batch_id)
+                    collection_dict = param_graph.get_element(batch_id).to_dict()
 
-                for element in job_context.get("linked_elements", []):
-                    print(f"Linking {element.id} to {final_artifact.id}")
-                    param_graph.link(element, final_artifact, relation='source')
-                param_graph.save()
+                save_graph()
             
             trigger_embedding_update()
             
             print("Artifact processed and saved to graph successfully.")
-            return jsonify({
+            response_data = {
                 "status": "completed",
                 "message": "Audio generated and registered successfully.",
-                "artifact": final_artifact.to_dict(),
-                "node_id": final_artifact.id,
                 "validated_params": job_context.get("validated_params")
-            }), 200
+            }
+            if is_batch:
+                response_data["artifacts"] = [a.to_dict() for a in final_artifacts]
+                response_data["collection"] = collection_dict
+                response_data["node_id"] = collection_dict["id"]
+            else:
+                response_data["artifact"] = final_artifacts[0].to_dict()
+                response_data["node_id"] = final_artifacts[0].id
+            return jsonify(response_data), 200
 
         elif status == "failed":
             error_msg = status_info.get("error", "Unknown error during generation.")
@@ -964,58 +1201,59 @@ def _dispatch_sync_operation(data):
         collection_dict = None
         req_batch_id = data.get("batch_id") or params.get("batch_id")
         with graph_lock:
-            for artifact in final_artifacts:
-                param_graph.add_element(artifact)
+            with param_graph.transaction():
+                for artifact in final_artifacts:
+                    param_graph.add_element(artifact)
                 
-                for source_el in source_elements:
-                    param_graph.link(source_el, artifact, relation='source')
+                    for source_el in source_elements:
+                        param_graph.link(source_el, artifact, relation='source')
                 
-            if req_batch_id:
-                if not param_graph.G.has_node(req_batch_id):
-                    # Create new batch element
-                    batch_node = Batch(id=req_batch_id, member_ids=[], member_type=final_artifacts[0].type)
-                    param_graph.add_element(batch_node)
+                if req_batch_id:
+                    if not param_graph.G.has_node(req_batch_id):
+                        # Create new batch element
+                        batch_node = Batch(id=req_batch_id, member_ids=[], member_type=final_artifacts[0].type)
+                        param_graph.add_element(batch_node)
                     
+                        # Try to position it near one of the source elements
+                        for el in source_elements:
+                            if param_graph.G.has_node(el.id):
+                                el_pos = param_graph.G.nodes[el.id].get('position')
+                                if el_pos:
+                                    param_graph.update_element(req_batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
+                                    break
+                        print(f"Created new batch element {req_batch_id} for sync operation")
+                
+                    for artifact in final_artifacts:
+                        param_graph.update_element(artifact.id, {"parent": req_batch_id})
+                        batch_node_attrs = param_graph.G.nodes[req_batch_id]
+                        if 'member_ids' not in batch_node_attrs or not isinstance(batch_node_attrs['member_ids'], list):
+                            batch_node_attrs['member_ids'] = []
+                        if artifact.id not in batch_node_attrs['member_ids']:
+                            batch_node_attrs['member_ids'] = [*batch_node_attrs['member_ids'], artifact.id]
+                
+                    update_batch_labels(req_batch_id)
+                    collection_dict = param_graph.get_element(req_batch_id).to_dict()
+                elif is_batch:
+                    member_ids = [a.id for a in final_artifacts]
+                    batch_id = uid_generator.from_uids(member_ids)
+                    batch = Batch(id=batch_id, member_ids=member_ids, member_type=final_artifacts[0].type)
+                    param_graph.add_element(batch)
+                
                     # Try to position it near one of the source elements
                     for el in source_elements:
                         if param_graph.G.has_node(el.id):
                             el_pos = param_graph.G.nodes[el.id].get('position')
                             if el_pos:
-                                param_graph.update_element(req_batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
+                                param_graph.update_element(batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
                                 break
-                    print(f"Created new batch element {req_batch_id} for sync operation")
-                
-                for artifact in final_artifacts:
-                    param_graph.update_element(artifact.id, {"parent": req_batch_id})
-                    batch_node_attrs = param_graph.G.nodes[req_batch_id]
-                    if 'member_ids' not in batch_node_attrs or not isinstance(batch_node_attrs['member_ids'], list):
-                        batch_node_attrs['member_ids'] = []
-                    if artifact.id not in batch_node_attrs['member_ids']:
-                        batch_node_attrs['member_ids'].append(artifact.id)
                 
-                update_batch_labels(req_batch_id)
-                collection_dict = param_graph.get_element(req_batch_id).to_dict()
-            elif is_batch:
-                member_ids = [a.id for a in final_artifacts]
-                batch_id = uid_generator.from_uids(member_ids)
-                batch = Batch(id=batch_id, member_ids=member_ids, member_type=final_artifacts[0].type)
-                param_graph.add_element(batch)
-                
-                # Try to position it near one of the source elements
-                for el in source_elements:
-                    if param_graph.G.has_node(el.id):
-                        el_pos = param_graph.G.nodes[el.id].get('position')
-                        if el_pos:
-                            param_graph.update_element(batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
-                            break
-                
-                for m_id in member_ids:
-                    param_graph.update_element(m_id, {"parent": batch_id})
+                    for m_id in member_ids:
+                        param_graph.update_element(m_id, {"parent": batch_id})
                     
-                update_batch_labels(batch_id)
-                collection_dict = param_graph.get_element(batch_id).to_dict()
+                    update_batch_labels(batch_id)
+                    collection_dict = param_graph.get_element(batch_id).to_dict()
 
-            param_graph.save()
+            save_graph()
             
         trigger_embedding_update(background=True)
         
@@ -1154,7 +1392,7 @@ async def _dispatch_async_operation(data):
         if batch_id:
             with graph_lock:
                 if not param_graph.G.has_node(batch_id):
-                    batch_element = Batch(id=batch_id, member_type="audio" if operation != "invert" else "latent")
+                    batch_element = Batch(id=batch_id, member_type=model_element.output_type if operation != "invert" else "latent")
                     param_graph.add_element(batch_element)
                     
                     # Try to position it near one of the source/linked elements
@@ -1165,7 +1403,7 @@ async def _dispatch_async_operation(data):
                                 param_graph.update_element(batch_id, {"position": {"x": el_pos["x"] + 80, "y": el_pos["y"] + 80}})
                                 break
                     
-                    param_graph.save()
+                    save_graph()
                     print(f"Created new batch element {batch_id}")
 
         # --- Execute ---
@@ -1232,7 +1470,7 @@ def add_external_source():
         
         with graph_lock:
             param_graph.add_element(path_node)
-            param_graph.save()
+            save_graph()
         
         # Trigger an incremental embedding update
         trigger_embedding_update()
@@ -1262,7 +1500,7 @@ def rescan_source():
         
         with graph_lock:
             param_graph.scan_external_source(source_name)
-            param_graph.save()
+            save_graph()
         
         # Trigger an incremental embedding update
         trigger_embedding_update()
@@ -1319,13 +1557,9 @@ def expand_path():
         # 2. Gather paths of existing children to prevent duplicates during sync
         existing_paths = set()
         with graph_lock:
-            for node_id, data in param_graph.G.nodes(data=True):
-                if data.get("parent") == existing_dir_id:
-                    el = param_graph.get_element(node_id)
-                    if hasattr(el, "path"):
-                        existing_paths.add(el.path)
-                    elif hasattr(el, "file") and hasattr(el.file, "path"):
-                        existing_paths.add(el.file.path)
+            for child in param_graph.views(parent=existing_dir_id):
+                if child.path is not None:
+                    existing_paths.add(child.path)
 
         audio_exts = {'.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aiff'}
         new_elements = []
@@ -1353,10 +1587,8 @@ def expand_path():
                     print(f"Failed to load audio for {entry.name} to generate UID: {e}")
                 
         with graph_lock:
-            for el in new_elements:
-                param_graph.add_element(el)
-                param_graph.update_element(el.id, {"parent": existing_dir_id})
-            param_graph.save()
+            param_graph.add_elements(new_elements, {"parent": existing_dir_id})
+            save_graph()
             
         # Trigger embedding calculation for the newly added audio files
         trigger_embedding_update(background=False)
@@ -1474,12 +1706,8 @@ def update_batch_labels(batch_id: str):
     # Extract contexts
     contexts = []
     for m_id in member_ids:
-        try:
-            el = param_graph.get_element(m_id)
-            ctx = getattr(el, 'context', {})
-            contexts.append(ctx if isinstance(ctx, dict) else {})
-        except Exception:
-            contexts.append({})
+        ctx = param_graph.G.nodes[m_id].get('context') if param_graph.G.has_node(m_id) else None
+        contexts.append(ctx if isinstance(ctx, dict) else {})
     
     def diff_recursive(vals: list):
         if not vals:
@@ -1612,197 +1840,336 @@ def trigger_labeling_update():
         return
 
     with graph_lock:
-        batch_ids = [
-            node for node, data in param_graph.G.nodes(data=True)
-            if data.get('type') == 'batch'
-        ]
+        batch_ids = param_graph.find_nodes(type='batch')
         for batch_id in batch_ids:
             update_batch_labels(batch_id)
             
-        param_graph.save()
+        save_graph()
     print("Labeling update completed successfully.")
 
-def trigger_embedding_update(force_recalculate=False, background=True):
+def update_similarity_edges(group_type, embedding_type, interrogator, has_label_bank, full_rebuild=False):
+    """
+    Maintains the 'near' and 'distant' spring edges of a similarity group. Takes graph_lock
+    itself. Incremental updates only re-query the nodes whose embedding was added or changed,
+    the nodes pointing at them and the nodes that pointed at removed members, and splice the
+    new nodes into the neighbour lists they displace, so adding one artifact costs O(k log N).
+    A full rebuild re-queries every node and doubles as a periodic consistency check; it
+    snapshots the embeddings under the lock, runs the queries without it and only re-takes
+    the lock to write the edges.
+    """
+    interrogator = interrogator if has_label_bank and group_type == "audio" else None
+    with graph_lock:
+        group_ids = param_graph.find_nodes(type=group_type)
+        index, changed, removed = param_graph.get_similarity_index(embedding_type, group_ids)
+        orphaned = param_graph.similarity_orphans.pop(group_type, set())
+        if index is None:
+            return
+        n_nodes = len(index)
+
+        # Dynamically scale k based on graph size (logarithmic scaling)
+        # e.g., 10 nodes -> k_near=2, 100 nodes -> k_near=5, 1000+ nodes -> k_near=7
+        safe_n = max(n_nodes, 1)
+        k_near = max(2, min(7, int(np.log10(safe_n) * 2.5)))
+        k_far = max(1, min(4, int(np.log10(safe_n) * 1.5)))
+        n_near = min(n_nodes, k_near) - 1
+        n_far = min(n_nodes - 1, k_far)
+
+        state_key = (str(param_graph.root), group_type)
+        state = similarity_state.get(state_key)
+        full_rebuild = (
+            full_rebuild
+            or state is None
+            or state["k"] != (n_near, n_far)
+            or state["updates"] >= SIMILARITY_FULL_REBUILD_INTERVAL
+        )
+        if not full_rebuild and not (changed or removed or orphaned):
+            return
+        similarity_state[state_key] = {"k": (n_near, n_far), "updates": 0 if full_rebuild else state["updates"] + 1}
+
+        if not full_rebuild:
+            _update_similarity_edges_incrementally(
+                group_type, embedding_type, index, changed, removed, orphaned, n_near, n_far, interrogator
+            )
+            return
+
+        # Snapshot what the rebuild needs; the graph may change while it queries
+        node_ids, latents = param_graph.get_embedding_matrix([n for n in group_ids if n in index.labels], embedding_type)
+        refs = {n: _embedding_ref(n, embedding_type) for n in node_ids} if interrogator else {}
+
+    print(f"Rebuilding {group_type} similarity edges for {len(node_ids)} node(s)")
+    # L2 Normalize latents to project them onto the unit hypersphere
+    norms = np.linalg.norm(latents, axis=1, keepdims=True)
+    latents = latents / np.where(norms == 0, 1e-10, norms)
+    springs = _similarity_springs(index, node_ids, latents, n_near, n_far) if n_nodes > 1 else []
+    vectors = dict(zip(node_ids, latents))
+    labels = _spring_labels([(u, v) for u, v, _, _ in springs], vectors.get, refs.get, interrogator)
+
+    with graph_lock:
+        param_graph.G.remove_edges_from([
+            (u, v) for u, v, d in param_graph.G.edges(data=True)
+            if d.get('group') == group_type
+        ])
+        for (node_id, neighbor_id, spring_type, similarity), label in zip(springs, labels):
+            if not param_graph.G.has_node(node_id):
+                continue
+            if not param_graph.G.has_node(neighbor_id):
+                # Removed while the rebuild ran: the next update finds this node a new neighbour
+                param_graph.similarity_orphans.setdefault(group_type, set()).add(node_id)
+                continue
+            _add_spring(group_type, node_id, neighbor_id, spring_type, similarity, label)
+
+
+def _update_similarity_edges_incrementally(group_type, embedding_type, index, changed, removed, orphaned, n_near, n_far, interrogator):
+    """The incremental path of update_similarity_edges(). Must be called with graph_lock held."""
+    def spring_edges(node_id, spring_type=None, incoming=False):
+        edges = param_graph.G.in_edges(node_id, data=True) if incoming else param_graph.G.out_edges(node_id, data=True)
+        return [
+            (u, v, d) for u, v, d in edges
+            if d.get('type') == 'spring' and d.get('group') == group_type
+            and (spring_type is None or d.get('spring_type') == spring_type)
+        ]
+
+    # Nodes that pointed at a changed node hold stale weights, and nodes that pointed at a
+    # removed one are a neighbour short, so both are re-queried too. Members removed from
+    # the graph had their in-neighbours recorded in similarity_orphans on removal.
+    affected = set(changed) | orphaned
+    dropped = [node_id for node_id in removed if param_graph.G.has_node(node_id)]
+    for node_id in [*changed, *dropped]:
+        affected.update(u for u, _, _ in spring_edges(node_id, incoming=True))
+    affected = [node_id for node_id in affected if node_id in index.labels and param_graph.G.has_node(node_id)]
+    param_graph.G.remove_edges_from([(u, v) for node_id in [*affected, *dropped] for u, v, _ in spring_edges(node_id)])
+    if len(index) <= 1 or not affected:
+        return
+
+    added = []
+    affected_ids, latents = param_graph.get_embedding_matrix(affected, embedding_type)
+    # L2 Normalize latents to project them onto the unit hypersphere
+    norms = np.linalg.norm(latents, axis=1, keepdims=True)
+    latents = latents / np.where(norms == 0, 1e-10, norms)
+    vectors = dict(zip(affected_ids, latents))
+    for node_id, neighbor_id, spring_type, similarity in _similarity_springs(index, affected_ids, latents, n_near, n_far):
+        if param_graph.G.has_node(neighbor_id):
+            _add_spring(group_type, node_id, neighbor_id, spring_type, similarity)
+            added.append((node_id, neighbor_id))
+
+    # Splice changed nodes into the neighbour lists of the nodes they displace. k-NN isn't
+    # symmetric, so the reverse candidates come from a wider query around each changed node.
+    changed_set = set(changed)
+    changed_ids = [node_id for node_id in affected_ids if node_id in changed_set]
+    if changed_ids:
+        changed_latents = np.stack([vectors[node_id] for node_id in changed_ids])
+        n_candidates = SIMILARITY_REVERSE_CANDIDATES * max(n_near, n_far)
+        near_candidates = index.query(changed_latents, k=n_candidates, exclude_self=changed_ids)
+        far_candidates = index.query(changed_latents, k=n_candidates, far=True, exclude_self=changed_ids)
+
+        affected_set = set(affected_ids)
+        for i, node_id in enumerate(changed_ids):
+            for spring_type, (candidate_ids, candidate_sims), limit in (
+                ('near', near_candidates, n_near),
+                ('distant', far_candidates, n_far),
+            ):
+                for other_id, similarity in zip(candidate_ids[i], candidate_sims[i]):
+                    if other_id in affected_set or not param_graph.G.has_node(other_id) or param_graph.G.has_edge(other_id, node_id):
+                        continue
+                    existing = spring_edges(other_id, spring_type)
+                    if len(existing) >= limit:
+                        # Replace the weakest entry if the changed node beats it
+                        if spring_type == 'near':
+                            _, worst_id, worst = min(existing, key=lambda e: e[2]['weight'])
+                            displaces = similarity > worst['weight']
+                        else:
+                            _, worst_id, worst = max(existing, key=lambda e: e[2]['weight'])
+                            displaces = similarity < worst['weight']
+                        if not displaces:
+                            continue
+                        param_graph.G.remove_edge(other_id, worst_id)
+                    _add_spring(group_type, other_id, node_id, spring_type, similarity)
+                    added.append((other_id, node_id))
+
+    if interrogator is not None:
+        added = [(u, v) for u, v in added if param_graph.G.has_edge(u, v)]
+
+        def vector_of(node_id):
+            if node_id not in vectors:
+                vector = param_graph.get_embedding(node_id, embedding_type)
+                vectors[node_id] = vector / max(np.linalg.norm(vector), 1e-10)
+            return vectors[node_id]
+
+        labels = _spring_labels(added, vector_of, lambda node_id: _embedding_ref(node_id, embedding_type), interrogator)
+        for (u, v), label in zip(added, labels):
+            param_graph.G.edges[u, v]['source_label'] = label
+
+
+def _similarity_springs(index, node_ids, latents, n_near, n_far):
+    """
+    Returns the springs (node_id, neighbor_id, spring_type, similarity) from each node to
+    its n_near most and n_far least similar nodes in the index. Queries run in chunks so a
+    graph save waiting for the index isn't held up for a whole rebuild.
+    """
+    springs = []
+    for start in range(0, len(node_ids), SIMILARITY_QUERY_CHUNK):
+        chunk_ids = node_ids[start:start + SIMILARITY_QUERY_CHUNK]
+        chunk = latents[start:start + SIMILARITY_QUERY_CHUNK]
+        # Furthest neighbours come from the negated query, so no N x N distance matrix is needed
+        near_ids, near_sims = index.query(chunk, k=n_near, exclude_self=chunk_ids)
+        far_ids, far_sims = index.query(chunk, k=n_far, far=True, exclude_self=chunk_ids)
+        for i, node_id in enumerate(chunk_ids):
+            springs.extend((node_id, neighbor_id, 'near', similarity) for neighbor_id, similarity in zip(near_ids[i], near_sims[i]))
+            near_set = set(near_ids[i])  # Prevent overlap on small graphs
+            springs.extend(
+                (node_id, neighbor_id, 'distant', similarity)
+                for neighbor_id, similarity in zip(far_ids[i], far_sims[i]) if neighbor_id not in near_set
+            )
+    return springs
+
+
+def _spring_labels(pairs, vector_of, embedding_ref, interrogator):
     """
-    Background task to compute missing embeddings and recalculate similarity edges.
+    Labels springs with one batched interrogation of their difference vectors, or returns
+    empty labels without an interrogator. Labels are cached per pair of embedding keys, so
+    unchanged pairs skip the matmul.
+    """
+    if interrogator is None or not pairs:
+        return [""] * len(pairs)
+    diffs = torch.from_numpy(np.stack([vector_of(v) - vector_of(u) for u, v in pairs]))
+    results = interrogator.interrogate_batch(diffs, k=1, keys=[(embedding_ref(u), embedding_ref(v)) for u, v in pairs])
+    return [res[0][0] if res else "" for res in results]
+
+
+def _embedding_ref(node_id, embedding_type):
+    return (param_graph.G.nodes[node_id].get('embeddings') or {}).get(embedding_type, node_id)
+
+
+def _add_spring(group_type, node_id, neighbor_id, spring_type, similarity, label=""):
+    edge_tag = "near" if spring_type == "near" else "dist"
+    param_graph.G.add_edge(
+        node_id,
+        neighbor_id,
+        id=f"edge-{node_id}-{edge_tag}-{neighbor_id}",
+        type='spring',
+        spring_type=spring_type,
+        weight=float(similarity),
+        group=group_type,
+        source_label=label
+    )
+
+
+def get_label_interrogator():
+    """
+    Returns the resident interrogator for semantic edge labels, or None without a label bank.
+    Uses the sharded bank data/label_banks/<LABEL_BANK> (default 'semantic_transitions'), or the
+    legacy semantic_transitions_bank.pt. The bank is reopened only when it changes on disk, so
+    its pair cache survives passes; sharded banks are memory-mapped on the first query.
+    """
+    global label_interrogator, label_bank_mtime
+    data_dir = Path(__file__).parent / "data"
+    bank_path = data_dir / "label_banks" / os.environ.get("LABEL_BANK", "semantic_transitions")
+    stamp_path = bank_path / "manifest.json"
+    if not stamp_path.exists():
+        bank_path = stamp_path = data_dir / "semantic_transitions_bank.pt"
+    if not bank_path.exists():
+        return None
+    with embedding_resources_lock:
+        mtime = (str(bank_path), stamp_path.stat().st_mtime)
+        if label_interrogator is None or mtime != label_bank_mtime:
+            label_interrogator = SemanticInterrogator(device_accelerator)
+            label_interrogator.load_bank_from_disk(str(bank_path))
+            label_bank_mtime = mtime
+        return label_interrogator
+
+
+def run_embedding_update(force_recalculate=False):
+    """
+    Computes missing embeddings and updates similarity edges. Runs on the embedding
+    scheduler's worker; use trigger_embedding_update() to request a pass.
     If force_recalculate is True, it will recompute embeddings for all nodes.
     """
     if param_graph is None:
         return
 
-    def update_embeddings_task():
-        try:
-            # Instantiate encoders lazily per task run
-            clap_encoder = None
-            clip_encoder = None
-            
-            # Initialize interrogator for semantic edge labels
-            interrogator = SemanticInterrogator(device_accelerator)
-            bank_path = Path(__file__).parent / "data" / "semantic_transitions_bank.pt"
-            has_label_bank = bank_path.exists()
-            if has_label_bank:
-                interrogator.load_bank_from_disk(str(bank_path))
-            
-            for group_type, embedding_type in SIMILARITY_GROUPS.items():
-                if group_type == "audio":
-                    if clap_encoder is None:
-                        clap_encoder = CLAPEncoder()
-                    encoder = clap_encoder
-                    resolver = resolve_audio_path
-                elif group_type == "image":
-                    if clip_encoder is None:
-                        clip_encoder = CLIPEncoder()
-                    encoder = clip_encoder
-                    resolver = resolve_image_path
+    interrogator = get_label_interrogator()
+    has_label_bank = interrogator is not None
+
+    for group_type, embedding_type in SIMILARITY_GROUPS.items():
+        if group_type == "audio":
+            resolver = resolve_audio_path
+        elif group_type == "image":
+            resolver = resolve_image_path
+        else:
+            print(f"Unknown similarity group type: {group_type}")
+            continue
+
+        # 1. Compute embeddings ONLY for nodes that need them
+        with graph_lock:
+            nodes_to_process = [
+                (view.id, dict(view.embeddings))
+                for view in param_graph.views(type=group_type)
+            ]
+                
+        pending_nodes = []
+        pending_paths = []
+        for node, embeddings in nodes_to_process:
+            if not force_recalculate and param_graph.embeddings.has(embedding_type, embeddings.get(embedding_type)):
+                continue
+            file_path = resolver(node)
+            if file_path:
+                pending_nodes.append(node)
+                pending_paths.append(str(file_path))
+
+        window_results = None
+        if pending_paths:
+            with encoder_registry.acquire(embedding_type) as encoder:
+                if encoder is None:
+                    print(f"No {embedding_type} encoder available. Skipping {len(pending_paths)} node(s).")
+                    embeddings_out = [None] * len(pending_paths)
+                elif STORE_WINDOW_EMBEDDINGS and hasattr(encoder, "get_window_embeddings"):
+                    print(f"Computing windowed {embedding_type} embeddings for {len(pending_paths)} node(s)...")
+                    window_results = encoder.get_window_embeddings(pending_paths)
+                    embeddings_out = [r["embedding"] if r is not None else None for r in window_results]
                 else:
-                    print(f"Unknown similarity group type: {group_type}")
-                    continue
+                    print(f"Computing {embedding_type} embeddings for {len(pending_paths)} node(s)...")
+                    embeddings_out = encoder.get_embeddings(pending_paths)
 
-                # 1. Compute embeddings ONLY for nodes that need them
-                with graph_lock:
-                    nodes_to_process = []
-                    for node in param_graph.G.nodes():
-                        el = param_graph.get_element(node)
-                        if el and getattr(el, 'type', None) == group_type:
-                            emb_copy = getattr(el, 'embeddings', {}).copy()
-                            nodes_to_process.append((node, emb_copy))
-                        
-                for node, embeddings in nodes_to_process:
-                    if not force_recalculate and embedding_type in embeddings:
+            with graph_lock:
+                for i, (node, embedding) in enumerate(zip(pending_nodes, embeddings_out)):
+                    if embedding is None or not param_graph.G.has_node(node):
+                        print(f"Could not update {embedding_type} embedding for node {node}.")
                         continue
+                    param_graph.set_embedding(node, embedding_type, embedding.numpy())
+                    if window_results:
+                        result = window_results[i]
+                        param_graph.set_window_embeddings(node, embedding_type, result["starts"], result["window_seconds"], result["windows"].numpy())
+            print(f"Updated {embedding_type} embeddings for {sum(e is not None for e in embeddings_out)} node(s)")
+
+        # 2. Update similarity edges from the ANN index
+        update_similarity_edges(group_type, embedding_type, interrogator, has_label_bank, full_rebuild=force_recalculate)
+        with graph_lock:
+            save_graph()
+    print("Embeddings updated and similarity edges created successfully")
 
-                    try:
-                        file_path = resolver(node)
-                        if not file_path:
-                            continue
-                            
-                        embedding = encoder.get_embedding(str(file_path))
-                        
-                        with graph_lock:
-                            current_data = param_graph.G.nodes[node]
-                            current_embeddings = current_data.get('embeddings', {})
-                            current_embeddings[embedding_type] = embedding.tolist()
-                            param_graph.update_element(node, {'embeddings': current_embeddings})
-                            
-                        print(f"Updated {embedding_type} embedding for node {node}")
-                    except Exception as e:
-                        print(f"Could not update {embedding_type} embedding for node {node}. Error: {e}")
-
-                with graph_lock:
-                    # 2. Fast similarity edge rebuild based on cached embeddings
-                    edges_to_remove = [
-                        (u, v) for u, v, d in param_graph.G.edges(data=True) 
-                        if d.get('group') == group_type
-                    ]
-                    param_graph.G.remove_edges_from(edges_to_remove)
-
-                    group_nodes = {}
-                    for node in param_graph.G.nodes():
-                        el = param_graph.get_element(node)
-                        if el and getattr(el, 'type', None) == group_type:
-                            if embedding_type in getattr(el, 'embeddings', {}):
-                                group_nodes[node] = el.embeddings[embedding_type]
-
-                if len(group_nodes) <= 1:
-                    with graph_lock:
-                        param_graph.save()
-                    continue
 
-                node_ids = list(group_nodes.keys())
-                all_latents = np.array(list(group_nodes.values()))
-                
-                # L2 Normalize all latents to project them onto the unit hypersphere
-                norms = np.linalg.norm(all_latents, axis=1, keepdims=True)
-                all_latents = all_latents / np.where(norms == 0, 1e-10, norms)
-                
-                n_nodes = len(node_ids)
-                
-                # Dynamically scale k based on graph size (logarithmic scaling)
-                # e.g., 10 nodes -> k_near=2, 100 nodes -> k_near=5, 1000+ nodes -> k_near=7
-                safe_n = max(n_nodes, 1)
-                k_near = max(2, min(7, int(np.log10(safe_n) * 2.5)))
-                k_far = max(1, min(4, int(np.log10(safe_n) * 1.5)))
-
-                # Build the nearest neighbors model
-                nn = NearestNeighbors(n_neighbors=min(n_nodes, k_near), metric='cosine', algorithm='brute')
-                nn.fit(all_latents)
-
-                # Find neighbors for each node
-                distances, indices = nn.kneighbors(all_latents)
-                
-                # Calculate full distance matrix for distant neighbors
-                full_distances = cosine_distances(all_latents)
-                k_furthest = min(n_nodes - 1, k_far)
-
-                with graph_lock:
-                    for i, node_id in enumerate(node_ids):
-                        near_indices = set(indices[i])
-                        emb_A = all_latents[i]
-                        
-                        # 1. Add nearest neighbors (similar nodes)
-                        for j, neighbor_idx in enumerate(indices[i]):
-                            if i == neighbor_idx:
-                                continue
-                                
-                            source_label = ""
-                            if has_label_bank and group_type == "audio":
-                                emb_B = all_latents[neighbor_idx]
-                                diff_A_to_B = torch.tensor(emb_B - emb_A, dtype=torch.float32)
-                                
-                                res_A = interrogator.interrogate(diff_A_to_B, k=1)
-                                
-                                source_label = res_A[0][0] if res_A else ""
-                                
-                            param_graph.G.add_edge(
-                                node_id, 
-                                node_ids[neighbor_idx], 
-                                id=f"edge-{node_id}-near-{node_ids[neighbor_idx]}",
-                                type='spring', 
-                                spring_type='near',
-                                weight=float(1 - distances[i][j]),
-                                group=group_type,
-                                source_label=source_label
-                            )
-                            
-                        # 2. Add furthest neighbors (ghost edges for separation)
-                        furthest_indices = np.argsort(full_distances[i])[-k_furthest:]
-                        
-                        for neighbor_idx in furthest_indices:
-                            if i == neighbor_idx or neighbor_idx in near_indices:
-                                continue  # Prevent overlap on small graphs
-                            
-                            source_label = ""
-                            if has_label_bank and group_type == "audio":
-                                emb_B = all_latents[neighbor_idx]
-                                diff_A_to_B = torch.tensor(emb_B - emb_A, dtype=torch.float32)
-                                
-                                res_A = interrogator.interrogate(diff_A_to_B, k=1)
-                                
-                                source_label = res_A[0][0] if res_A else ""
-                            
-                            param_graph.G.add_edge(
-                                node_id, 
-                                node_ids[neighbor_idx], 
-                                id=f"edge-{node_id}-dist-{node_ids[neighbor_idx]}",
-                                type='spring', 
-                                spring_type='distant',
-                                weight=float(1 - full_distances[i][neighbor_idx]),
-                                group=group_type,
-                                source_label=source_label
-                            )
-
-                    param_graph.save()
-            print("Embeddings updated and similarity edges created successfully")
+# Embedding passes run behind generation jobs: they are deferred while jobs are in flight
+embedding_scheduler = EmbeddingUpdateScheduler(run_embedding_update, should_defer=lambda: bool(active_jobs))
 
-        except Exception as e:
-            print(f"Failed to update embeddings: {e}")
-            traceback.print_exc()
-            
-    if background:
-        thread = threading.Thread(target=update_embeddings_task)
-        thread.start()
-    else:
-        update_embeddings_task()
+
+def trigger_embedding_update(force_recalculate=False, background=True):
+    """
+    Requests an embedding update. Bursts of triggers are debounced and coalesced into a
+    single pass on the scheduler's worker thread. With background=False the call skips the
+    debounce window and blocks until a pass covering this request has finished.
+    """
+    if param_graph is None:
+        return
+
+    ticket = embedding_scheduler.request(force=force_recalculate, immediate=not background)
+    if not background:
+        embedding_scheduler.wait(ticket)
+
+
+@app.route("/embedding_status", methods=["GET"])
+def embedding_status():
+    """Backlog and last-run timings of the embedding update scheduler, plus encoder residency."""
+    return jsonify({**embedding_scheduler.status(), "encoders": encoder_registry.status()}), 200
 
 @app.route("/update_embeddings", methods=["POST"])
 def update_embeddings():
@@ -1848,26 +2215,24 @@ def repair_edges():
         with graph_lock:
             edges_added = 0
             
-            for node_id, node_data in param_graph.G.nodes(data=True):
-                element = param_graph.get_element(node_id)
-                if not element:
-                    continue
-
+            # Read-only views: the scan only needs base_model_id and context, and
+            # link() only reads the id and type of its endpoints.
+            for element in param_graph.views():
+                node_id = element.id
                 potential_source_ids = []
                 
-                if hasattr(element, 'base_model_id') and element.base_model_id:
-                    potential_source_ids.append((element.base_model_id, 'binds_to'))
+                if element.get('base_model_id'):
+                    potential_source_ids.append((element['base_model_id'], 'binds_to'))
                     
-                if hasattr(element, 'context') and isinstance(element.context, dict):
-                    for key, value in element.context.items():
-                        if key.endswith('_id') and isinstance(value, str):
-                            potential_source_ids.append((value, 'source'))
-                        elif key == 'gratings' and isinstance(value, list):
-                            for grating_item in value:
-                                g_id = grating_item.get('id')
-                                if g_id:
-                                    potential_source_ids.append((g_id, 'source'))
-                                    
+                for key, value in element.context.items():
+                    if key.endswith('_id') and isinstance(value, str):
+                        potential_source_ids.append((value, 'source'))
+                    elif key == 'gratings' and isinstance(value, (list, tuple)):
+                        for grating_item in value:
+                            g_id = grating_item.get('id')
+                            if g_id:
+                                potential_source_ids.append((g_id, 'source'))
+                                
                 for source_id, relation in potential_source_ids:
                     if param_graph.G.has_node(source_id):
                         # We check out_edges explicitly to ensure we don't skip structural edges 
@@ -1876,12 +2241,11 @@ def repair_edges():
                                           for _, v, attrs in param_graph.G.out_edges(source_id, data=True))
                         if not edge_exists:
                             print(f"Restoring missing edge: {source_id} -> {node_id}")
-                            source_el = param_graph.get_element(source_id)
-                            param_graph.link(source_el, element, relation=relation)
+                            param_graph.link(param_graph.view(source_id), element, relation=relation)
                             edges_added += 1
 
             if edges_added > 0:
-                param_graph.save()
+                save_graph()
 
         return jsonify({
             "message": f"Graph repaired: {edges_added} missing edges restored.",
@@ -2043,10 +2407,9 @@ def export_audio():
             if param_graph.G.has_node(name):
                 element = param_graph.get_element(name)
             else:
-                for node_id, node_data in param_graph.G.nodes(data=True):
-                    if node_data.get('name') == name:
-                        element = param_graph.get_element(node_id)
-                        break
+                matches = param_graph.find_nodes(name=name)
+                if matches:
+                    element = param_graph.get_element(matches[0])
             
             if not element:
                 return jsonify({"error": f"Element '{name}' not found"}), 404
@@ -2098,7 +2461,7 @@ def update_element():
         
         with graph_lock:
             param_graph.update_element(element_name, attributes)
-            param_graph.save()
+            save_graph()
         
         return jsonify({
             "message": "Element updated successfully",
@@ -2125,10 +2488,8 @@ def save_node_positions():
             return jsonify({"error": "No positions provided"}), 400
         
         with graph_lock:
-            for node_id, pos in positions.items():
-                param_graph.update_element(node_id, {"position": pos})
-                
-            param_graph.save()
+            param_graph.update_elements({node_id: {"position": pos} for node_id, pos in positions.items()})
+            save_graph()
         
         return jsonify({
             "message": "Node positions saved successfully",
@@ -2151,28 +2512,15 @@ def remove_element(element_id):
 
     try:
         with graph_lock:
-            if keep_children and param_graph.G.has_node(element_id):
-                node_attrs = param_graph.G.nodes[element_id]
-                
-                # Find and unlink any nodes specifying this element as their parent
-                children = [n for n, d in param_graph.G.nodes(data=True) if d.get('parent') == element_id]
-                for child_id in children:
-                    param_graph.update_element(child_id, {"parent": None, "alias": None})
-
-                if node_attrs.get('type') == 'batch':
-                    member_ids = node_attrs.get('member_ids', [])
-                    for m_id in member_ids:
-                        param_graph.update_element(m_id, {"parent": None, "alias": None})
-                    
-                    # CRITICAL: strip the batch of its members so remove_element doesn't cascade
-                    param_graph.update_element(element_id, {"member_ids": []})
-                    node_attrs['member_ids'] = []
-
-            param_graph.remove_element(element_id)
-            param_graph.save()
+            with param_graph.transaction():
+                updated_batches = param_graph.remove_element(element_id, keep_children=keep_children)
+                for batch_id in updated_batches:
+                    update_batch_labels(batch_id)
+            save_graph()
 
         return jsonify({
             "message": "Element removed successfully",
+            "updated_batches": updated_batches,
             "success": True
         })
 
@@ -2193,29 +2541,16 @@ def remove_elements():
         keep_children = data.get('keep_children', False)
 
         with graph_lock:
-            for element_id in element_ids:
-                if keep_children and param_graph.G.has_node(element_id):
-                    node_attrs = param_graph.G.nodes[element_id]
-                    
-                    # Find and unlink any nodes specifying this element as their parent
-                    children = [n for n, d in param_graph.G.nodes(data=True) if d.get('parent') == element_id]
-                    for child_id in children:
-                        param_graph.update_element(child_id, {"parent": None, "alias": None})
-
-                    if node_attrs.get('type') == 'batch':
-                        member_ids = node_attrs.get('member_ids', [])
-                        for m_id in member_ids:
-                            param_graph.update_element(m_id, {"parent": None, "alias": None})
-                        
-                        # CRITICAL: strip the batch of its members so remove_element doesn't cascade
-                        param_graph.update_element(element_id, {"member_ids": []})
-                        node_attrs['member_ids'] = []
-
-                param_graph.remove_element(element_id)
-            param_graph.save()
+            # All roots in one pass: descendants and batch member_ids are handled by the graph
+            with param_graph.transaction():
+                updated_batches = param_graph.remove_elements(element_ids, keep_children=keep_children)
+                for batch_id in updated_batches:
+                    update_batch_labels(batch_id)
+            save_graph()
 
         return jsonify({
             "message": f"Successfully removed {len(element_ids)} elements",
+            "updated_batches": updated_batches,
             "success": True
         })
 
@@ -1,10 +1,99 @@
+import os
+import gc
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import torch
 
+
 class Encoder(ABC):
+    # Files per forward pass and decode threads for get_embeddings()
+    batch_size = int(os.environ.get("EMBEDDING_BATCH_SIZE", 16))
+    decode_workers = int(os.environ.get("EMBEDDING_DECODE_WORKERS", min(8, os.cpu_count() or 1)))
+
     @abstractmethod
     def get_embedding(self, file_path: str) -> torch.Tensor:
         """
         Get the embedding for a file (audio, image, etc.).
         """
         pass
+
+    @property
+    def is_loaded(self) -> bool:
+        return getattr(self, "_model", None) is not None
+
+    def unload(self):
+        """Releases the model weights. They are reloaded on the next embedding request."""
+        if not self.is_loaded:
+            return
+        self._model = None
+        self._processor = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        print(f"{self.name}: Model unloaded.")
+
+    def get_embeddings(self, file_paths: list[str], batch_size: int = None) -> list[torch.Tensor | None]:
+        """
+        Get embeddings for many files. Returns one entry per path, None where the file
+        could not be embedded. Encoders override this with a batched implementation.
+        """
+        embeddings = []
+        for file_path in file_paths:
+            try:
+                embeddings.append(self.get_embedding(file_path))
+            except Exception as e:
+                print(f"{self.name}: Could not embed {file_path}. Error: {e}")
+                embeddings.append(None)
+        return embeddings
+
+    def _iter_decoded_batches(self, file_paths: list[str], decode, batch_size: int = None):
+        """
+        Decodes files in a thread pool and yields (indices, decoded) batches. The next batch
+        is decoded while the caller runs the model on the current one, so at most two batches
+        are held in memory. Files that fail to decode are reported and skipped.
+        """
+        batch_size = max(1, batch_size or self.batch_size)
+        starts = range(0, len(file_paths), batch_size)
+
+        def safe_decode(path):
+            try:
+                return decode(path)
+            except Exception as e:
+                print(f"{self.name}: Could not decode {path}. Error: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.decode_workers) as pool:
+            submit = lambda start: [pool.submit(safe_decode, p) for p in file_paths[start:start + batch_size]]
+            pending = submit(0) if file_paths else []
+            for n, start in enumerate(starts):
+                current = pending
+                if n + 1 < len(starts):
+                    pending = submit(starts[n + 1])
+                decoded = [f.result() for f in current]
+                indices = [start + i for i, item in enumerate(decoded) if item is not None]
+                items = [item for item in decoded if item is not None]
+                if items:
+                    yield indices, items
+
+    def _iter_embedded(self, items: list, decode, embed, batch_size: int = None):
+        """
+        Decodes and embeds items in batches, yielding (index, embedding) pairs on the CPU.
+        If the forward pass fails for a batch, its items are retried one at a time, so a
+        bad input (or a batch too large for the device) only loses its own embeddings.
+        """
+        for indices, decoded in self._iter_decoded_batches(items, decode, batch_size):
+            try:
+                embeddings = embed(decoded).cpu()
+            except Exception as e:
+                if len(decoded) > 1:
+                    print(f"{self.name}: Batch of {len(decoded)} failed, retrying one at a time. Error: {e}")
+                embeddings = None
+
+            if embeddings is not None:
+                yield from zip(indices, embeddings)
+                continue
+            for i, item in zip(indices, decoded):
+                try:
+                    yield i, embed([item]).cpu()[0]
+                except Exception as e:
+                    print(f"{self.name}: Could not embed {items[i]}. Error: {e}")
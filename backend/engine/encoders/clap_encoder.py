@@ -1,9 +1,16 @@
+import os
+import threading
+import numpy as np
+import soundfile as sf
 import torch
+import torch.nn.functional as F
 import torchaudio
 import torchaudio.transforms as T
 from transformers import ClapModel, ClapProcessor
 from .base_encoder import Encoder
 
+CLAP_MODEL_ID = "laion/clap-htsat-unfused"
+
 
 class CLAPEncoder(Encoder):
     """
@@ -13,21 +20,31 @@ class CLAPEncoder(Encoder):
     and use it to encode audio tensors into semantic embeddings. It handles
     audio preprocessing steps such as resampling and channel conversion.
     """
-    def __init__(self):
+    def __init__(self, device: str = None):
         """
         Initializes the CLAPEncoder.
         """
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self._model = None
         self._processor = None
         self.target_sr = 48000
+        # Resampler kernels are cached per source rate instead of rebuilt for every file
+        self._resamplers = {}
+        self._resampler_lock = threading.Lock()
+
+        # Full-clip embeddings stay the default: projects embedded before windowing existed
+        # would otherwise mix both kinds in one similarity group
+        self.window_mode = os.environ.get("CLAP_WINDOW_MODE", "full")
+        self.window_seconds = float(os.environ["CLAP_WINDOW_SECONDS"]) if os.environ.get("CLAP_WINDOW_SECONDS") else None
+        self.hop_seconds = float(os.environ["CLAP_HOP_SECONDS"]) if os.environ.get("CLAP_HOP_SECONDS") else None
+        self.max_windows = int(os.environ.get("CLAP_MAX_WINDOWS", 64))
 
     def load_model(self):
         """
         Loads the pre-trained CLAP model and processor from Hugging Face.
         """
         if self._model is None:
-            model_id = "laion/clap-htsat-unfused"
+            model_id = CLAP_MODEL_ID
             print(f"Loading CLAP model ({model_id})...")
             try:
                 # Fast path: attempt to load from local cache to bypass network overhead
@@ -51,11 +68,15 @@ class CLAPEncoder(Encoder):
     def embedding_type(self) -> str:
         return "clap"
 
-    def get_embedding(self, file_path: str) -> torch.Tensor:
-        if self._model is None:
-            self.load_model()
-            
-        waveform, sr = torchaudio.load(file_path)
+    def _get_resampler(self, orig_sr: int) -> T.Resample:
+        with self._resampler_lock:
+            if orig_sr not in self._resamplers:
+                self._resamplers[orig_sr] = T.Resample(orig_freq=orig_sr, new_freq=self.target_sr)
+            return self._resamplers[orig_sr]
+
+    def _decode(self, file_path: str, frame_offset: int = 0, num_frames: int = -1):
+        """Loads (part of) a file as a mono waveform at the target sample rate (1D numpy array)."""
+        waveform, sr = torchaudio.load(file_path, frame_offset=frame_offset, num_frames=num_frames)
         
         # Convert to mono if necessary
         if waveform.shape[0] > 1:
@@ -63,13 +84,50 @@ class CLAPEncoder(Encoder):
             
         # Resample if necessary
         if sr != self.target_sr:
-            resampler = T.Resample(orig_freq=sr, new_freq=self.target_sr)
-            waveform = resampler(waveform)
+            waveform = self._get_resampler(sr)(waveform)
             
         # HF Processor expects a 1D numpy array
-        audio_input = waveform.squeeze().numpy()
-        
-        inputs = self._processor(audio=audio_input, return_tensors="pt", sampling_rate=self.target_sr)
+        return waveform.reshape(-1).numpy()
+
+    def _window_length(self) -> tuple[float, float]:
+        window = self.window_seconds or float(getattr(self._processor.feature_extractor, "max_length_s", 10))
+        return window, self.hop_seconds or window
+
+    def _plan_windows(self, file_path: str) -> list[tuple[int, int, float, float]]:
+        """
+        Returns the windows of a file as (frame_offset, num_frames, start_seconds, weight) in
+        source frames. Falls back to a single whole-file window if the header can't be read.
+        """
+        if self.window_mode == "full":
+            return [(0, -1, 0.0, 1.0)]
+        try:
+            info = sf.info(file_path)
+            total_frames, sr = info.frames, info.samplerate
+        except Exception:
+            return [(0, -1, 0.0, 1.0)]
+
+        window_seconds, hop_seconds = self._window_length()
+        window, hop = int(window_seconds * sr), max(1, int(hop_seconds * sr))
+        if total_frames <= window:
+            return [(0, -1, 0.0, 1.0)]
+
+        windows = []
+        for offset in range(0, total_frames, hop):
+            frames = min(window, total_frames - offset)
+            # Skip short tails that would be mostly padding
+            if windows and frames < window // 4:
+                break
+            windows.append((offset, frames, offset / sr, frames / window))
+            if offset + window >= total_frames:
+                break
+
+        if len(windows) > self.max_windows:
+            keep = np.linspace(0, len(windows) - 1, self.max_windows).round().astype(int)
+            windows = [windows[i] for i in keep]
+        return windows
+
+    def _embed_audio(self, audio_inputs: list) -> torch.Tensor:
+        inputs = self._processor(audio=audio_inputs, return_tensors="pt", sampling_rate=self.target_sr)
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
         with torch.no_grad():
@@ -81,7 +139,59 @@ class CLAPEncoder(Encoder):
         else:
             embedding = outputs
             
-        return embedding.squeeze()
+        return embedding
+
+    def get_window_embeddings(self, file_paths: list[str], batch_size: int = None) -> list[dict | None]:
+        """
+        Embeds every window of every file, batching windows across files. Returns one entry
+        per path (None if no window could be embedded) with the pooled 'embedding', the
+        per-window 'windows' matrix, their 'starts' in seconds and 'window_seconds'.
+        """
+        if self._model is None:
+            self.load_model()
+
+        items = []
+        for file_index, file_path in enumerate(file_paths):
+            try:
+                windows = self._plan_windows(file_path)
+            except Exception as e:
+                print(f"{self.name}: Could not read {file_path}. Error: {e}")
+                continue
+            items.extend((file_index, file_path, *window) for window in windows)
+
+        collected = [[] for _ in file_paths]
+        decode = lambda item: self._decode(item[1], frame_offset=item[2], num_frames=item[3])
+        for i, embedding in self._iter_embedded(items, decode, self._embed_audio, batch_size):
+            file_index, _, _, _, start, weight = items[i]
+            collected[file_index].append((start, weight, embedding))
+
+        window_seconds = self._window_length()[0] if self.window_mode != "full" else None
+        results = []
+        for windows in collected:
+            if not windows:
+                results.append(None)
+                continue
+            windows.sort(key=lambda w: w[0])
+            matrix = torch.stack([w[2] for w in windows])
+            weights = torch.tensor([w[1] for w in windows], dtype=matrix.dtype).unsqueeze(1)
+            # Unit norm however many windows a file has, so short and long files compare alike
+            pooled = F.normalize((F.normalize(matrix, dim=-1) * weights).sum(dim=0), dim=-1)
+            results.append({
+                "embedding": pooled,
+                "windows": matrix,
+                "starts": [w[0] for w in windows],
+                "window_seconds": window_seconds,
+            })
+        return results
+
+    def get_embedding(self, file_path: str) -> torch.Tensor:
+        result = self.get_window_embeddings([file_path])[0]
+        if result is None:
+            raise RuntimeError(f"Could not embed {file_path}.")
+        return result["embedding"]
+
+    def get_embeddings(self, file_paths: list[str], batch_size: int = None) -> list[torch.Tensor | None]:
+        return [r["embedding"] if r is not None else None for r in self.get_window_embeddings(file_paths, batch_size)]
 
     def get_text_embedding(self, texts: list[str]) -> torch.Tensor:
         if self._model is None:
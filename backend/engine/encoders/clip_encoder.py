@@ -11,11 +11,11 @@ class CLIPEncoder(Encoder):
     This class provides a simple interface to load a pre-trained CLIP model
     and use it to encode images into semantic embeddings.
     """
-    def __init__(self):
+    def __init__(self, device: str = None):
         """
         Initializes the CLIPEncoder.
         """
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
         self._model = None
         self._processor = None
 
@@ -48,14 +48,12 @@ class CLIPEncoder(Encoder):
     def embedding_type(self) -> str:
         return "clip"
 
-    def get_embedding(self, file_path: str) -> torch.Tensor:
-        if self._model is None:
-            self.load_model()
-            
-        # Load image
-        image = PILImage.open(file_path).convert("RGB")
-        
-        inputs = self._processor(images=image, return_tensors="pt")
+    def _decode(self, file_path: str) -> PILImage.Image:
+        with PILImage.open(file_path) as image:
+            return image.convert("RGB")
+
+    def _embed_images(self, images: list) -> torch.Tensor:
+        inputs = self._processor(images=images, return_tensors="pt")
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
         with torch.no_grad():
@@ -67,7 +65,22 @@ class CLIPEncoder(Encoder):
         else:
             embedding = outputs
             
-        return embedding.squeeze()
+        return embedding
+
+    def get_embedding(self, file_path: str) -> torch.Tensor:
+        if self._model is None:
+            self.load_model()
+            
+        return self._embed_images([self._decode(file_path)]).squeeze()
+
+    def get_embeddings(self, file_paths: list[str], batch_size: int = None) -> list[torch.Tensor | None]:
+        if self._model is None:
+            self.load_model()
+
+        embeddings = [None] * len(file_paths)
+        for i, embedding in self._iter_embedded(file_paths, self._decode, self._embed_images, batch_size):
+            embeddings[i] = embedding
+        return embeddings
 
     def get_text_embedding(self, texts: list[str]) -> torch.Tensor:
         if self._model is None:
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+import importlib
+from contextlib import contextmanager
+
+import torch
+
+from .base_encoder import Encoder
+
+
+# Encoder name -> (module, class), imported on first use so missing optional
+# dependencies only disable the encoder that needs them
+ENCODER_CLASSES = {
+    "clap": ("engine.encoders.clap_encoder", "CLAPEncoder"),
+    "clip": ("engine.encoders.clip_encoder", "CLIPEncoder"),
+}
+
+
+class EncoderRegistry:
+    """
+    Process-wide registry of embedding encoders shared by the app and the local engine.
+
+    Encoders are created and loaded on first use, so each model is loaded at most once per
+    process. Encoders that have not been used for ENCODER_IDLE_TIMEOUT seconds are unloaded by
+    a background janitor (0 disables it) and transparently reloaded on the next request.
+    ENCODER_DEVICE selects the device: 'auto' (default), a device such as 'cpu' or 'cuda:1',
+    or per-encoder entries like 'clap=cuda,clip=cpu'.
+    """
+    def __init__(self, idle_timeout: float = None, device_policy: str = None):
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.environ.get("ENCODER_IDLE_TIMEOUT", 1800))
+        self.device_policy = device_policy or os.environ.get("ENCODER_DEVICE", "auto")
+        self.encoders: dict[str, Encoder] = {}
+        self.unavailable: dict[str, str] = {}
+        self.last_used: dict[str, float] = {}
+        self.in_use: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._janitor = None
+
+    def device_for(self, name: str) -> str:
+        policy = self.device_policy.strip()
+        if "=" in policy:
+            entries = dict(entry.split("=", 1) for entry in policy.split(",") if "=" in entry)
+            policy = entries.get(name, entries.get("default", "auto")).strip()
+        if policy == "auto":
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        return policy
+
+    def _create(self, name: str) -> Encoder | None:
+        if name in self.unavailable:
+            return None
+        if name not in ENCODER_CLASSES:
+            raise ValueError(f"Unknown encoder '{name}'. Available encoders: {list(ENCODER_CLASSES.keys())}")
+        module_name, class_name = ENCODER_CLASSES[name]
+        try:
+            encoder_class = getattr(importlib.import_module(module_name), class_name)
+            encoder = encoder_class(device=self.device_for(name))
+            print(f"{class_name} initialized on {encoder.device}.")
+            return encoder
+        except ImportError as e:
+            print(f"{class_name} not found, skipping {name.upper()} embedding functionality. ({e})")
+            self.unavailable[name] = str(e)
+        except Exception as e:
+            print(f"Error initializing {class_name}: {e}")
+        return None
+
+    def get(self, name: str) -> Encoder | None:
+        """Returns the shared encoder, or None if it isn't available in this environment."""
+        with self._lock:
+            if name not in self.encoders:
+                encoder = self._create(name)
+                if encoder is None:
+                    return None
+                self.encoders[name] = encoder
+            self.last_used[name] = time.monotonic()
+            self._start_janitor()
+            return self.encoders[name]
+
+    @contextmanager
+    def acquire(self, name: str):
+        """
+        Yields the shared encoder (or None) with its weights loaded and keeps the janitor from
+        unloading it meanwhile. Loading is serialised per encoder, so concurrent callers share
+        a single load.
+        """
+        encoder = self.get(name)
+        with self._lock:
+            self.in_use[name] = self.in_use.get(name, 0) + 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        try:
+            if encoder is not None and not encoder.is_loaded:
+                with load_lock:
+                    encoder.load_model()
+            yield encoder
+        finally:
+            with self._lock:
+                self.in_use[name] -= 1
+                self.last_used[name] = time.monotonic()
+
+    def unload_idle(self, max_idle: float = None):
+        """Unloads the weights of every encoder unused for longer than max_idle seconds."""
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            for name, encoder in self.encoders.items():
+                if self.in_use.get(name, 0) == 0 and encoder.is_loaded and now - self.last_used.get(name, 0) >= max_idle:
+                    print(f"Encoder '{name}' idle for {max_idle:.0f}s. Unloading.")
+                    encoder.unload()
+
+    def unload_all(self):
+        self.unload_idle(max_idle=0)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "device": encoder.device,
+                    "loaded": encoder.is_loaded,
+                    "in_use": self.in_use.get(name, 0),
+                    "idle_seconds": round(now - self.last_used.get(name, now), 1),
+                }
+                for name, encoder in self.encoders.items()
+            }
+
+    def _start_janitor(self):
+        if self.idle_timeout <= 0 or (self._janitor is not None and self._janitor.is_alive()):
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="encoder-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            self.unload_idle()
+
+
+encoder_registry = EncoderRegistry()
@@ -166,8 +166,20 @@ class Engine(ABC):
         num_clusters = kwargs["num_clusters"]
         return await self.cluster_features(model_element, address, num_clusters)
 
+    async def prefetch_activations(self, model_element: GraphElement, addresses: list[str]):
+        """
+        Captures the activations of several layers in one probe pass ahead of clustering.
+        Engines without an activation cache treat this as a no-op.
+        """
+        pass
+
     async def create_grating(self, model_element: GraphElement, name: str, elements: list) -> GraphElement:
         grating = DiffractureGrating()
+
+        # Collect every layer that needs clustering in a single probe pass
+        clustering_addresses = [el.get("address") for el in elements if el.get("perform_clustering")]
+        if clustering_addresses:
+            await self.prefetch_activations(model_element, clustering_addresses)
         
         # Build the elements
         for el_data in elements:
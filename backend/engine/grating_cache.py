@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+from diffracture.topology.grating import Grating as DiffractureGrating
+
+from param_graph.elements.artifacts.grating_element import Grating
+from utils.uid import XXH3_64
+
+
+class GratingCache:
+    """
+    LRU cache of loaded, device-resident Diffracture gratings. Entries are keyed by
+    (grating id, override hash, device) so every distinct override configuration keeps
+    its own merged copy and seed sweeps skip the disk load, override merge and device move.
+    """
+    def __init__(self, capacity=8):
+        self.cache = OrderedDict()
+        self.capacity = capacity
+        self.uid_generator = XXH3_64()
+
+    def override_hash(self, overrides: list | None) -> str:
+        """Returns a deterministic hash of a grating's per-job overrides."""
+        if not overrides:
+            return ""
+        return self.uid_generator.from_dict({"overrides": overrides})
+
+    def get(self, grating_element: Grating, overrides: list | None, device) -> DiffractureGrating:
+        key = (grating_element.id, self.override_hash(overrides), str(device))
+        if key in self.cache:
+            # Move to end to show it was recently used
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        if len(self.cache) >= self.capacity:
+            oldest_key, _ = self.cache.popitem(last=False)
+            print(f"Evicting grating {oldest_key[0]} from cache.")
+
+        grating = DiffractureGrating.load(grating_element.file.path)
+
+        # Apply the overrides to the grating first so we get the merged values
+        for override in overrides or []:
+            addr = override.get("address")
+            meta_overrides = override.get("metadata") or {}
+            if addr in grating.nodes:
+                grating.nodes[addr].metadata.update(meta_overrides)
+
+        grating.to(device)
+        self.cache[key] = grating
+        return grating
+
+    def clear(self):
+        """Drops all cached gratings to free up resources."""
+        self.cache.clear()
@@ -15,11 +15,13 @@ import torchaudio
 from param_graph.elements.base_elements import GraphElement
 from .engine import Engine
 from .model_cache import ModelCache
-from utils.uid import path_from_uid
+from .grating_cache import GratingCache
+from .weight_merge import WeightMerger
+from .encoders.registry import encoder_registry
+from utils.uid import XXH3_64, path_from_uid
 from utils.audio import save_audio
 
 from diffracture import Actant
-from diffracture.topology.grating import Grating as DiffractureGrating
 from diffracture.analysis.clustering import FeatureClusteringPipeline
 
 class LocalEngine(Engine):
@@ -34,31 +36,22 @@ class LocalEngine(Engine):
         self.job_statuses = {}
         self.is_sleeping = False
         self.idle_timeout = int(os.environ.get("ENGINE_IDLE_TIMEOUT", 6000))  # 30 minutes default
+
+        self.uid_generator = XXH3_64()
+
+        # --- Grating Cache Setup ---
+        self.grating_cache = GratingCache(capacity=int(os.environ.get("GRATING_CACHE_CAPACITY", 8)))
+        self.keep_gratings_active = os.environ.get("GRATING_KEEP_ACTIVE", "true").lower() == "true"
+        # 'hook' applies every grating element with forward hooks; 'merge' bakes linear
+        # elements into the layer weights for the duration of the job
+        self.grating_injection_strategy = os.environ.get("GRATING_INJECTION_STRATEGY", "hook")
         self.worker_thread = threading.Thread(target=self._worker, daemon=True)
         self.worker_thread.start()
 
         # --- Encoder Setup ---
-        self.encoder = None
-        self.encoders = {}
-        try:
-            from .encoders.clap_encoder import CLAPEncoder
-            clap = CLAPEncoder()
-            self.encoder = clap
-            self.encoders["clap"] = clap
-            print("CLAPEncoder initialized.")
-        except ImportError:
-            print("CLAPEncoder not found, skipping CLAP embedding functionality.")
-        except Exception as e:
-            print(f"Error initializing CLAPEncoder: {e}")
-
-        try:
-            from .encoders.clip_encoder import CLIPEncoder
-            self.encoders["clip"] = CLIPEncoder()
-            print("CLIPEncoder initialized.")
-        except ImportError:
-            print("CLIPEncoder not found, skipping CLIP embedding functionality.")
-        except Exception as e:
-            print(f"Error initializing CLIPEncoder: {e}")
+        # Encoders come from the process-wide registry, so the app's embedding pass and
+        # the engine share one lazily loaded instance of each model
+        self.encoders = encoder_registry
 
         # --- Shared Models Setup ---
         self.shared_models = []
@@ -105,6 +98,7 @@ class LocalEngine(Engine):
             name = entry.get("name")
             adapter_name = entry.get("adapter")
             model_type = entry.get("model_type")
+            compile_mode = entry.get("compile_mode")
 
             # Extract checkpoint details
             checkpoint_entry = entry.get("checkpoint")
@@ -184,6 +178,7 @@ class LocalEngine(Engine):
                     checkpoint_size=checkpoint_size,
                     encoder_uid=encoder_uid,
                     encoder_size=encoder_size,
+                    compile_mode=compile_mode,
                 )
 
 
@@ -223,63 +218,92 @@ class LocalEngine(Engine):
         adapter = adapter_class()
         return adapter.register_model(**kwargs)
 
-    async def _generate_logic(self, **kwargs) -> GraphElement:
+    def _apply_gratings(self, adapter, model_element: GraphElement, kwargs: dict) -> list:
         """
-        The actual generation logic. Gets a cached model adapter and uses it to generate an output.
-        Saves the output to a persistent location within the data_root.
+        Activates the requested Gratings (with any per-job overrides) on the adapter's model.
+        Loaded gratings come from the grating cache, and if the adapter is already running
+        the exact same configuration from a previous job it is left active untouched.
+        Returns the list of applied grating elements.
         """
-        model_element = kwargs["model_element"]
-        model_element = self._resolve_model_element(model_element)
-        adapter_class = self._get_adapter_class(model_element.adapter)
-        adapter = self.model_cache.get(model_element, adapter_class)
-
-        # Engine-level Grating intervention orchestration
         grating_elements = kwargs.get("grating_elements", [])
         grating_strengths = kwargs.get("grating_strengths", [])
-        if grating_elements:
-            if not hasattr(adapter, 'model') or adapter.model is None:
-                raise RuntimeError(f"Adapter '{model_element.adapter}' does not expose a loaded 'model' for grating injection.")
-            
-            if not hasattr(adapter, 'actant'):
-                adapter.actant = Actant(adapter.model)
-                
-            model_device = next(adapter.model.parameters()).device
-            
-            for i, grating_element in enumerate(grating_elements):
-                strength = grating_strengths[i] if grating_strengths and i < len(grating_strengths) else 1.0
-                print(f"Engine: Applying Grating '{grating_element.id}' with strength {strength}...")
-                grating = DiffractureGrating.load(grating_element.file.path)
-                
-                # Apply dynamic overrides if present in the payload and resolve cluster indices
-                gratings_input = kwargs.get("gratings") or []
-                for g_in in gratings_input:
-                    if g_in.get("id") == grating_element.id:
-                        overrides = g_in.get("overrides")
-                        if overrides is None:
-                            overrides = []
-                            g_in["overrides"] = overrides
-                        
-                        override_map = {o.get("address"): o for o in overrides}
-                        
-                        # Process all overrides to apply them to grating first
-                        for override in overrides:
-                            addr = override.get("address")
-                            meta_overrides = override.get("metadata") or {}
-                            override["metadata"] = meta_overrides
-                            
-                            # Apply the override to grating first so we get the merged values
-                            if addr in grating.nodes:
-                                grating.nodes[addr].metadata.update(meta_overrides)
-                
-                grating.to(model_device)
-                adapter.actant.activate(grating, injection_strategy="hook", strength=strength)
+        if not grating_elements:
+            self._release_gratings(adapter, force=True)
+            return []
+
+        if not hasattr(adapter, 'model') or adapter.model is None:
+            raise RuntimeError(f"Adapter '{model_element.adapter}' does not expose a loaded 'model' for grating injection.")
+
+        # Resolve the overrides and strength for each grating
+        gratings_input = kwargs.get("gratings") or []
+        configs = []
+        for i, grating_element in enumerate(grating_elements):
+            strength = grating_strengths[i] if grating_strengths and i < len(grating_strengths) else 1.0
+            overrides = []
+            for g_in in gratings_input:
+                if g_in.get("id") == grating_element.id:
+                    overrides = g_in.get("overrides")
+                    if overrides is None:
+                        overrides = []
+                        g_in["overrides"] = overrides
+                    for override in overrides:
+                        override["metadata"] = override.get("metadata") or {}
+            configs.append((grating_element, overrides, strength))
+
+        active_key = tuple(
+            (grating_element.id, self.grating_cache.override_hash(overrides), strength)
+            for grating_element, overrides, strength in configs
+        )
+        if getattr(adapter, 'active_grating_key', None) == active_key:
+            print("Engine: Grating configuration unchanged since the last job, keeping it active.")
+            return grating_elements
 
-        artifact, tensor = adapter.generate(**kwargs)
+        self._release_gratings(adapter, force=True)
 
-        if grating_elements:
-            # Revert the model to its original state so it can remain safely in the cache
+        if not hasattr(adapter, 'actant'):
+            adapter.actant = Actant(adapter.model)
+            
+        model_device = next(adapter.model.parameters()).device
+        
+        for grating_element, overrides, strength in configs:
+            print(f"Engine: Applying Grating '{grating_element.id}' with strength {strength}...")
+            grating = self.grating_cache.get(grating_element, overrides, model_device)
+
+            if self.grating_injection_strategy == "merge":
+                # Bake linear elements into the weights; only the rest needs forward hooks
+                if not hasattr(adapter, 'weight_merger'):
+                    adapter.weight_merger = WeightMerger(adapter.model)
+                merges, grating = adapter.weight_merger.plan(grating, strength)
+                adapter.weight_merger.apply(merges)
+                if merges:
+                    print(f"Engine: Merged {len(merges)} grating element(s) into the model weights.")
+                if grating is None:
+                    continue
+
+            adapter.actant.activate(grating, injection_strategy="hook", strength=strength)
+
+        adapter.active_grating_key = active_key
+        return grating_elements
+
+    def _release_gratings(self, adapter, force: bool = False):
+        """
+        Reverts the model to its original state so it can be used without interventions.
+        Unless forced (or GRATING_KEEP_ACTIVE is disabled), gratings stay active so
+        consecutive jobs with the same configuration skip re-activation.
+        """
+        if not force and self.keep_gratings_active:
+            return
+        if getattr(adapter, 'active_grating_key', None) is not None:
             adapter.actant.deactivate()
+            if hasattr(adapter, 'weight_merger'):
+                adapter.weight_merger.restore()
+            adapter.active_grating_key = None
 
+    def _save_output(self, adapter, artifact: GraphElement, tensor: torch.Tensor, kwargs: dict, grating_elements: list) -> GraphElement:
+        """
+        Persists a generated tensor to the data root and returns the artifact updated with
+        its local path and the grating context of the job.
+        """
         local_path = self.data_root / path_from_uid(artifact.id)
         local_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -304,17 +328,32 @@ class LocalEngine(Engine):
                 new_context["grating_ids"] = [el.id for el in grating_elements]
             artifact = replace(artifact, context=new_context)
 
-        if self.encoder and artifact.type == "audio":
-            try:
-                embedding = self.encoder.get_embedding(local_path)
-                new_embeddings = artifact.embeddings.copy()
-                new_embeddings[self.encoder.embedding_type] = embedding.tolist()
-                artifact = replace(artifact, embeddings=new_embeddings)
-            except Exception as e:
-                print(f"Error during embedding generation: {e}")
-
+        # Embeddings are not computed here: they would add an encoder forward to every
+        # generation's latency. The app embeds new artifacts in a background pass after
+        # delivery, and update_embedding() remains available as a separate job.
         return artifact
 
+    async def _generate_logic(self, **kwargs) -> GraphElement:
+        """
+        The actual generation logic. Gets a cached model adapter and uses it to generate an output.
+        Saves the output to a persistent location within the data_root.
+        """
+        model_element = kwargs["model_element"]
+        model_element = self._resolve_model_element(model_element)
+        adapter_class = self._get_adapter_class(model_element.adapter)
+        adapter = self.model_cache.get(model_element, adapter_class)
+
+        # Engine-level Grating intervention orchestration
+        grating_elements = self._apply_gratings(adapter, model_element, kwargs)
+        try:
+            artifact, tensor = adapter.generate(**kwargs)
+        except Exception:
+            self._release_gratings(adapter, force=True)
+            raise
+        self._release_gratings(adapter)
+
+        return self._save_output(adapter, artifact, tensor, kwargs, grating_elements)
+
     async def generate(self, **kwargs) -> GraphElement:
         """
         Public-facing generate method. For direct calls, it executes the logic.
@@ -322,6 +361,29 @@ class LocalEngine(Engine):
         """
         return await self._generate_logic(**kwargs)
 
+    async def _interpolate_logic(self, **kwargs) -> list[GraphElement]:
+        """
+        Renders a latent walk in a single job. The adapter batches the forward passes;
+        Gratings are activated once for the whole sequence.
+        """
+        model_element = kwargs["model_element"]
+        model_element = self._resolve_model_element(model_element)
+        adapter_class = self._get_adapter_class(model_element.adapter)
+        adapter = self.model_cache.get(model_element, adapter_class)
+
+        grating_elements = self._apply_gratings(adapter, model_element, kwargs)
+        try:
+            frames = adapter.interpolate(**kwargs)
+        except Exception:
+            self._release_gratings(adapter, force=True)
+            raise
+        self._release_gratings(adapter)
+
+        return [self._save_output(adapter, artifact, tensor, kwargs, grating_elements) for artifact, tensor in frames]
+
+    async def interpolate(self, **kwargs) -> list[GraphElement]:
+        return await self._interpolate_logic(**kwargs)
+
     async def _invert_logic(self, **kwargs) -> GraphElement:
         """
         The actual inversion logic. Gets a cached model adapter and uses it to perform DDIM inversion.
@@ -331,6 +393,7 @@ class LocalEngine(Engine):
         model_element = self._resolve_model_element(model_element)
         adapter_class = self._get_adapter_class(model_element.adapter)
         adapter = self.model_cache.get(model_element, adapter_class)
+        self._release_gratings(adapter, force=True)
 
         artifact, tensor = adapter.invert(**kwargs)
 
@@ -359,6 +422,8 @@ class LocalEngine(Engine):
                 if not self.is_sleeping and len(self.model_cache.cache) > 0:
                     print(f"Worker: Idle for {self.idle_timeout} seconds. Entering sleep mode (clearing VRAM).")
                     self.model_cache.clear()
+                    self.grating_cache.clear()
+                    self.encoders.unload_all()
                     
                     # Force Python to collect garbage immediately
                     gc.collect()
@@ -433,6 +498,8 @@ class LocalEngine(Engine):
             result = status.get("result")
             if isinstance(result, GraphElement):
                 status["result"] = result.to_dict()
+            elif isinstance(result, list):
+                status["result"] = [r.to_dict() if isinstance(r, GraphElement) else r for r in result]
 
         return status
 
@@ -460,35 +527,36 @@ class LocalEngine(Engine):
 
         artifact_type = getattr(artifact, 'type', None)
         if artifact_type == "audio":
-            encoder = self.encoders.get("clap")
+            encoder_key = "clap"
             encoder_name = "CLAPEncoder"
         elif artifact_type == "image":
-            encoder = self.encoders.get("clip")
+            encoder_key = "clip"
             encoder_name = "CLIPEncoder"
         else:
             print(f"Unsupported artifact type '{artifact_type}' for embedding update.")
             return artifact
 
-        if not encoder:
-            print(f"{encoder_name} not available, cannot update embeddings.")
-            return artifact
-
         file_path = Path(artifact.file.path)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found at {file_path}")
 
-        try:
-            embedding = encoder.get_embedding(str(file_path))
-            
-            new_embeddings = getattr(artifact, 'embeddings', {}).copy()
-            new_embeddings[encoder.embedding_type] = embedding.tolist()
-            
-            updated_artifact = replace(artifact, embeddings=new_embeddings)
-            return updated_artifact
+        with self.encoders.acquire(encoder_key) as encoder:
+            if not encoder:
+                print(f"{encoder_name} not available, cannot update embeddings.")
+                return artifact
 
-        except Exception as e:
-            print(f"Error during embedding update: {e}")
-            return audio_artifact
+            try:
+                embedding = encoder.get_embedding(str(file_path))
+                
+                new_embeddings = getattr(artifact, 'embeddings', {}).copy()
+                new_embeddings[encoder.embedding_type] = embedding.tolist()
+                
+                updated_artifact = replace(artifact, embeddings=new_embeddings)
+                return updated_artifact
+
+            except Exception as e:
+                print(f"Error during embedding update: {e}")
+                return artifact
 
     async def get_model_layers(self, model_element: GraphElement) -> list[dict]:
         model_element = self._resolve_model_element(model_element)
@@ -496,39 +564,97 @@ class LocalEngine(Engine):
         adapter = self.model_cache.get(model_element, adapter_class)
         if not hasattr(adapter, 'model') or adapter.model is None:
             raise RuntimeError("Model failed to load or does not expose PyTorch module.")
+        self._release_gratings(adapter, force=True)
             
         return self._extract_model_layers(adapter.model)
 
+    def _probe_config(self, model_element: GraphElement) -> dict | None:
+        """
+        Describes the deterministic forward passes used to capture activations for clustering,
+        or None for adapters without a probe (StyleGAN2 and Stable Audio only).
+        """
+        if "stylegan2" in model_element.adapter:
+            return {"probe": "stylegan2_z", "num_samples": 16, "truncation": 1.0, "seed": 0}
+        if "stable_audio" not in model_element.adapter:
+            return None
+        return {
+            "probe": "generate",
+            "steps": 2,
+            "cfg_scale": 1.0,
+            "sigma_min": 0.3,
+            "sigma_max": 500.0,
+            "seed": 42,
+            "k_sampler_type": "dpmpp-2m",
+            "rf_sampler_type": "euler",
+            "seconds_total": 1,
+            "duration_padding_sec": 0.0
+        }
+
+    def _activation_cache_path(self, model_element: GraphElement, address: str, probe_config: dict) -> Path:
+        key = self.uid_generator.from_dict({"address": address, "probe": probe_config})
+        return self.data_root / "activations" / model_element.id / f"{key}.pt"
+
+    async def prefetch_activations(self, model_element: GraphElement, addresses: list[str]):
+        """
+        Captures activations for every address that isn't cached on disk yet in a single
+        probe pass and stores them under the data root, keyed by (model id, address, probe config).
+        """
+        model_element = self._resolve_model_element(model_element)
+        probe_config = self._probe_config(model_element)
+        if probe_config is None:
+            print(f"No activation probe for adapter '{model_element.adapter}', skipping capture.")
+            return
+        missing = [a for a in dict.fromkeys(addresses) if not self._activation_cache_path(model_element, a, probe_config).exists()]
+        if not missing:
+            return
+
+        adapter_class = self._get_adapter_class(model_element.adapter)
+        adapter = self.model_cache.get(model_element, adapter_class)
+        self._release_gratings(adapter, force=True)
+
+        print(f"Capturing activations for {len(missing)} layer(s) in one probe pass: {missing}")
+        pipeline = FeatureClusteringPipeline(adapter.model, strategy_name="cnn")
+        pipeline.collector.start_collecting(missing)
+
+        # Run dummy forward passes on StyleGAN/StableAudio to collect activations
+        try:
+            with torch.no_grad():
+                if probe_config["probe"] == "stylegan2_z":
+                    generator = torch.Generator(device="cpu").manual_seed(probe_config["seed"])
+                    for _ in range(probe_config["num_samples"]):
+                        z = torch.randn(1, 512, generator=generator).to(adapter.device)
+                        adapter.model([z], truncation=probe_config["truncation"])
+                else:
+                    adapter.generate(**{k: v for k, v in probe_config.items() if k != "probe"})
+        finally:
+            pipeline.collector.stop_collecting()
+
+        for address in missing:
+            tensors = pipeline.collector.collected_activations.get(address, [])
+            if not tensors:
+                print(f"Warning: No activations were captured for layer '{address}'.")
+                continue
+            cache_path = self._activation_cache_path(model_element, address, probe_config)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            torch.save([t.detach().cpu() for t in tensors], tmp_path)
+            os.replace(tmp_path, cache_path)
+
     async def cluster_features(self, model_element: GraphElement, address: str, num_clusters: int) -> list[int]:
         model_element = self._resolve_model_element(model_element)
         adapter_class = self._get_adapter_class(model_element.adapter)
         adapter = self.model_cache.get(model_element, adapter_class)
-        
+        self._release_gratings(adapter, force=True)
+
+        # Activations are shared across clustering requests with different num_clusters
+        await self.prefetch_activations(model_element, [address])
+        probe_config = self._probe_config(model_element)
+        cache_path = self._activation_cache_path(model_element, address, probe_config) if probe_config else None
+        tensors = torch.load(cache_path, map_location=adapter.device, weights_only=True) if cache_path and cache_path.exists() else []
 
         print(f"Running dynamic FeatureClusteringPipeline on layer '{address}' with {num_clusters} clusters...")
         pipeline = FeatureClusteringPipeline(adapter.model, strategy_name="cnn")
-        pipeline.collector.start_collecting([address])
-        
-        # Run dummy forward passes on StyleGAN/StableAudio to collect activations
-        with torch.no_grad():
-            if "stylegan2" in model_element.adapter:
-                for _ in range(16):
-                    z = torch.randn(1, 512, device=adapter.device)
-                    adapter.model([z], truncation=1.0)
-            elif "stable_audio" in model_element.adapter:
-                adapter.generate(
-                    steps=2,
-                    cfg_scale=1.0,
-                    sigma_min=0.3,
-                    sigma_max=500.0,
-                    seed=42,
-                    k_sampler_type="dpmpp-2m",
-                    rf_sampler_type="euler",
-                    seconds_total=1,
-                    duration_padding_sec=0.0
-                )
-                
-        pipeline.collector.stop_collecting()
+        pipeline.collector.collected_activations[address] = tensors
         
         # Determine the channel dimension dynamically based on layer type and activation shape
         try:
@@ -536,7 +662,6 @@ class LocalEngine(Engine):
         except AttributeError:
             module = None
 
-        tensors = pipeline.collector.collected_activations.get(address, [])
         if tensors and len(tensors) > 0:
             sample_tensor = tensors[0]
             if module is not None and isinstance(module, torch.nn.Linear):
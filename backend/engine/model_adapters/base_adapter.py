@@ -15,9 +15,7 @@ def operation(name: str, is_standard: bool = True, description: str = "", initia
     from param_graph.elements.base_elements import Artifact
 
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            res = func(*args, **kwargs)
+        def tag(res):
             if isinstance(res, tuple) and len(res) > 0:
                 artifact = res[0]
                 if isinstance(artifact, Artifact):
@@ -31,6 +29,14 @@ def operation(name: str, is_standard: bool = True, description: str = "", initia
                 res = replace(res, context=new_context)
             return res
 
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            res = func(*args, **kwargs)
+            # Multi-output operations (e.g. interpolation) return a list of results
+            if isinstance(res, list):
+                return [tag(r) for r in res]
+            return tag(res)
+
         wrapper._is_operation = True
         wrapper._op_name = name
         wrapper._op_is_standard = is_standard
@@ -40,6 +46,30 @@ def operation(name: str, is_standard: bool = True, description: str = "", initia
         return wrapper
     return decorator
 
+def slerp(a: torch.Tensor, b: torch.Tensor, t: torch.Tensor) -> torch.Tensor:
+    """
+    Spherical linear interpolation between two tensors of identical shape.
+    Returns a tensor of shape [len(t), *a.shape[1:]] for inputs with a leading
+    batch dimension of 1. Falls back to linear interpolation when the inputs
+    are (nearly) colinear.
+    """
+    a_flat = a.reshape(1, -1).to(torch.float32)
+    b_flat = b.reshape(1, -1).to(torch.float32)
+    t = t.reshape(-1, 1).to(device=a.device, dtype=torch.float32)
+
+    a_norm = a_flat / a_flat.norm(dim=-1, keepdim=True).clamp_min(1e-8)
+    b_norm = b_flat / b_flat.norm(dim=-1, keepdim=True).clamp_min(1e-8)
+    dot = (a_norm * b_norm).sum(dim=-1, keepdim=True).clamp(-1.0, 1.0)
+    omega = torch.acos(dot)
+    sin_omega = torch.sin(omega)
+
+    if sin_omega.abs().item() < 1e-6:
+        out = (1.0 - t) * a_flat + t * b_flat
+    else:
+        out = (torch.sin((1.0 - t) * omega) / sin_omega) * a_flat + (torch.sin(t * omega) / sin_omega) * b_flat
+
+    return out.reshape(len(t), *a.shape[1:]).to(a.dtype)
+
 class ModelAdapter(ABC):
     def __init__(self, uid_generator: UIDGenerator = None) -> None:
         if uid_generator is None:
@@ -72,6 +102,44 @@ class ModelAdapter(ABC):
     def invert(self, **kwargs) -> tuple[GraphElement, torch.Tensor]:
         pass
 
+    def interpolate(self, **kwargs) -> list[tuple[GraphElement, torch.Tensor]]:
+        """
+        Renders a sequence of outputs between two points in the model's latent
+        space within a single call. Adapters override this to support the
+        'interpolate' operation.
+        """
+        raise NotImplementedError(f"Adapter '{self.name}' does not support interpolation.")
+
+    def compile_model(self, module: torch.nn.Module, info: Model) -> bool:
+        """
+        Compiles a module in place with torch.compile if the model opted in via its
+        'compile_mode' (or the MODEL_COMPILE_MODE environment override; 'off' disables
+        compilation globally). Compiling in place keeps named_modules() intact so grating
+        addresses still resolve. Returns True if the module was compiled.
+        """
+        mode = os.environ.get("MODEL_COMPILE_MODE") or getattr(info, "compile_mode", None)
+        if not mode or mode == "off":
+            return False
+
+        if not hasattr(module, "compile"):
+            print(f"torch.compile is not available in this PyTorch build. Running '{info.name}' eagerly.")
+            return False
+
+        try:
+            print(f"Compiling model '{info.name}' with torch.compile (mode={mode})...")
+            module.compile(mode=None if mode == "default" else mode)
+        except Exception as e:
+            print(f"Failed to compile model '{info.name}': {e}. Running eagerly.")
+            return False
+        return True
+
+    def warm_up(self):
+        """
+        Runs representative forward passes after compilation so the first user-facing
+        job doesn't pay the compile cost. Adapters override this for their common input sizes.
+        """
+        pass
+
     def cleanup(self):
         """Called to explicitly clean up resources when the adapter is removed from the cache."""
         pass
@@ -15,7 +15,7 @@ from coolname import generate_slug
 from tqdm import tqdm
 from k_diffusion.sampling import get_sigmas_karras
 
-from .base_adapter import ModelAdapter, operation
+from .base_adapter import ModelAdapter, operation, slerp
 from param_graph.elements.base_elements import Asset
 from param_graph.elements.artifacts.audio_element import Audio
 from param_graph.elements.artifacts.latent_element import Latent
@@ -40,6 +40,24 @@ def load_ckpt_state_dict(ckpt_path):
     return state_dict
 
 
+def _to_int16(output: torch.Tensor) -> torch.Tensor:
+    """Peak normalize, clip and convert an audio tensor to int16 on the CPU."""
+    return output.to(torch.float32).div(torch.max(torch.abs(output))).clamp(-1, 1).mul(32767).to(torch.int16).cpu()
+
+
+def _context_from_kwargs(kwargs: dict) -> dict:
+    """Filters operation kwargs into an artifact context, replacing elements with their IDs."""
+    context = {}
+    for k, v in kwargs.items():
+        if k.endswith('_element'):
+            context[k.replace('_element', '_id')] = v.id
+        elif k.endswith('_elements'):
+            context[k.replace('_elements', '_ids')] = [el.id for el in v]
+        else:
+            context[k] = v
+    return context
+
+
 def _compute_stable_audio_uid(file_path: str, uid_generator) -> str:
     abs_path = os.path.abspath(file_path)
     if not os.path.exists(abs_path):
@@ -114,6 +132,7 @@ class StableAudioAdapter(ModelAdapter):
             config=config,
             model_type=kwargs.get("model_type"),
             encoder=encoder_asset,
+            compile_mode=kwargs.get("compile_mode"),
             context={}
         )
         
@@ -201,6 +220,32 @@ class StableAudioAdapter(ModelAdapter):
         self.model.load_state_dict(state_dict)
         self.model_info = info
 
+        # Only the diffusion backbone is compiled; the conditioners and pretransform run once per job
+        if self.compile_model(self.model.model, info):
+            self.model.to(self.device)
+            self.warm_up()
+
+    def warm_up(self):
+        sample_rate = self.model_info.config["sample_rate"]
+        sample_size = self.model_info.config["sample_size"]
+        is_rf = (self.model_info.config.get("model", {}).get("diffusion", {}).get("diffusion_objective") in ["rectified_flow", "rf_denoiser"])
+
+        # Durations (in seconds) to trace at load time; defaults to the model's full window
+        seconds_list = [float(s) for s in os.environ.get("COMPILE_WARMUP_SECONDS", str(sample_size / sample_rate)).split(",") if s.strip()]
+        for seconds_total in seconds_list:
+            print(f"Warming up compiled diffusion model ({seconds_total:.1f}s)...")
+            self._sample(
+                prompt="",
+                steps=2,
+                cfg_scale=1.0,
+                seed=0,
+                seconds_total=seconds_total,
+                k_sampler_type="dpmpp-2m",
+                rf_sampler_type="euler",
+                sigma_min=0.0 if is_rf else 0.3,
+                sigma_max=1.0 if is_rf else 500,
+            )
+
     def cleanup(self):
         if self.model:
             del self.model
@@ -233,18 +278,52 @@ class StableAudioAdapter(ModelAdapter):
         }
     )
     def generate(self, **kwargs) -> tuple[Audio, torch.Tensor]:
+        sample_rate = self.model_info.config["sample_rate"]
+
+        with torch.no_grad():
+            output = self._sample(**kwargs)
+
+            # Rearrange audio batch to a single sequence
+            print("Generation complete, rearranging...")
+            output = rearrange(output, "b d n -> d (b n)")
+            output = _to_int16(output)
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        # Create audio artifact
+        content_uid = self.uid_generator.from_tensor(output)
+
+        artifact = Audio(
+            id=content_uid,
+            name=generate_slug(2),
+            file=Asset(path=None, uid=content_uid, extension=".wav"),
+            sample_rate=sample_rate,
+            duration=float(output.shape[-1]) / sample_rate,
+            context=_context_from_kwargs(kwargs)
+        )
+
+        return artifact, output
+
+    def _sample(self, init_latent_tensor: torch.Tensor | None = None, inversion_meta: dict | None = None, **kwargs) -> torch.Tensor:
+        """
+        Runs the diffusion sampler and returns the trimmed, un-normalized output batch
+        of shape [batch, channels, samples]. An explicit init_latent_tensor (with its
+        inversion metadata) takes precedence over an init_latent_element.
+        """
         model = self.model.to(self.device)
         sample_rate = self.model_info.config["sample_rate"]
         sample_size = self.model_info.config["sample_size"]
         seconds_start = kwargs.get("seconds_start", 0)
         seconds_total = kwargs.get("seconds_total", 11)
+        batch_size = kwargs.get("batch_size", 1)
 
-        # Set up text and timing conditioning
+        # Set up text and timing conditioning (one entry per batch item)
         conditioning = [{
             "prompt": kwargs.get("prompt", ""),
             "seconds_start": seconds_start,
             "seconds_total": seconds_total
-        }]
+        } for _ in range(batch_size)]
 
         negative_prompt = kwargs.get("negative_prompt", "")
         negative_conditioning = None
@@ -253,7 +332,7 @@ class StableAudioAdapter(ModelAdapter):
                 "prompt": negative_prompt,
                 "seconds_start": seconds_start,
                 "seconds_total": seconds_total
-            }]
+            } for _ in range(batch_size)]
 
         print(f"Generating with conditioning:{str(conditioning)}")
         if negative_prompt:
@@ -288,10 +367,8 @@ class StableAudioAdapter(ModelAdapter):
             
         # Extract metadata and tensor payload from initial latent if available
         init_latent_element = kwargs.get("init_latent_element")
-        init_latent_tensor = None
-        inversion_meta = None
         
-        if init_latent_element:
+        if init_latent_tensor is None and init_latent_element:
             print(f"DEBUG: Found init_latent_element with ID {init_latent_element.id}")
             latent_path = Path(init_latent_element.file.path)
             if latent_path and latent_path.exists():
@@ -332,8 +409,6 @@ class StableAudioAdapter(ModelAdapter):
                         expected_keys.extend(getattr(m, attr))
         expected_keys = list(set(expected_keys))
 
-        batch_size = kwargs.get("batch_size", 1)
-
         # Replicate duration adaptation logic from generate_diffusion_cond
         mask_padding_attention = getattr(model, 'mask_padding_attention', False)
         use_effective_length_for_schedule = getattr(model, 'use_effective_length_for_schedule', False)
@@ -593,39 +668,89 @@ class StableAudioAdapter(ModelAdapter):
             trim_duration = max(0.0, seconds_total - seconds_start)
             output = output[:,:,:int(trim_duration*sample_rate)]
 
-            # Rearrange audio batch to a single sequence
-            print("Generation complete, rearranging...")
-            output = rearrange(output, "b d n -> d (b n)")
-
-            # Peak normalize, clip, convert to int16
-            output = output.to(torch.float32).div(torch.max(torch.abs(output))).clamp(-1, 1).mul(32767).to(torch.int16).cpu()
-            
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        return output
 
-        # Create audio artifact
-        content_uid = self.uid_generator.from_tensor(output)
+    @operation(
+        name="interpolate",
+        is_standard=True,
+        description="Render an audio sequence between two inverted latents",
+        initiator_types=["latent"],
+        context_overrides={
+            "latent": {
+                "name": "interpolate latents",
+                "description": "Render a latent walk from this latent towards another inverted latent"
+            }
+        }
+    )
+    def interpolate(self, **kwargs) -> list[tuple[Audio, torch.Tensor]]:
+        sample_rate = self.model_info.config["sample_rate"]
+        num_frames = int(kwargs.get("num_frames", 8))
+        batch_size = max(1, int(kwargs.get("batch_size", 4)))
+
+        if num_frames < 2:
+            raise ValueError("Interpolation requires at least 2 frames.")
+
+        start_element = kwargs.get("init_latent_element")
+        end_element = kwargs.get("end_latent_element")
+        if not start_element or not end_element:
+            raise ValueError("init_latent_element and end_latent_element are required for interpolation.")
+
+        # Both latents must share a schedule for the walk to be meaningful, so the
+        # start latent's inversion metadata drives every frame. Without it the sampler
+        # ignores the init latent and every frame would come from the same seeded noise.
+        inversion_meta = (getattr(start_element, "context", None) or {}).get("inversion_metadata")
+        if not inversion_meta:
+            raise ValueError("Interpolation needs an inverted start latent (one with inversion_metadata).")
+
+        endpoints = []
+        for element in (start_element, end_element):
+            latent_path = Path(element.file.path)
+            if not latent_path.exists():
+                raise FileNotFoundError(f"Latent path not found: {latent_path}")
+            endpoints.append(torch.load(latent_path, map_location=self.device, weights_only=True))
+
+        start, end = endpoints
+        if start.shape != end.shape:
+            raise ValueError(f"Latent shapes do not match: {tuple(start.shape)} vs {tuple(end.shape)}")
+
+        t = torch.linspace(0.0, 1.0, num_frames)
+        path = slerp(start, end, t)
+        context = _context_from_kwargs(kwargs)
+        sample_kwargs = {k: v for k, v in kwargs.items() if k not in ("init_latent_element", "end_latent_element", "batch_size")}
+
+        results = []
+        with torch.no_grad():
+            for offset in range(0, num_frames, batch_size):
+                chunk = path[offset:offset + batch_size]
+                outputs = self._sample(
+                    init_latent_tensor=chunk,
+                    inversion_meta=inversion_meta,
+                    batch_size=chunk.shape[0],
+                    **sample_kwargs
+                )
 
-        # Filter context
-        context = {}
-        for k, v in kwargs.items():
-            if k.endswith('_element'):
-                context[k.replace('_element', '_id')] = v.id
-            elif k.endswith('_elements'):
-                context[k.replace('_elements', '_ids')] = [el.id for el in v]
-            else:
-                context[k] = v
+                for i, output in enumerate(outputs):
+                    frame_index = offset + i
+                    output = _to_int16(output)
+                    content_uid = self.uid_generator.from_tensor(output)
+                    artifact = Audio(
+                        id=content_uid,
+                        name=f"{generate_slug(2)}-{frame_index:03d}",
+                        file=Asset(path=None, uid=content_uid, extension=".wav"),
+                        sample_rate=sample_rate,
+                        duration=float(output.shape[-1]) / sample_rate,
+                        context={
+                            **context,
+                            "frame_index": frame_index,
+                            "t": float(t[frame_index])
+                        }
+                    )
+                    results.append((artifact, output))
 
-        artifact = Audio(
-            id=content_uid,
-            name=generate_slug(2),
-            file=Asset(path=None, uid=content_uid, extension=".wav"),
-            sample_rate=sample_rate,
-            duration=float(output.shape[-1]) / sample_rate,
-            context=context
-        )
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
 
-        return artifact, output
+        return results
 
     @operation(
         name="invert",
@@ -910,14 +1035,7 @@ class StableAudioAdapter(ModelAdapter):
         content_uid = self.uid_generator.from_tensor(latent_tensor)
 
         # Filter context metadata properties
-        context = {}
-        for k, v in kwargs.items():
-            if k.endswith('_element'):
-                context[k.replace('_element', '_id')] = v.id
-            elif k.endswith('_elements'):
-                context[k.replace('_elements', '_ids')] = [el.id for el in v]
-            else:
-                context[k] = v
+        context = _context_from_kwargs(kwargs)
 
         # Inject execution config data explicitly for backend self-documentation
         context["inversion_metadata"] = {
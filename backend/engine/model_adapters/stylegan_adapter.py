@@ -12,7 +12,7 @@ from torch import nn
 from torch.nn import functional as F
 from torchvision.utils import save_image
 
-from .base_adapter import ModelAdapter, operation
+from .base_adapter import ModelAdapter, operation, slerp
 from param_graph.elements.base_elements import Asset, GraphElement
 from param_graph.elements.artifacts.image_element import Image
 from param_graph.elements.models.stylegan_element import StyleGANModel
@@ -715,6 +715,7 @@ class StyleGANAdapter(ModelAdapter):
                 "size": size,
                 "channel_multiplier": channel_multiplier
             },
+            compile_mode=kwargs.get("compile_mode"),
             context={}
         )
 
@@ -823,6 +824,18 @@ class StyleGANAdapter(ModelAdapter):
             with torch.no_grad():
                 self.mean_latent = self.model.mean_latent(4096).to(self.device)
 
+        if self.compile_model(self.model, info):
+            self.warm_up()
+
+    def warm_up(self):
+        # Batch sizes to trace at load time (e.g. "1,8" to also cover interpolation batches)
+        batch_sizes = [int(b) for b in os.environ.get("COMPILE_WARMUP_BATCH_SIZES", "1").split(",") if b.strip()]
+        with torch.no_grad():
+            for batch_size in batch_sizes:
+                print(f"Warming up compiled StyleGAN2 generator (batch size {batch_size})...")
+                z = torch.randn(batch_size, self.style_dim, device=self.device)
+                self.model([z], truncation=0.7, truncation_latent=self.mean_latent, randomize_noise=False)
+
     def cleanup(self):
         if self.model:
             del self.model
@@ -889,6 +902,89 @@ class StyleGANAdapter(ModelAdapter):
 
         return image_artifact, img
 
+    @operation(
+        name="interpolate",
+        is_standard=True,
+        description="Render an image sequence between two seeds using StyleGAN2",
+        initiator_types=["model", "grating"],
+        context_overrides={
+            "model": {
+                "name": "Interpolate Seeds",
+                "description": "Render a latent walk between two seeds of the selected StyleGAN2 model"
+            },
+            "grating": {
+                "name": "interpolate from grating",
+                "description": "Render a latent walk guided by the selected grating structure"
+            }
+        }
+    )
+    def interpolate(self, **kwargs) -> list[tuple[Image, torch.Tensor]]:
+        truncation = float(kwargs.get("truncation", 0.7))
+        seed_start = int(kwargs.get("seed_start", 0))
+        seed_end = int(kwargs.get("seed_end", 1))
+        num_frames = int(kwargs.get("num_frames", 8))
+        space = kwargs.get("space", "w")
+        batch_size = max(1, int(kwargs.get("batch_size", 8)))
+        randomize_noise = bool(kwargs.get("randomize_noise", False))
+
+        if num_frames < 2:
+            raise ValueError("Interpolation requires at least 2 frames.")
+        if space not in ("z", "w"):
+            raise ValueError(f"Unknown interpolation space '{space}'. Expected 'z' or 'w'.")
+
+        # Draw the endpoints exactly as generate() would, so the first and last
+        # frames match single generations with the same seeds
+        endpoints = []
+        for seed in (seed_start, seed_end):
+            torch.manual_seed(seed)
+            endpoints.append(torch.randn(1, self.style_dim, device=self.device))
+
+        t = torch.linspace(0.0, 1.0, num_frames)
+        size = self.model_info.config.get("size", 256)
+        uid_gen = XXH3_64()
+        results = []
+
+        with torch.no_grad():
+            if space == "w":
+                start, end = (self.model.style(z) for z in endpoints)
+            else:
+                start, end = endpoints
+            path = slerp(start, end, t)
+
+            for offset in range(0, num_frames, batch_size):
+                chunk = path[offset:offset + batch_size]
+                imgs, _ = self.model(
+                    [chunk],
+                    truncation=truncation,
+                    truncation_latent=self.mean_latent,
+                    input_is_latent=(space == "w"),
+                    randomize_noise=randomize_noise
+                )
+
+                for i, img in enumerate(imgs):
+                    frame_index = offset + i
+                    img_id = uid_gen.from_tensor(img)
+                    image_artifact = Image(
+                        id=img_id,
+                        name=f"stylegan_interp_{seed_start}_{seed_end}_{frame_index:03d}",
+                        context={
+                            "seed_start": seed_start,
+                            "seed_end": seed_end,
+                            "space": space,
+                            "num_frames": num_frames,
+                            "frame_index": frame_index,
+                            "t": float(t[frame_index]),
+                            "truncation": truncation,
+                            "size": size
+                        },
+                        file=Asset(path="", uid=img_id, extension=".png"),
+                        width=size,
+                        height=size
+                    )
+                    results.append((image_artifact, img))
+
+        return results
+
     @operation(
         name="invert",
         is_standard=True,
@@ -151,45 +151,69 @@ class RemoteEngine(Engine):
 
                     status_info = await response.json()
 
-                    # If the job is complete and has a result, we need to download the file.
+                    # If the job is complete and has a result, we need to download the file(s).
                     if status_info.get("status") == "completed" and "result" in status_info:
-                        result_dict = status_info["result"]
-
-                        # The result from the service IS the element dictionary.
-                        element_dict = result_dict
+                        result_data = status_info["result"]
+
+                        # The result from the service IS the element dictionary, or a list of them
+                        # for multi-artifact operations such as interpolate.
+                        if isinstance(result_data, list):
+                            element_dicts = [item for item in result_data if isinstance(item, dict) and "id" in item]
+                            if not element_dicts:
+                                return status_info  # Return as-is if there are no valid elements
+
+                            anchored = []
+                            for element_dict in element_dicts:
+                                anchored_element = await self._download_result(session, resolve_element(element_dict))
+                                if anchored_element is None:
+                                    status_info["status"] = "failed"
+                                    status_info["error"] = f"Failed to download asset {element_dict['id']}"
+                                    return status_info
+                                anchored.append(anchored_element.to_dict())
+                            status_info["result"] = anchored
+                            return status_info
+
+                        element_dict = result_data
                         if not element_dict or not isinstance(element_dict, dict) or "id" not in element_dict:
                             return status_info  # Return as-is if there's no valid element
 
                         result_element = resolve_element(element_dict)
+                        anchored_element = await self._download_result(session, result_element)
+                        if anchored_element is not None:
+                            # Replace the dict result with the anchored element's dict representation.
+                            status_info["result"] = anchored_element.to_dict()
+                        else:
+                            # If download fails, update status to reflect that
+                            status_info["status"] = "failed"
+                            status_info["error"] = f"Failed to download asset {result_element.id}"
 
-                        async with session.get(f"{self.remote_url}/download_asset/{result_element.id}") as file_response:
-                            if file_response.status == 200:
-                                file_data = await file_response.read()
-
-                                # Save the file to a stable temporary location that won't be auto-deleted.
-                                tmp_root = Path(__file__).parent.parent / "tmp"
-                                tmp_root.mkdir(exist_ok=True)
+                    return status_info
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise Exception("Cannot reach engine service. Please verify that the remote server is running.") from e
 
-                                # Construct the path from the UID to save locally.
-                                base_path = path_from_uid(result_element.id)
-                                local_path = tmp_root / base_path
+    async def _download_result(self, session: aiohttp.ClientSession, result_element: GraphElement) -> GraphElement | None:
+        """
+        Downloads a result asset into the stable temp directory and returns the element
+        anchored to it, or None if the download failed.
+        """
+        async with session.get(f"{self.remote_url}/download_asset/{result_element.id}") as file_response:
+            if file_response.status != 200:
+                return None
+            file_data = await file_response.read()
 
-                                local_path.parent.mkdir(parents=True, exist_ok=True)
-                                local_path.write_bytes(file_data)
+        # Save the file to a stable temporary location that won't be auto-deleted.
+        tmp_root = Path(__file__).parent.parent / "tmp"
+        tmp_root.mkdir(exist_ok=True)
 
-                                # Anchor the element's path to the root of our stable temp directory.
-                                anchored_element = result_element.anchor(str(tmp_root), with_extension=False)
+        # Construct the path from the UID to save locally.
+        base_path = path_from_uid(result_element.id)
+        local_path = tmp_root / base_path
 
-                                # Replace the dict result with the anchored element's dict representation.
-                                status_info["result"] = anchored_element.to_dict()
-                            else:
-                                # If download fails, update status to reflect that
-                                status_info["status"] = "failed"
-                                status_info["error"] = f"Failed to download asset {result_element.id}"
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        local_path.write_bytes(file_data)
 
-                    return status_info
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            raise Exception("Cannot reach engine service. Please verify that the remote server is running.") from e
+        # Anchor the element's path to the root of our stable temp directory.
+        return result_element.anchor(str(tmp_root), with_extension=False)
 
     async def upload_missing_assets(self, missing_uids: list[str], local_assets: dict[str, str], session: aiohttp.ClientSession) -> bool:
         paths_to_upload = []
@@ -0,0 +1,134 @@
+import torch
+from torch import nn
+
+from diffracture.topology.grating import Grating as DiffractureGrating
+
+
+# Metadata keys of a scalar-multiply element's gain: the grating editor saves 'factor',
+# older gratings were saved with 'multiplier'
+SCALAR_MULTIPLY_KEYS = ("factor", "multiplier")
+
+
+def _scalar_multiply_gain(metadata: dict) -> float:
+    for name in SCALAR_MULTIPLY_KEYS:
+        value = metadata.get(name)
+        if value is not None:
+            return float(value)
+    raise ValueError(
+        f"scalar-multiply element has none of {SCALAR_MULTIPLY_KEYS} in its metadata "
+        f"(keys: {sorted(metadata)}), can't merge it into the weights."
+    )
+
+
+# Bending kernels whose effect on the selected output channels is a pure per-channel gain.
+# Each resolver returns the gain for an element's metadata.
+LINEAR_KERNELS = {
+    "invert": lambda metadata: -1.0,
+    "ablate": lambda metadata: 0.0,
+    "scalar-multiply": _scalar_multiply_gain,
+}
+
+
+def _resolve_channels(metadata: dict) -> list[int]:
+    """Resolves the output channels targeted by an element from its indices and cluster selection."""
+    channels = set(metadata.get("indices") or [])
+    cluster = metadata.get("cluster")
+    if cluster is not None:
+        for entry in metadata.get("cluster_map") or []:
+            if entry.get("cluster_index") == cluster:
+                channels.add(entry.get("feature_index"))
+    return sorted(c for c in channels if c is not None)
+
+
+class WeightMerger:
+    """
+    Applies linear grating elements by scaling the output rows of the target layer's
+    weights (and bias) in place instead of registering forward hooks, so sampling runs
+    at base-model speed. The original values of every touched parameter are cached the
+    first time they are modified and copied back on restore().
+    """
+    def __init__(self, model: nn.Module):
+        self.model = model
+        self.originals = {}
+        self.touched = set()
+
+    def _weight_targets(self, module: nn.Module, gain: float):
+        """
+        Returns [(parameter name, output dim)] to scale for a module, or None if its output
+        isn't linear in those parameters for the given gain.
+        """
+        class_name = type(module).__name__
+        if isinstance(module, (nn.Linear, nn.Conv1d, nn.Conv2d, nn.Conv3d)):
+            return [("weight", 0), ("bias", 0)]
+        if class_name == "EqualConv2d":
+            return [("weight", 0), ("bias", 0)]
+        if class_name == "EqualLinear":
+            # The fused leaky ReLU is only positively homogeneous
+            if getattr(module, "activation", None) and gain < 0:
+                return None
+            return [("weight", 0), ("bias", 0)]
+        if class_name == "ModulatedConv2d":
+            # Demodulation renormalizes each output row, so only the sign of the gain survives
+            if getattr(module, "demodulate", False) and abs(gain) != 1.0:
+                return None
+            return [("weight", 1)]
+        return None
+
+    def plan(self, grating: DiffractureGrating, strength: float):
+        """
+        Splits a grating into merges [(address, channels, gain)] and a hook-only grating for
+        the remaining elements (None if every element can be merged). The gain is blended with
+        the strength the same way the hook blends the kernel output with the original activation.
+        """
+        elements_by_address = {}
+        for element in grating._nodes:
+            elements_by_address.setdefault(element.address, []).append(element)
+
+        merges = []
+        remaining = []
+        for address, elements in elements_by_address.items():
+            element = elements[0]
+            resolver = LINEAR_KERNELS.get(element.kernel_type)
+            kernel_gain = resolver(element.metadata) if resolver and len(elements) == 1 else None
+            channels = _resolve_channels(element.metadata) if kernel_gain is not None else []
+
+            try:
+                module = self.model.get_submodule(address)
+            except AttributeError:
+                module = None
+
+            gain = 1.0 + strength * (kernel_gain - 1.0) if kernel_gain is not None else None
+            if gain is None or not channels or module is None or self._weight_targets(module, gain) is None:
+                remaining.extend(elements)
+                continue
+            merges.append((address, channels, gain))
+
+        if not remaining:
+            return merges, None
+
+        hook_grating = DiffractureGrating()
+        for element in remaining:
+            hook_grating.add_element(element)
+        return merges, hook_grating
+
+    @torch.no_grad()
+    def apply(self, merges: list):
+        for address, channels, gain in merges:
+            module = self.model.get_submodule(address)
+            for param_name, out_dim in self._weight_targets(module, gain):
+                param = getattr(module, param_name, None)
+                if param is None:
+                    continue
+                key = (address, param_name)
+                if key not in self.originals:
+                    self.originals[key] = param.detach().clone()
+                index = torch.tensor(channels, device=param.device)
+                param.index_copy_(out_dim, index, param.index_select(out_dim, index) * gain)
+                self.touched.add(key)
+
+    @torch.no_grad()
+    def restore(self):
+        """Copies the cached original values back into every parameter modified since the last restore."""
+        for address, param_name in self.touched:
+            getattr(self.model.get_submodule(address), param_name).copy_(self.originals[(address, param_name)])
+        self.touched.clear()
@@ -64,6 +64,12 @@ torch_ext_dir = data_cache_root / "torch_extensions"
 torch_ext_dir.mkdir(parents=True, exist_ok=True)
 os.environ["TORCH_EXTENSIONS_DIR"] = str(torch_ext_dir)
 
+# Persist torch.compile (Inductor) artifacts so compiled models don't recompile from scratch on restart.
+torch_compile_dir = data_cache_root / "torch_compile"
+torch_compile_dir.mkdir(parents=True, exist_ok=True)
+os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(torch_compile_dir)
+os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
 # Initialize the engine provider with the data cache path.
 engine_provider = EngineProvider(data_root=str(data_cache_root))
 
@@ -194,10 +200,16 @@ async def get_job_status(job_id):
         # De-anchor completed results before sending them over the wire
         if status.get("status") == "completed" and "result" in status:
             result_data = status.get("result")
-            if result_data and "id" in result_data:
+            if isinstance(result_data, dict) and "id" in result_data:
                 element = resolve_element(result_data)
                 de_anchored_element = element.de_anchor()
                 status["result"] = de_anchored_element.to_dict()
+            elif isinstance(result_data, list):
+                # Multi-artifact operations (e.g. interpolate) return a list of elements
+                status["result"] = [
+                    resolve_element(item).de_anchor().to_dict() if isinstance(item, dict) and "id" in item else item
+                    for item in result_data
+                ]
 
         return jsonify(status)
     except Exception as e:
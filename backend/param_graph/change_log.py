@@ -0,0 +1,514 @@
+import os
+import json
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import networkx as nx
+
+from .node_index import NodeIndex
+
+
+class RevisionLog:
+    """
+    Monotonic revision counter of a graph, with the revision at which each node and edge
+    last changed or was removed. Entries are kept in revision order, so the changes after
+    a given revision are read from the end without scanning the graph. Only the newest
+    max_entries are kept; older revisions (and those of another epoch, i.e. an earlier
+    load of the graph) can only be served by a full resync. Between group() and ungroup()
+    all changes share one revision, so clients see a transaction as a single step.
+    """
+    def __init__(self, max_entries: int = None):
+        self.epoch = uuid.uuid4().hex
+        self.revision = 0
+        self.floor = 0  # Oldest revision the log can still answer for
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get("GRAPH_REVISION_LOG_SIZE", 100000))
+        self.entries = OrderedDict()  # ('node', n) | ('edge', (u, v)) -> (revision, removed)
+        self.grouping = False
+        self._group_revision = None
+
+    def group(self):
+        self.grouping = True
+        self._group_revision = None
+
+    def ungroup(self):
+        self.grouping = False
+        self._group_revision = None
+
+    def _record(self, key, removed: bool):
+        if self._group_revision != self.revision:
+            self.revision += 1
+            if self.grouping:
+                self._group_revision = self.revision
+        self.entries[key] = (self.revision, removed)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            _, (revision, _) = self.entries.popitem(last=False)
+            self.floor = revision
+
+    def node(self, n):
+        self._record(('node', n), False)
+
+    def remove_node(self, n):
+        self._record(('node', n), True)
+
+    def edge(self, u, v):
+        self._record(('edge', (u, v)), False)
+
+    def remove_edge(self, u, v):
+        self._record(('edge', (u, v)), True)
+
+    def truncate(self):
+        """Forgets individual changes; every client has to resync once."""
+        self.revision += 1
+        self.entries.clear()
+        self.floor = self.revision
+
+    def since(self, revision: int) -> dict | None:
+        """
+        Returns the keys of nodes and edges changed or removed after the given revision,
+        or None if the log doesn't reach back that far.
+        """
+        if revision < self.floor or revision > self.revision:
+            return None
+        changes = {"nodes": [], "removed_nodes": [], "edges": [], "removed_edges": []}
+        for (kind, key), (entry_revision, removed) in reversed(self.entries.items()):
+            if entry_revision <= revision:
+                break
+            changes[("removed_" if removed else "") + kind + "s"].append(key)
+        return changes
+
+
+class _Journal:
+    """
+    Undo journal of an open transaction: the state of every node and edge before the
+    transaction first touched it, as (attrs dict, copy of its contents), or None if
+    the element didn't exist yet.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+
+
+class ChangeTracker:
+    """
+    Collects the net node/edge changes made to a graph since the last flush. Nodes and
+    edges are recorded by key only; their current attributes are read when the changes
+    are written, so repeated updates of the same element cost one record. Every change
+    is also forwarded to the graph's RevisionLog, which is not reset by flushes. While a
+    transaction is open, the prior state of each element is kept in the journal.
+    """
+    def __init__(self, revisions: RevisionLog = None):
+        self.revisions = revisions or RevisionLog()
+        self.journal = None
+        self.reset()
+
+    def reset(self):
+        # Dicts as ordered sets, so replaying the changes re-creates nodes in their original order
+        self.nodes = {}
+        self.removed_nodes = {}
+        self.edges = {}
+        self.removed_edges = {}
+        self.cleared = False
+
+    def __bool__(self):
+        return bool(self.nodes or self.removed_nodes or self.edges or self.removed_edges or self.cleared)
+
+    def node(self, n):
+        self.nodes[n] = None
+        self.removed_nodes.pop(n, None)
+        self.revisions.node(n)
+
+    def remove_node(self, n):
+        self.removed_nodes[n] = None
+        self.nodes.pop(n, None)
+        self.revisions.remove_node(n)
+
+    def edge(self, u, v):
+        self.edges[(u, v)] = None
+        self.removed_edges.pop((u, v), None)
+        self.revisions.edge(u, v)
+
+    def remove_edge(self, u, v):
+        self.removed_edges[(u, v)] = None
+        self.edges.pop((u, v), None)
+        self.revisions.remove_edge(u, v)
+
+    def collect(self, G: nx.DiGraph) -> dict:
+        """
+        Returns the net changes with shallow copies of the current attributes. Nested values
+        are shared; they are replaced rather than mutated in place, so the copies remain a
+        consistent snapshot after the graph changes again.
+        """
+        # Elements touched through a stale attribute dict after their removal still count as removed
+        removed_nodes = [*self.removed_nodes, *(n for n in self.nodes if n not in G)]
+        removed_edges = [*self.removed_edges, *(e for e in self.edges if not G.has_edge(*e))]
+        return {
+            "removed_edges": [[u, v] for u, v in removed_edges],
+            "removed_nodes": removed_nodes,
+            "nodes": {n: dict(G.nodes[n]) for n in self.nodes if n in G},
+            "edges": [[u, v, dict(G.edges[u, v])] for u, v in self.edges if G.has_edge(u, v)],
+        }
+
+
+class _TrackedAttrs(dict):
+    """
+    Attribute dict that reports every top-level write to its owner (the node dict or the
+    successor dict it is stored in), before the write for the undo journal and after it
+    for the change tracker.
+    """
+    __slots__ = ("_owner", "_key")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._owner = None
+        self._key = None
+
+    def _before(self):
+        if self._owner is not None:
+            self._owner._before(self._key, self)
+
+    def _changed(self):
+        if self._owner is not None:
+            self._owner._changed(self._key, self)
+
+    def __setitem__(self, key, value):
+        self._before()
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        self._before()
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        self._before()
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def pop(self, *args):
+        self._before()
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        self._before()
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._before()
+            value = super().setdefault(key, default)
+            self._changed()
+            return value
+        return super().setdefault(key, default)
+
+    def clear(self):
+        self._before()
+        super().clear()
+        self._changed()
+
+    def _restore(self, contents: dict):
+        """Puts back journaled contents without going through the hooks."""
+        dict.clear(self)
+        dict.update(self, contents)
+
+
+def _bind(attrs, owner, key):
+    if isinstance(attrs, _TrackedAttrs):
+        attrs._owner = owner
+        attrs._key = key
+
+
+class _NodeDict(dict):
+    """
+    The graph's node -> attrs dict; binds each attrs dict to its node so that writes
+    reach the change tracker and the secondary node index.
+    """
+    def __init__(self, tracker, index):
+        super().__init__()
+        self.tracker = tracker
+        self.index = index
+
+    def _journal(self, n):
+        journal = self.tracker.journal
+        if journal is not None and n not in journal.nodes:
+            attrs = self.get(n)
+            journal.nodes[n] = None if attrs is None else (attrs, dict(attrs))
+
+    def _before(self, n, attrs):
+        if self.get(n) is attrs:
+            self._journal(n)
+
+    def _changed(self, n, attrs):
+        # A stale attrs dict of a removed (or replaced) node must not resurrect it in the index
+        self.tracker.node(n)
+        if self.get(n) is attrs:
+            self.index.update(n, attrs)
+
+    def __setitem__(self, n, attrs):
+        self._journal(n)
+        super().__setitem__(n, attrs)
+        _bind(attrs, self, n)
+        self.tracker.node(n)
+        self.index.update(n, attrs)
+
+    def __delitem__(self, n):
+        self._journal(n)
+        super().__delitem__(n)
+        self.tracker.remove_node(n)
+        self.index.remove(n)
+
+    def clear(self):
+        if self.tracker.journal is not None:
+            raise RuntimeError("The graph can't be cleared inside a transaction")
+        super().clear()
+        self.tracker.cleared = True
+        self.tracker.revisions.truncate()
+        self.index.clear()
+
+
+class _AdjInner(dict):
+    """Neighbour -> edge attrs dict of one node. Only successor dicts record edges."""
+    def __init__(self):
+        super().__init__()
+        self.owner = None
+        self.tracker = None
+
+    def _journal(self, v):
+        journal = self.tracker.journal
+        if journal is not None and (self.owner, v) not in journal.edges:
+            attrs = self.get(v)
+            journal.edges[(self.owner, v)] = None if attrs is None else (attrs, dict(attrs))
+
+    def _before(self, v, attrs):
+        if self.get(v) is attrs:
+            self._journal(v)
+
+    def _changed(self, v, attrs):
+        self.tracker.edge(self.owner, v)
+
+    def __setitem__(self, v, attrs):
+        if self.tracker is not None:
+            self._journal(v)
+        super().__setitem__(v, attrs)
+        if self.tracker is not None:
+            _bind(attrs, self, v)
+            self.tracker.edge(self.owner, v)
+
+    def __delitem__(self, v):
+        if self.tracker is not None:
+            self._journal(v)
+        super().__delitem__(v)
+        if self.tracker is not None:
+            self.tracker.remove_edge(self.owner, v)
+
+
+class _AdjOuter(dict):
+    def __init__(self):
+        super().__init__()
+        self.tracker = None  # Set on the successor dict only
+
+    def __setitem__(self, u, inner):
+        super().__setitem__(u, inner)
+        if isinstance(inner, _AdjInner):
+            inner.owner = u
+            inner.tracker = self.tracker
+
+    def __delitem__(self, u):
+        if self.tracker is not None:
+            inner = self[u]
+            for v in inner:
+                inner._journal(v)
+                self.tracker.remove_edge(u, v)
+        super().__delitem__(u)
+
+
+class TrackedDiGraph(nx.DiGraph):
+    """
+    A DiGraph that records which nodes and edges were added, changed or removed, including
+    attribute writes made directly through G.nodes[n][...] and G.edges[u, v][...], and
+    keeps a NodeIndex of the parent/type/name attributes up to date. Nested values mutated
+    in place (e.g. list.append) are not seen; reassign them instead.
+
+    begin()/commit()/rollback() bracket a transaction: index maintenance is deferred to
+    the next lookup, all changes share one revision, and rollback() restores every touched
+    node and edge (including the identity of its attribute dict) from the undo journal;
+    restored nodes are re-inserted at the end of the node order. Nested transactions
+    join the outermost one.
+    """
+    node_attr_dict_factory = _TrackedAttrs
+    edge_attr_dict_factory = _TrackedAttrs
+    adjlist_inner_dict_factory = _AdjInner
+    adjlist_outer_dict_factory = _AdjOuter
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.revisions = RevisionLog()
+        self.tracker = ChangeTracker(self.revisions)
+        self.index = NodeIndex()
+        self.transaction_depth = 0
+        super().__init__(**attr)
+        # DiGraph.__init__ created empty dicts; swap in tracked ones before any data is added
+        self._node = _NodeDict(self.tracker, self.index)
+        self._succ.tracker = self.tracker
+        if incoming_graph_data is not None:
+            # Copy through add_* so every attribute dict gets bound to the tracker
+            source = incoming_graph_data if isinstance(incoming_graph_data, nx.Graph) else nx.DiGraph(incoming_graph_data)
+            self.graph.update(source.graph)
+            self.add_nodes_from(source.nodes(data=True))
+            self.add_edges_from(source.edges(data=True))
+
+
+    def begin(self):
+        self.transaction_depth += 1
+        if self.transaction_depth == 1:
+            self.tracker.journal = _Journal()
+            self.index.defer()
+            self.revisions.group()
+
+    def commit(self):
+        self.transaction_depth -= 1
+        if self.transaction_depth == 0:
+            self._end_transaction()
+
+    def rollback(self):
+        self.transaction_depth -= 1
+        if self.transaction_depth:
+            return  # The outermost transaction rolls back
+        journal, self.tracker.journal = self.tracker.journal, None
+        try:
+            # 1. Nodes that existed before, with their original attribute dicts
+            for n, prior in journal.nodes.items():
+                if prior is None:
+                    continue
+                attrs, contents = prior
+                if self._node.get(n) is not attrs:
+                    if n not in self._node:
+                        self.add_node(n)
+                    self._node[n] = attrs
+                attrs._restore(contents)
+                self._node._changed(n, attrs)
+            # 2. Edges: drop the new ones, put back the old ones
+            for (u, v), prior in journal.edges.items():
+                if prior is None:
+                    if self.has_edge(u, v):
+                        self.remove_edge(u, v)
+                    continue
+                attrs, contents = prior
+                if self._succ[u].get(v) is not attrs:
+                    self._succ[u][v] = attrs
+                    self._pred[v][u] = attrs
+                attrs._restore(contents)
+                self.tracker.edge(u, v)
+            # 3. Nodes created by the transaction (with any edges left on them)
+            self.remove_nodes_from([n for n, prior in journal.nodes.items() if prior is None and n in self._node])
+        finally:
+            self._end_transaction()
+
+    def _end_transaction(self):
+        self.tracker.journal = None
+        self.index.resume()
+        self.revisions.ungroup()
+
+
+class WriteAheadLog:
+    """
+    Append-only JSON-lines log of graph changes next to the graph.json snapshot. Each
+    record holds the net changes of one save and a sequence number; the snapshot stores
+    the last sequence it contains, so replay skips records that were already compacted
+    and ignores a torn final line left by a crash.
+    """
+    def __init__(self, path, fsync: bool = None):
+        self.path = Path(path)
+        self.fsync = fsync if fsync is not None else os.environ.get("GRAPH_WAL_FSYNC", "true").lower() == "true"
+        self.seq = 0
+        self.records = 0
+
+    def size(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def prepare(self, changes: dict) -> dict:
+        """Numbers a set of changes from ChangeTracker.collect() as the next record."""
+        self.seq += 1
+        self.records += 1
+        return {"seq": self.seq, **changes}
+
+    def write(self, record: dict):
+        line = json.dumps(record) + "\n"
+        with open(self.path, 'a', encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def append(self, G: nx.DiGraph, tracker: ChangeTracker):
+        """Writes the tracked changes of G as one record."""
+        self.write(self.prepare(tracker.collect(G)))
+
+    def replay(self, G: nx.DiGraph, after_seq: int) -> int:
+        """
+        Applies every record newer than after_seq to G. Returns the number applied. A torn
+        final record (left by a crash mid-write) is cut off the log, so the next append
+        starts on a fresh line instead of being glued onto it.
+        """
+        self.seq = after_seq
+        self.records = 0
+        if not self.path.exists():
+            return 0
+
+        applied = 0
+        end = 0  # Byte offset just past the last complete record
+        unterminated = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                end += len(line)
+                unterminated = not line.endswith(b"\n")
+                self.records += 1
+                if record["seq"] <= after_seq:
+                    continue
+
+                G.remove_edges_from([tuple(e) for e in record["removed_edges"]])
+                G.remove_nodes_from(record["removed_nodes"])
+                for n, attrs in record["nodes"].items():
+                    if n in G:
+                        G.nodes[n].clear()
+                        G.nodes[n].update(attrs)
+                    else:
+                        G.add_node(n, **attrs)
+                for u, v, attrs in record["edges"]:
+                    if G.has_edge(u, v):
+                        G.edges[u, v].clear()
+                    G.add_edge(u, v, **attrs)
+                self.seq = record["seq"]
+                applied += 1
+
+        torn = end < self.path.stat().st_size
+        if torn or unterminated:
+            if torn:
+                print(f"Dropping an incomplete record at the end of {self.path}.")
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+                if unterminated:
+                    # The record is complete, only its newline never reached the disk
+                    f.seek(end)
+                    f.write(b"\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        return applied
+
+    def truncate(self):
+        """Empties the log after its records were compacted into a snapshot."""
+        with open(self.path, 'w', encoding="utf-8") as f:
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.records = 0
@@ -3,4 +3,7 @@ DICT_FILE = "graph.json"
 MODEL_DIR = "models"
 AUDIO_DIR = "audio"
 BACKIP_DIR = "backup"
-EXPORT_DIR = "export"
\ No newline at end of file
+EXPORT_DIR = "export"
+EMBEDDINGS_DIR = "embeddings"
+WAL_FILE = "graph.wal"
+DB_FILE = "graph.db"
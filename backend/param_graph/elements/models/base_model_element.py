@@ -8,3 +8,4 @@ class Model(Artifact):
     output_type: str
     type: str = 'model'
     layers: list[dict] | None = None
+    compile_mode: str | None = None
@@ -0,0 +1,188 @@
+import os
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Content-addressed store for node embeddings, kept outside graph.json.
+
+    Each embedding type (e.g. 'clap', 'clip') is a fixed-width row-major matrix in
+    '<type>.bin' (float16 by default) plus a '<type>.json' index mapping content keys
+    to row numbers. Rows are appended or overwritten in place and read back through a
+    memory map, so the graph itself only stores the key. Rows no longer referenced are
+    dropped by rewriting the data file (see schedule_removal), which the graph does when
+    it compacts.
+    """
+    def __init__(self, root, dtype: str = None):
+        self.root = Path(root)
+        self.dtype = np.dtype(dtype or os.environ.get("EMBEDDING_STORE_DTYPE", "float16"))
+        self._indexes = {}
+        self._dirty = set()
+        self._mmaps = {}
+        # Type -> keys to drop on the next remove_scheduled(); writing a key unschedules it
+        self._scheduled = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, embedding_type: str) -> tuple[Path, Path]:
+        # A rewritten data file gets a new name, recorded in the index, so that replacing
+        # the index is the single step that switches over to it
+        data_file = self._index(embedding_type).get("file", f"{embedding_type}.bin")
+        return self.root / data_file, self.root / f"{embedding_type}.json"
+
+    def types(self) -> list[str]:
+        """Returns the embedding types that have an index on disk or in memory."""
+        # Skips the '<type>.index.json' manifests of the similarity indexes kept alongside
+        on_disk = [p.stem for p in self.root.glob("*.json") if "." not in p.stem] if self.root.exists() else []
+        return list(dict.fromkeys(on_disk + list(self._indexes)))
+
+    def _index(self, embedding_type: str) -> dict:
+        if embedding_type not in self._indexes:
+            index_path = self.root / f"{embedding_type}.json"
+            if index_path.exists():
+                with open(index_path, 'r') as f:
+                    self._indexes[embedding_type] = json.load(f)
+            else:
+                self._indexes[embedding_type] = {"dim": None, "dtype": self.dtype.name, "rows": {}}
+        return self._indexes[embedding_type]
+
+    def _matrix(self, embedding_type: str, mode: str = 'r'):
+        index = self._index(embedding_type)
+        data_path, _ = self._paths(embedding_type)
+        if not index["dim"] or not data_path.exists():
+            return None
+        dtype = np.dtype(index["dtype"])
+        n_rows = data_path.stat().st_size // (dtype.itemsize * index["dim"])
+        if n_rows == 0:
+            return None
+
+        cached = self._mmaps.get(embedding_type)
+        if mode == 'r' and cached is not None and cached.shape[0] == n_rows:
+            return cached
+        matrix = np.memmap(data_path, dtype=dtype, mode=mode, shape=(n_rows, index["dim"]))
+        if mode == 'r':
+            self._mmaps[embedding_type] = matrix
+        return matrix
+
+    def has(self, embedding_type: str, key: str) -> bool:
+        return key in self._index(embedding_type)["rows"]
+
+    def keys(self, embedding_type: str) -> list[str]:
+        return list(self._index(embedding_type)["rows"].keys())
+
+    def put(self, embedding_type: str, key: str, vector):
+        self.put_many(embedding_type, [key], np.asarray(vector).reshape(1, -1))
+
+    def put_many(self, embedding_type: str, keys: list[str], vectors):
+        """Writes embeddings for the given keys, overwriting rows that already exist."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        if not keys:
+            return
+
+        with self._lock:
+            index = self._index(embedding_type)
+            if index["dim"] is None:
+                index["dim"] = vectors.shape[1]
+            elif index["dim"] != vectors.shape[1]:
+                raise ValueError(f"Embedding dimension mismatch for '{embedding_type}': expected {index['dim']}, got {vectors.shape[1]}.")
+
+            dtype = np.dtype(index["dtype"])
+            data_path, _ = self._paths(embedding_type)
+            self.root.mkdir(parents=True, exist_ok=True)
+
+            # Overwrite existing rows in place
+            existing = [(i, index["rows"][k]) for i, k in enumerate(keys) if k in index["rows"]]
+            if existing:
+                matrix = self._matrix(embedding_type, mode='r+')
+                for i, row in existing:
+                    matrix[row] = vectors[i].astype(dtype)
+                matrix.flush()
+                del matrix
+
+            # Append new rows at the end of the data file
+            new = [(i, k) for i, k in enumerate(keys) if k not in index["rows"]]
+            if new:
+                n_rows = data_path.stat().st_size // (dtype.itemsize * index["dim"]) if data_path.exists() else 0
+                with open(data_path, 'ab') as f:
+                    f.write(vectors[[i for i, _ in new]].astype(dtype).tobytes())
+                for offset, (_, k) in enumerate(new):
+                    index["rows"][k] = n_rows + offset
+
+            self._mmaps.pop(embedding_type, None)
+            self._dirty.add(embedding_type)
+            self._scheduled.get(embedding_type, set()).difference_update(keys)
+
+    def get(self, embedding_type: str, key: str) -> np.ndarray | None:
+        row = self._index(embedding_type)["rows"].get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix(embedding_type)[row], dtype=np.float32)
+
+    def get_many(self, embedding_type: str, keys: list[str]) -> np.ndarray:
+        """Returns a float32 matrix with one row per key. All keys must be present."""
+        rows = self._index(embedding_type)["rows"]
+        matrix = self._matrix(embedding_type)
+        if matrix is None or not keys:
+            return np.zeros((0, self._index(embedding_type)["dim"] or 0), dtype=np.float32)
+        return np.asarray(matrix[[rows[k] for k in keys]], dtype=np.float32)
+
+    def flush(self):
+        """Atomically persists the key indexes of every type written since the last flush."""
+        with self._lock:
+            for embedding_type in list(self._dirty):
+                _, index_path = self._paths(embedding_type)
+                tmp_path = index_path.with_suffix(".json.tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._indexes[embedding_type], f)
+                os.replace(tmp_path, index_path)
+            self._dirty.clear()
+
+    def schedule_removal(self, unreferenced: dict):
+        """
+        Marks keys ({type: keys}) to be dropped by the next remove_scheduled(), replacing
+        what was scheduled before. Keys written in between are kept.
+        """
+        with self._lock:
+            self._scheduled = {t: set(keys) for t, keys in unreferenced.items() if keys}
+
+    def remove_scheduled(self):
+        """
+        Drops the scheduled keys, rewriting the data file of each affected type with only
+        the remaining rows. The new index is swapped in atomically before the old file is
+        deleted, so a crash leaves either the old or the new state (plus a stray file).
+        """
+        with self._lock:
+            scheduled, self._scheduled = self._scheduled, {}
+            for embedding_type, keys in scheduled.items():
+                index = self._index(embedding_type)
+                if not any(k in index["rows"] for k in keys):
+                    continue
+                kept = sorted((row, k) for k, row in index["rows"].items() if k not in keys)
+                old_path, index_path = self._paths(embedding_type)
+                generation = index.get("generation", 0) + 1
+                new_path = self.root / f"{embedding_type}.{generation}.bin"
+
+                matrix = self._matrix(embedding_type)
+                with open(new_path, 'wb') as f:
+                    if kept:
+                        f.write(np.ascontiguousarray(matrix[[row for row, _ in kept]]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                del matrix
+                self._mmaps.pop(embedding_type, None)
+
+                new_index = {
+                    **index, "file": new_path.name, "generation": generation,
+                    "rows": {k: i for i, (_, k) in enumerate(kept)},
+                }
+                tmp_path = index_path.with_suffix(".json.tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump(new_index, f)
+                os.replace(tmp_path, index_path)
+                self._indexes[embedding_type] = new_index
+                self._dirty.discard(embedding_type)
+                old_path.unlink(missing_ok=True)
+                print(f"Dropped {len(index['rows']) - len(kept)} unreferenced '{embedding_type}' embedding(s).")
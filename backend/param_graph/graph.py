@@ -1,5 +1,9 @@
 import os
 import json
+import threading
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
 from time import time
 
@@ -9,69 +13,335 @@ from utils.filesystem import check_dir
 from .const import *
 from .elements.base_elements import GraphElement
 from .registry import resolve_element
+from .embedding_store import EmbeddingStore
+from .change_log import TrackedDiGraph, WriteAheadLog
+from .sqlite_store import SQLiteGraphStore
+from .views import ElementView
+from utils.similarity_index import SimilarityIndex
 
 DEFAULT_SR = 48000
+# Left out of graph reads unless requested: bulky, and served by their own endpoints
+HEAVY_FIELDS = ("embeddings", "embedding_windows", "layers")
+# Kept by every field projection since the graph view needs them to place a node
+CORE_FIELDS = ("id", "type", "name", "parent")
+
+
+def _cytoscape_node(n, attrs: dict) -> dict:
+    """A single node in the format of nx.cytoscape_data(ident='id')."""
+    data = dict(attrs)
+    data["id"] = attrs.get("id") or str(n)
+    data["value"] = n
+    data["name"] = attrs.get("name") or str(n)
+    return {"data": data}
+
+
+def _cytoscape_edge(u, v, attrs: dict) -> dict:
+    return {"data": {**attrs, "source": u, "target": v}}
+
+
+def _projection(fields: list[str] = None, exclude: tuple = HEAVY_FIELDS):
+    """Returns a function that cuts a node's attributes down to the requested fields."""
+    if fields is not None:
+        keep = set(fields) | set(CORE_FIELDS)
+        return lambda attrs: {k: v for k, v in attrs.items() if k in keep}
+    drop = set(exclude or ())
+    if drop:
+        return lambda attrs: {k: v for k, v in attrs.items() if k not in drop}
+    return lambda attrs: attrs
+
 
 class ParameterGraph:
-    def __init__(self, data_path, backend=None) -> None:
+    def __init__(self, data_path, backend=None, storage=None) -> None:
         self.root = Path(data_path)
         self.backend = backend
-        self.G = nx.DiGraph()
+        self.G = TrackedDiGraph()
         self.project_name = None
+        self.embeddings = EmbeddingStore(self.root / EMBEDDINGS_DIR)
+        self.similarity_indexes = {}
+        # Group type -> nodes whose similarity springs pointed at a removed node; the next
+        # incremental similarity update re-queries them
+        self.similarity_orphans = {}
+
+        # Saves append the changed elements to a write-ahead log; graph.json is only
+        # rewritten when the log is compacted
+        self.wal = WriteAheadLog(self.root / WAL_FILE)
+        self.use_wal = os.environ.get("GRAPH_WAL", "true").lower() == "true"
+        self.wal_compact_bytes = int(os.environ.get("GRAPH_WAL_COMPACT_BYTES", 32 * 1024 * 1024))
+        self.wal_compact_records = int(os.environ.get("GRAPH_WAL_COMPACT_RECORDS", 1000))
+
+        # Existing projects keep the format found on disk; GRAPH_STORAGE picks it for new ones
+        self.store = SQLiteGraphStore(self.root / DB_FILE)
+        if storage is None:
+            if self.store.exists():
+                storage = "sqlite"
+            elif (self.root / DICT_FILE).exists():
+                storage = "json"
+            else:
+                storage = os.environ.get("GRAPH_STORAGE", "json").lower()
+        self.storage = storage
+        self._write_lock = threading.Lock()
 
     # IO functions
     def load(self) -> bool:
         check_dir(self.root)
 
         data_path = self.root / DICT_FILE
-        if os.path.exists(data_path):
+        if self.storage == "sqlite":
+            if not self.store.exists():
+                return False
+            self.project_name, self.G = self.store.load()
+        elif os.path.exists(data_path):
             with open(data_path, 'r') as df:
                 data = json.load(df)
-                self.project_name = data['project_name']
-                self.G = nx.cytoscape.cytoscape_graph(data['graph'])
-                
-                # Clean up legacy edge nodes that were added as nodes
-                legacy_edge_nodes = [
-                    n for n, d in self.G.nodes(data=True) if d.get('type') == 'edge'
-                ]
-                if legacy_edge_nodes:
-                    self.G.remove_nodes_from(legacy_edge_nodes)
-
-                # Ensure all model nodes have output_type populated
-                for node, d in self.G.nodes(data=True):
-                    if d.get('type') == 'model':
-                        if 'output_type' not in d:
-                            adapter = d.get('adapter')
-                            if adapter == 'stable_audio_tools':
-                                d['output_type'] = 'audio'
-                            elif adapter == 'stylegan2':
-                                d['output_type'] = 'image'
-            return True
-        return False
-
-    def save(self):
+            self.project_name = data['project_name']
+            self.G = TrackedDiGraph(nx.cytoscape.cytoscape_graph(data['graph']))
+
+            # Re-apply changes saved after the last snapshot
+            replayed = self.wal.replay(self.G, data.get('wal_seq', 0))
+            if replayed:
+                print(f"Replayed {replayed} change record(s) from {WAL_FILE}.")
+            self.G.tracker.reset()
+        else:
+            return False
+        # Revisions start after the loaded state
+        self.G.revisions.truncate()
+
+        # Clean up legacy edge nodes that were added as nodes
+        legacy_edge_nodes = [
+            n for n, d in self.G.nodes(data=True) if d.get('type') == 'edge'
+        ]
+        if legacy_edge_nodes:
+            self.G.remove_nodes_from(legacy_edge_nodes)
+
+        # Ensure all model nodes have output_type populated
+        for node, d in self.G.nodes(data=True):
+            if d.get('type') == 'model':
+                if 'output_type' not in d:
+                    adapter = d.get('adapter')
+                    if adapter == 'stable_audio_tools':
+                        d['output_type'] = 'audio'
+                    elif adapter == 'stylegan2':
+                        d['output_type'] = 'image'
+
+        # Move legacy inline embedding lists into the embedding store
+        migrated = 0
+        for node, d in self.G.nodes(data=True):
+            if any(isinstance(v, list) for v in (d.get('embeddings') or {}).values()):
+                self._intern_embeddings(node, d)
+                migrated += 1
+        if migrated:
+            print(f"Moved embeddings of {migrated} node(s) into the embedding store.")
+            self.embeddings.flush()
+        return True
+
+    def save(self, compact: bool = False):
+        """
+        Persists the graph. With SQLite storage the changed rows are written in one
+        transaction. Otherwise changes since the last save are appended to the write-ahead
+        log; the full graph.json snapshot is only rewritten when compacting, i.e. when
+        forced, when the log grew past its limits or when no snapshot exists yet.
+        """
+        write = self.prepare_save(compact)
+        if write is not None:
+            write()
+
+    def compact(self):
+        """Atomically rewrites the whole stored graph (and empties the write-ahead log)."""
+        self.save(compact=True)
+
+    def prepare_save(self, compact: bool = False):
+        """
+        The part of save() that needs the graph to hold still: flushes the embedding store,
+        captures what has to be written and resets the change tracker. Returns a function
+        that does the disk writes and may run after the graph lock was released (None if
+        there is nothing to write). Writes always run in the order they were prepared.
+        """
         check_dir(self.root)
         data_path = self.root / DICT_FILE
+        self._write_lock.acquire()
+        try:
+            # Persist the embedding index first so the graph never references missing rows
+            self.embeddings.flush()
+            for embedding_type, index in self.similarity_indexes.items():
+                if index.dirty:
+                    index.save(self.root / EMBEDDINGS_DIR / f"{embedding_type}.index")
 
-        # Write new json
-        with open(data_path, 'w') as df:
+            tracker = self.G.tracker
+            project_name = self.project_name
+            if self.storage != "sqlite":
+                compact = (
+                    compact or not self.use_wal or tracker.cleared or not data_path.exists()
+                    or self.wal.records >= self.wal_compact_records
+                    or self.wal.size() >= self.wal_compact_bytes
+                )
+
+            write = None
+            rewrite = compact or tracker.cleared
+            if rewrite:
+                # Shallow copies are enough: attribute values are replaced, never mutated in place
+                nodes = [(n, dict(attrs)) for n, attrs in self.G.nodes(data=True)]
+                edges = [(u, v, dict(attrs)) for u, v, attrs in self.G.edges(data=True)]
+                if self.storage == "sqlite":
+                    write = lambda: self.store.write_all(nodes, edges, project_name)
+                else:
+                    wal_seq = self.wal.seq
+                    write = lambda: self._write_snapshot(nodes, edges, project_name, wal_seq)
+                # Embeddings of removed nodes or replaced audio are dropped once the rewritten
+                # graph no longer references them
+                self.embeddings.schedule_removal(self._unreferenced_embeddings())
+            elif self.storage == "sqlite":
+                changes = tracker.collect(self.G)
+                write = lambda: self.store.write_changes(changes, project_name)
+            elif tracker:
+                record = self.wal.prepare(tracker.collect(self.G))
+                write = lambda: self.wal.write(record)
+            tracker.reset()
+        except Exception:
+            self._write_lock.release()
+            raise
+
+        if write is None:
+            self._write_lock.release()
+            return None
+
+        def run():
+            try:
+                write()
+                if rewrite:
+                    self.embeddings.remove_scheduled()
+            except Exception:
+                # The captured changes are lost to the tracker, so the next save rewrites everything
+                self.G.tracker.cleared = True
+                raise
+            finally:
+                self._write_lock.release()
+        return run
+
+    def _unreferenced_embeddings(self) -> dict:
+        """Returns {type: keys} of the embedding store entries that no node references."""
+        referenced = {}
+        for _, attrs in self.G.nodes(data=True):
+            for embedding_type, key in (attrs.get('embeddings') or {}).items():
+                # Legacy inline vectors are only interned on load
+                if isinstance(key, str):
+                    referenced.setdefault(embedding_type, set()).add(key)
+            for embedding_type, info in (attrs.get('embedding_windows') or {}).items():
+                referenced.setdefault(f"{embedding_type}_windows", set()).update(
+                    f"{info['key']}#{n}" for n in range(len(info['starts']))
+                )
+        return {
+            embedding_type: [k for k in self.embeddings.keys(embedding_type) if k not in referenced.get(embedding_type, ())]
+            for embedding_type in self.embeddings.types()
+        }
+
+    def _write_snapshot(self, nodes: list, edges: list, project_name: str, wal_seq: int):
+        data_path = self.root / DICT_FILE
+        snapshot = nx.DiGraph()
+        snapshot.add_nodes_from(nodes)
+        snapshot.add_edges_from(edges)
+        tmp_path = data_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as df:
             data = {
-                'project_name': self.project_name,
-                'graph': nx.cytoscape.cytoscape_data(self.G, ident='id'),
+                'project_name': project_name,
+                'wal_seq': wal_seq,
+                'graph': nx.cytoscape.cytoscape_data(snapshot, ident='id'),
             }
             df.write(json.dumps(data, indent=4))
+            df.flush()
+            os.fsync(df.fileno())
+        os.replace(tmp_path, data_path)
+
+        # Records up to wal_seq are now in the snapshot, so a crash before this point is harmless
+        self.wal.truncate()
 
     def to_json(self, mode='batch'):
         if mode == 'batch':
             return nx.cytoscape.cytoscape_data(self.G, ident='id')
         elif mode == 'cluster':
             C = nx.DiGraph()
-            for node, data in self.G.nodes(data=True):
-                if data['type'] == 'audio':
-                    C.add_node(node, **data)
-                    C.nodes[node].pop('parent', None)
+            for node in self.find_nodes(type='audio'):
+                C.add_node(node, **self.G.nodes[node])
+                C.nodes[node].pop('parent', None)
             return nx.cytoscape.cytoscape_data(C, ident='id')
         
+    def query(self, types: list[str] = None, parent: str = None, name: str = None, ids: list[str] = None,
+              fields: list[str] = None, exclude: tuple = HEAVY_FIELDS, limit: int = None, cursor: str = None,
+              edges: bool = True) -> dict:
+        """
+        Returns the matching part of the graph in the cytoscape format of to_json().
+
+        Nodes are selected by ID, or by type(s), parent and name through the secondary indexes.
+        fields limits node attributes to the given ones (plus CORE_FIELDS); otherwise the
+        attributes in exclude are dropped. With a limit the nodes are paged by ID: pass the
+        returned next_cursor to get the following page. Edges are returned with the page of
+        their source node, and only if their target is selected as well.
+        """
+        if ids is not None:
+            selected = [n for n in ids if n in self.G]
+        elif types:
+            selected = list(dict.fromkeys(n for t in types for n in self.find_nodes(type=t, parent=parent, name=name)))
+        else:
+            selected = self.find_nodes(parent=parent, name=name)
+        filtered = ids is not None or bool(types) or parent is not None or name is not None
+
+        page, next_cursor = selected, None
+        if limit is not None or cursor is not None:
+            # Keyset pagination: pages stay stable while nodes are added or removed
+            page = sorted(selected)
+            if cursor is not None:
+                page = page[bisect_right(page, cursor):]
+            if limit is not None and len(page) > limit:
+                page = page[:limit]
+                next_cursor = page[-1]
+
+        project = _projection(fields, exclude)
+        nodes = [_cytoscape_node(n, project(self.G.nodes[n])) for n in page]
+
+        edge_elements = []
+        if edges:
+            targets = set(selected) if filtered else None
+            for u in page:
+                for v, attrs in self.G.succ[u].items():
+                    if targets is None or v in targets:
+                        edge_elements.append(_cytoscape_edge(u, v, attrs))
+
+        return {
+            "data": [],
+            "directed": True,
+            "multigraph": False,
+            "elements": {"nodes": nodes, "edges": edge_elements},
+            "total": len(selected),
+            "next_cursor": next_cursor,
+        }
+
+    def changes_since(self, revision: int, epoch: str = None, fields: list[str] = None,
+                      exclude: tuple = HEAVY_FIELDS) -> dict:
+        """
+        Returns the nodes and edges (in the cytoscape element format of to_json) that changed
+        after the given revision plus the keys of removed ones. If the revision can't be
+        answered incrementally (too old, or of another epoch, i.e. an earlier load), the
+        whole graph is returned instead with full=True. Node attributes are projected with
+        fields / exclude as in query().
+        """
+        log = self.G.revisions
+        response = {"epoch": log.epoch, "revision": log.revision}
+        changes = log.since(revision) if epoch in (None, log.epoch) else None
+        if changes is None:
+            return {**response, "full": True, "graph_data": self.query(fields=fields, exclude=exclude)}
+
+        # Nodes and edges written through a stale attribute dict may be gone already
+        nodes = [n for n in changes["nodes"] if n in self.G]
+        project = _projection(fields, exclude)
+        edges = [e for e in changes["edges"] if self.G.has_edge(*e)]
+        return {
+            **response,
+            "full": False,
+            "nodes": [_cytoscape_node(n, project(self.G.nodes[n])) for n in nodes],
+            "edges": [_cytoscape_edge(u, v, self.G.edges[u, v]) for u, v in edges],
+            "removed_nodes": changes["removed_nodes"] + [n for n in changes["nodes"] if n not in self.G],
+            "removed_edges": [list(e) for e in changes["removed_edges"]] + [list(e) for e in changes["edges"] if not self.G.has_edge(*e)],
+        }
+
     def add_element(self, ele: GraphElement):
         ele_attrs = ele.to_dict()
         if ele_attrs.get('type') == 'model' and not ele_attrs.get('output_type'):
@@ -81,8 +351,113 @@ class ParameterGraph:
             elif adapter == 'stylegan2':
                 ele_attrs['output_type'] = 'image'
         ele_id = ele_attrs.get('id', None)
+        self._intern_embeddings(ele_id, ele_attrs)
         self.G.add_node(ele_id, **ele_attrs)
 
+    def add_elements(self, elements: list[GraphElement], attrs: dict = None):
+        """Adds many elements in one transaction, optionally setting the same extra attributes (e.g. parent) on each."""
+        with self.transaction():
+            for ele in elements:
+                self.add_element(ele)
+                if attrs:
+                    self.update_element(ele.id, attrs)
+
+    def _embedding_key(self, id: str, attrs: dict) -> str:
+        """Embeddings are keyed by the content UID of the node's file, falling back to the node ID."""
+        file_info = attrs.get('file')
+        if isinstance(file_info, dict) and file_info.get('uid'):
+            return file_info['uid']
+        return id
+
+    def _intern_embeddings(self, id: str, attrs: dict):
+        """Replaces inline embedding vectors in node attributes with references into the store."""
+        embeddings = attrs.get('embeddings')
+        if not embeddings:
+            return
+        refs = {}
+        for embedding_type, value in embeddings.items():
+            if isinstance(value, str):
+                refs[embedding_type] = value
+            elif value is not None:
+                key = self._embedding_key(id, attrs)
+                self.embeddings.put(embedding_type, key, value)
+                refs[embedding_type] = key
+        attrs['embeddings'] = refs
+
+    def set_embedding(self, id: str, embedding_type: str, vector):
+        """Stores an embedding for a node and records the reference on the node."""
+        node_attrs = self.G.nodes[id]
+        key = self._embedding_key(id, node_attrs)
+        self.embeddings.put(embedding_type, key, vector)
+        node_attrs['embeddings'] = {**(node_attrs.get('embeddings') or {}), embedding_type: key}
+
+        # The key may be unchanged when a vector is recomputed, so let the index re-fetch it
+        index = self.similarity_indexes.get(embedding_type)
+        if index is not None:
+            index.invalidate([id])
+
+    def get_embedding(self, id: str, embedding_type: str):
+        """Returns a node's embedding as a float32 numpy array, or None if it has none."""
+        key = (self.G.nodes[id].get('embeddings') or {}).get(embedding_type)
+        if key is None:
+            return None
+        return self.embeddings.get(embedding_type, key)
+
+    def set_window_embeddings(self, id: str, embedding_type: str, starts: list[float], window_seconds: float | None, matrix):
+        """
+        Stores per-window embeddings of a node (e.g. a long audio file) as rows of the
+        '<type>_windows' store, keyed '<key>#<n>', and records their start times on the node.
+        """
+        node_attrs = self.G.nodes[id]
+        key = self._embedding_key(id, node_attrs)
+        self.embeddings.put_many(f"{embedding_type}_windows", [f"{key}#{n}" for n in range(len(starts))], matrix)
+        node_attrs['embedding_windows'] = {
+            **(node_attrs.get('embedding_windows') or {}),
+            embedding_type: {"key": key, "starts": [round(float(t), 3) for t in starts], "window_seconds": window_seconds},
+        }
+
+    def get_window_embeddings(self, id: str, embedding_type: str):
+        """Returns (start times in seconds, float32 matrix) of a node's window embeddings, or None."""
+        info = (self.G.nodes[id].get('embedding_windows') or {}).get(embedding_type)
+        if not info:
+            return None
+        keys = [f"{info['key']}#{n}" for n in range(len(info['starts']))]
+        return info['starts'], self.embeddings.get_many(f"{embedding_type}_windows", keys)
+
+    def get_embedding_matrix(self, ids: list[str], embedding_type: str):
+        """Returns the (ids, matrix) of the given nodes that have an embedding of this type."""
+        present = [(i, (self.G.nodes[i].get('embeddings') or {}).get(embedding_type)) for i in ids]
+        present = [(i, key) for i, key in present if key is not None and self.embeddings.has(embedding_type, key)]
+        return [i for i, _ in present], self.embeddings.get_many(embedding_type, [key for _, key in present])
+
+    def get_similarity_index(self, embedding_type: str, ids: list[str]):
+        """
+        Returns (index, changed, removed) for an embedding type, with the index synced to the
+        given nodes. The index is loaded from disk on first use (or built from the embedding
+        store) and afterwards only receives the nodes that were added, changed or removed
+        since; changed and removed list the IDs this call added or updated and dropped.
+        """
+        present = [(i, (self.G.nodes[i].get('embeddings') or {}).get(embedding_type)) for i in ids]
+        present = [(i, key) for i, key in present if key is not None and self.embeddings.has(embedding_type, key)]
+        if not present:
+            return None, [], []
+        keys = dict(present)
+        dim = self.embeddings.get(embedding_type, present[0][1]).shape[0]
+
+        index = self.similarity_indexes.get(embedding_type)
+        if index is None:
+            index = SimilarityIndex.load(self.root / EMBEDDINGS_DIR / f"{embedding_type}.index")
+        if index is None or index.dim != dim:
+            index = SimilarityIndex(dim)
+        self.similarity_indexes[embedding_type] = index
+
+        changed, removed = index.sync(
+            [i for i, _ in present],
+            [key for _, key in present],
+            lambda changed: self.embeddings.get_many(embedding_type, [keys[i] for i in changed])
+        )
+        return index, changed, removed
+
     def link(self, source: GraphElement, target: GraphElement, **kwargs):
         edge_id = f"{source.id}->{target.id}"
         edge_attrs = {"type": source.type, "id": edge_id}
@@ -105,6 +480,26 @@ class ParameterGraph:
         attrs = self.G.nodes[id].copy()
         return resolve_element(attrs)
 
+    def view(self, id: str) -> ElementView:
+        """Returns a read-only view of a node's attributes, without building its dataclass."""
+        if not self.G.has_node(id):
+            raise ValueError(f"Node '{id}' not found in the graph.")
+        return ElementView(id, self.G.nodes[id])
+
+    def views(self, ids=None, type: str = None, parent: str = None, name: str = None):
+        """
+        Yields read-only views of the given nodes (missing IDs are skipped), or of the
+        nodes matching the attribute filters. Use these for bulk reads and get_element()
+        when the element is going to be modified.
+        """
+        nodes = self.G.nodes
+        if ids is None:
+            ids = self.find_nodes(type=type, parent=parent, name=name)
+        for n in ids:
+            attrs = nodes.get(n)
+            if attrs is not None:
+                yield ElementView(n, attrs)
+
     def get_path_from_id(self, id: str, relative=False):
         if self.G.has_node(id):
             node_data = self.G.nodes[id]
@@ -138,19 +533,97 @@ class ParameterGraph:
     def update_element(self, id: str, attrs: dict):
         if self.G.has_node(id):
             node_attrs = self.G.nodes[id]
+            if attrs.get('embeddings'):
+                merged = {**node_attrs, **attrs}
+                self._intern_embeddings(id, merged)
+                attrs = {**attrs, 'embeddings': merged['embeddings']}
             node_attrs.update(attrs)
 
+    def update_elements(self, updates: dict):
+        """Applies {id: attrs} updates in one transaction; unknown IDs are skipped like in update_element()."""
+        with self.transaction():
+            for id, attrs in updates.items():
+                self.update_element(id, attrs)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups graph changes into one atomic step: if the block raises, every node and
+        edge it touched is restored. Index updates are applied once per node and all the
+        changes share one revision. Hold graph_lock for the whole block and save after it;
+        nested transactions join the outermost one. Interned embeddings are not undone.
+        """
+        G = self.G
+        G.begin()
+        try:
+            yield self
+        except BaseException:
+            G.rollback()
+            raise
+        G.commit()
+
+    # Indexed lookups
+    def find_nodes(self, type: str = None, parent: str = None, name: str = None) -> list[str]:
+        """Returns the IDs of nodes matching every given attribute, from the graph's secondary indexes."""
+        return self.G.index.find(type=type, parent=parent, name=name)
+
+    def children(self, id: str) -> list[str]:
+        """Returns the IDs of the nodes whose parent is the given node."""
+        return self.G.index.get('parent', id)
+
     # Remove element (and children recursively)
-    def remove_element(self, id: str):
-        to_remove = {id}
-        
-        while True:
-            added = False
-            for node, data in self.G.nodes(data=True):
-                if node not in to_remove and data.get('parent') in to_remove:
-                    to_remove.add(node)
-                    added = True
-            if not added:
-                break
-
-        self.G.remove_nodes_from(to_remove)
+    def remove_element(self, id: str, keep_children: bool = False) -> list[str]:
+        return self.remove_elements([id], keep_children)
+
+    def remove_elements(self, ids, keep_children: bool = False) -> list[str]:
+        """
+        Removes the given elements in one transaction, together with all their descendants
+        (walked breadth-first through the parent index), or, with keep_children, detaches
+        their children (and batch members) instead. The removed nodes are dropped from the
+        member_ids of the batches that held them; returns the IDs of those batches.
+        """
+        with self.transaction():
+            nodes = self.G.nodes
+            roots = [id for id in dict.fromkeys(ids) if id in nodes]
+            to_remove = dict.fromkeys(roots)
+
+            if keep_children:
+                for id in roots:
+                    attrs = nodes[id]
+                    detached = self.children(id)
+                    if attrs.get('type') == 'batch':
+                        detached += attrs.get('member_ids') or []
+                    for child in detached:
+                        if child not in to_remove and child in nodes:
+                            self.update_element(child, {"parent": None, "alias": None})
+            else:
+                frontier = deque(roots)
+                while frontier:
+                    for child in self.children(frontier.popleft()):
+                        if child not in to_remove:
+                            to_remove[child] = None
+                            frontier.append(child)
+
+            # Members point at their batch through 'parent', so only those batches need checking
+            batches = {}
+            for n in to_remove:
+                parent = nodes[n].get('parent')
+                if parent is not None and parent not in to_remove and parent in nodes and nodes[parent].get('type') == 'batch':
+                    batches[parent] = None
+            updated_batches = []
+            for batch_id in batches:
+                attrs = nodes[batch_id]
+                member_ids = attrs.get('member_ids') or []
+                kept = [m for m in member_ids if m not in to_remove]
+                if len(kept) != len(member_ids):
+                    attrs['member_ids'] = kept
+                    updated_batches.append(batch_id)
+
+            # Nodes whose similarity springs pointed at a removed node lose a neighbour
+            for n in to_remove:
+                for u, attrs in self.G.pred[n].items():
+                    if attrs.get('type') == 'spring' and u not in to_remove:
+                        self.similarity_orphans.setdefault(attrs.get('group'), set()).add(u)
+
+            self.G.remove_nodes_from(to_remove)
+            return updated_batches
@@ -0,0 +1,99 @@
+INDEXED_FIELDS = ("parent", "type", "name")
+
+
+class NodeIndex:
+    """
+    Secondary indexes over node attributes: for each indexed field a map from value to
+    the IDs of the nodes holding it, kept in insertion order. Only string values are
+    indexed. The owning graph calls update() whenever a node's attributes change and
+    remove() when it is deleted, so lookups cost O(result) instead of a full scan.
+    After defer(), changes are only noted and applied once per node at the next lookup
+    (or resume()), so bulk edits don't re-index a node on every attribute write.
+    """
+    def __init__(self, fields: tuple = INDEXED_FIELDS):
+        self.fields = tuple(fields)
+        self.maps = {field: {} for field in self.fields}
+        self.values = {}  # node ID -> tuple of its indexed values
+        self.pending = None  # node ID -> attrs (None if removed) while deferred
+
+    def defer(self):
+        if self.pending is None:
+            self.pending = {}
+
+    def resume(self):
+        self._apply_pending()
+        self.pending = None
+
+    def _apply_pending(self):
+        if self.pending:
+            pending, self.pending = self.pending, {}
+            for n, attrs in pending.items():
+                if attrs is None:
+                    self._remove(n)
+                else:
+                    self._update(n, attrs)
+
+    def _extract(self, attrs) -> tuple:
+        return tuple(value if isinstance(value, str) else None for value in (attrs.get(field) for field in self.fields))
+
+    def update(self, n, attrs):
+        if self.pending is not None:
+            self.pending[n] = attrs
+        else:
+            self._update(n, attrs)
+
+    def remove(self, n):
+        if self.pending is not None:
+            self.pending[n] = None
+        else:
+            self._remove(n)
+
+    def _update(self, n, attrs):
+        new = self._extract(attrs)
+        old = self.values.get(n)
+        if old == new:
+            return
+        for field, old_value, new_value in zip(self.fields, old or (None,) * len(self.fields), new):
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                self._discard(field, old_value, n)
+            if new_value is not None:
+                self.maps[field].setdefault(new_value, {})[n] = None
+        self.values[n] = new
+
+    def _remove(self, n):
+        old = self.values.pop(n, None)
+        if old is None:
+            return
+        for field, value in zip(self.fields, old):
+            if value is not None:
+                self._discard(field, value, n)
+
+    def _discard(self, field, value, n):
+        ids = self.maps[field].get(value)
+        if ids is not None:
+            ids.pop(n, None)
+            if not ids:
+                del self.maps[field][value]
+
+    def clear(self):
+        self.maps = {field: {} for field in self.fields}
+        self.values = {}
+        if self.pending is not None:
+            self.pending = {}
+
+    def get(self, field: str, value) -> list:
+        """Returns the IDs of the nodes whose field equals value."""
+        self._apply_pending()
+        return list(self.maps[field].get(value, ()))
+
+    def find(self, **criteria) -> list:
+        """Returns the IDs of the nodes matching every given field=value pair (None means any)."""
+        self._apply_pending()
+        criteria = {field: value for field, value in criteria.items() if value is not None}
+        if not criteria:
+            return list(self.values)
+        candidates = sorted((self.maps[field].get(value, {}) for field, value in criteria.items()), key=len)
+        first, rest = candidates[0], candidates[1:]
+        return [n for n in first if all(n in ids for ids in rest)]
@@ -1,4 +1,5 @@
-from typing import Dict, Type, Any, get_type_hints
+from typing import Dict, Tuple, Type, Any, Union, get_type_hints, get_origin, get_args
+from types import UnionType
 import inspect
 
 
@@ -39,57 +40,55 @@ def get_key_from_attrs(attrs: Dict[str, Any]) -> str:
         # For all other elements, the 'type' field is the key
         return node_type
     
+def _nested_class(param_type) -> Type[Any] | None:
+    """The class a dict value of this annotation is turned into: the type itself, or the first class of a Union."""
+    if param_type is None:
+        return None
+    if inspect.isclass(param_type):
+        return param_type
+    origin = get_origin(param_type)
+    if origin is Union or origin is UnionType:
+        for arg in get_args(param_type):
+            if inspect.isclass(arg) and arg is not type(None):
+                return arg
+    return None
+
+
+# Class -> ((constructor parameter, nested class or None), ...), compiled on first use
+_SCHEMAS: Dict[Type[Any], Tuple[Tuple[str, Any], ...]] = {}
+
+def _schema(cls: Type[Any]) -> Tuple[Tuple[str, Any], ...]:
+    schema = _SCHEMAS.get(cls)
+    if schema is None:
+        # Get constructor signature and type hints for the target class
+        sig = inspect.signature(cls)
+        try:
+            type_hints = get_type_hints(cls)
+        except (NameError, TypeError):
+            type_hints = {} # Fallback if hints can't be resolved
+        schema = tuple((name, _nested_class(type_hints.get(name))) for name in sig.parameters)
+        _SCHEMAS[cls] = schema
+    return schema
+
 def resolve_element(attrs: Dict[str, Any]) -> Type[Any]:
     # Determine the correct class and instantiate it
     key = get_key_from_attrs(attrs)
     TargetClass = get_class(key)
 
-    # Get constructor signature and type hints for the target class
-    sig = inspect.signature(TargetClass)
-    try:
-        type_hints = get_type_hints(TargetClass)
-    except (NameError, TypeError):
-        type_hints = {} # Fallback if hints can't be resolved
-
     constructor_attrs = {}
-    for param_name in sig.parameters:
+    for param_name, target_class in _schema(TargetClass):
         if param_name in attrs:
             value = attrs[param_name]
-            param_type = type_hints.get(param_name)
-
-            # Determine target class, handling Union types (like Class | None)
-            target_class = None
-            if param_type is not None:
-                if inspect.isclass(param_type):
-                    target_class = param_type
-                else:
-                    # Check if it is a Union type
-                    from typing import get_origin, get_args, Union
-                    import sys
-                    try:
-                        from types import UnionType
-                    except ImportError:
-                        UnionType = None
-
-                    origin = get_origin(param_type)
-                    is_union = origin is Union or (UnionType is not None and origin is UnionType)
-                    if is_union:
-                        for arg in get_args(param_type):
-                            if inspect.isclass(arg) and arg is not type(None):
-                                target_class = arg
-                                break
-
             # If we found a target class and the value is a dictionary,
             # we attempt to instantiate the class with the dictionary's values.
             # This handles nested objects like the 'Asset' dataclass.
             if target_class is not None and isinstance(value, dict):
                 try:
                     # This assumes the nested dict keys match the nested class's __init__ args
-                    constructor_attrs[param_name] = target_class(**value)
+                    value = target_class(**value)
                 except TypeError:
                     # If instantiation fails, we pass the dictionary as is.
-                    constructor_attrs[param_name] = value
-            else:
-                constructor_attrs[param_name] = value
+                    pass
+            constructor_attrs[param_name] = value
 
     return TargetClass(**constructor_attrs)
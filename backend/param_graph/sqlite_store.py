@@ -0,0 +1,130 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from .change_log import TrackedDiGraph
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    type TEXT,
+    parent TEXT,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    type TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+);
+"""
+
+
+def _node_row(n, attrs: dict) -> tuple:
+    parent = attrs.get('parent')
+    name = attrs.get('name')
+    return (
+        n,
+        attrs.get('type'),
+        parent if isinstance(parent, str) else None,
+        name if isinstance(name, str) else None,
+        json.dumps(attrs),
+    )
+
+
+def _edge_row(u, v, attrs: dict) -> tuple:
+    return (u, v, attrs.get('type'), json.dumps(attrs))
+
+
+class SQLiteGraphStore:
+    """
+    Stores a project's graph in a local SQLite database: one row per node and per edge,
+    with the full attribute dict as JSON (type/parent/name are also kept as plain columns
+    for inspecting the file). Saves only touch the rows of elements that changed, inside a
+    single transaction. This is an on-disk format only: load() builds the whole graph in
+    memory and every lookup goes through ParameterGraph's node index.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load(self) -> tuple[str | None, TrackedDiGraph]:
+        """Returns (project name, graph) with a clean change tracker."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'project_name'").fetchone()
+            G = TrackedDiGraph()
+            G.add_nodes_from((n, json.loads(data)) for n, data in conn.execute("SELECT id, data FROM nodes"))
+            G.add_edges_from((u, v, json.loads(data)) for u, v, data in conn.execute("SELECT source, target, data FROM edges"))
+        G.tracker.reset()
+        return (json.loads(row[0]) if row else None), G
+
+    def write_changes(self, changes: dict, project_name: str = None):
+        """Applies a set of changes from ChangeTracker.collect() in one transaction."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM edges WHERE source = ? AND target = ?", [tuple(e) for e in changes["removed_edges"]])
+                conn.executemany("DELETE FROM nodes WHERE id = ?", [(n,) for n in changes["removed_nodes"]])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO nodes (id, type, parent, name, data) VALUES (?, ?, ?, ?, ?)",
+                    [_node_row(n, attrs) for n, attrs in changes["nodes"].items()],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO edges (source, target, type, data) VALUES (?, ?, ?, ?)",
+                    [_edge_row(u, v, attrs) for u, v, attrs in changes["edges"]],
+                )
+                self._set_project_name(conn, project_name)
+
+    def write_all(self, nodes: list, edges: list, project_name: str = None):
+        """Replaces the stored graph with the given (id, attrs) nodes and (source, target, attrs) edges."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM edges")
+                conn.execute("DELETE FROM nodes")
+                conn.executemany(
+                    "INSERT INTO nodes (id, type, parent, name, data) VALUES (?, ?, ?, ?, ?)",
+                    [_node_row(n, attrs) for n, attrs in nodes],
+                )
+                conn.executemany(
+                    "INSERT INTO edges (source, target, type, data) VALUES (?, ?, ?, ?)",
+                    [_edge_row(u, v, attrs) for u, v, attrs in edges],
+                )
+                self._set_project_name(conn, project_name)
+
+    def _set_project_name(self, conn, project_name):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('project_name', ?)", (json.dumps(project_name),))
+
+    def counts(self) -> tuple[int, int]:
+        """Returns the number of stored (nodes, edges)."""
+        with self._lock:
+            conn = self._connect()
+            return (
+                conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0],
+                conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0],
+            )
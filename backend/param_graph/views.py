@@ -0,0 +1,88 @@
+from types import MappingProxyType
+
+from .registry import resolve_element
+
+_EMPTY = MappingProxyType({})
+
+
+class ElementView:
+    """
+    Read-only view of a node's stored attributes, for scans that only need to read a few
+    fields. No dataclass is built and the node isn't copied: accessors read straight from
+    the graph's attribute dict. Container values come back frozen, lists as tuples and
+    dicts as read-only mappings (nested ones included), so nothing can be changed past the
+    change tracker. Call element() for the full dataclass when the node is about to be
+    changed.
+    """
+    __slots__ = ("id", "_attrs")
+
+    def __init__(self, id: str, attrs: dict):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "_attrs", attrs)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ElementView is read-only, use ParameterGraph.update_element()")
+
+    def __delattr__(self, name):
+        raise AttributeError("ElementView is read-only, use ParameterGraph.update_element()")
+
+    def __repr__(self):
+        return f"ElementView({self.id!r}, type={self.type!r})"
+
+    @staticmethod
+    def _wrap(value):
+        if isinstance(value, dict):
+            return MappingProxyType({k: ElementView._wrap(v) for k, v in value.items()})
+        if isinstance(value, list):
+            return tuple(ElementView._wrap(v) for v in value)
+        return value
+
+    def get(self, key: str, default=None):
+        return self._wrap(self._attrs.get(key, default))
+
+    def __getitem__(self, key: str):
+        return self._wrap(self._attrs[key])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._attrs
+
+    def keys(self):
+        return self._attrs.keys()
+
+    @property
+    def type(self) -> str | None:
+        return self._attrs.get("type")
+
+    @property
+    def name(self) -> str | None:
+        return self._attrs.get("name")
+
+    @property
+    def parent(self) -> str | None:
+        return self._attrs.get("parent")
+
+    @property
+    def context(self) -> MappingProxyType:
+        context = self._attrs.get("context")
+        return self._wrap(context) if isinstance(context, dict) else _EMPTY
+
+    @property
+    def embeddings(self) -> MappingProxyType:
+        embeddings = self._attrs.get("embeddings")
+        return self._wrap(embeddings) if isinstance(embeddings, dict) else _EMPTY
+
+    @property
+    def file(self) -> MappingProxyType | None:
+        return self._wrap(self._attrs.get("file"))
+
+    @property
+    def path(self) -> str | None:
+        """The node's own path (directories) or its file's path."""
+        path = self._attrs.get("path")
+        if path is None:
+            path = (self._attrs.get("file") or {}).get("path")
+        return path
+
+    def element(self):
+        """Builds the full dataclass, as ParameterGraph.get_element() does."""
+        return resolve_element(dict(self._attrs))
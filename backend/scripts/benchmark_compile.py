@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import tempfile
+import torch
+
+# Ensure we can import from the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.model_adapters.stylegan_adapter import StyleGANAdapter
+from param_graph.elements.base_elements import Asset
+from param_graph.elements.models.stylegan_element import StyleGANModel
+
+
+def time_steps(adapter, batch_size, iterations):
+    """Returns per-step latencies (ms) of the StyleGAN2 generator forward pass."""
+    timings = []
+    with torch.no_grad():
+        for i in range(iterations):
+            torch.manual_seed(i)
+            z = torch.randn(batch_size, adapter.style_dim, device=adapter.device)
+            start = time.perf_counter()
+            adapter.model([z], truncation=0.7, truncation_latent=adapter.mean_latent, randomize_noise=False)
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def load(checkpoint, size, channel_multiplier, compile_mode):
+    adapter = StyleGANAdapter()
+    info = StyleGANModel(
+        id="benchmark",
+        name="benchmark",
+        checkpoint=Asset(path=checkpoint or "", uid="benchmark"),
+        config={"size": size, "channel_multiplier": channel_multiplier},
+        compile_mode=compile_mode,
+        context={}
+    )
+    start = time.perf_counter()
+    adapter.load_model(info, verify=False)
+    return adapter, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark steady-state generator latency with and without torch.compile.")
+    parser.add_argument("--checkpoint", default=None, help="Optional StyleGAN2 checkpoint (random weights if omitted)")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--channel-multiplier", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--mode", default="default", help="torch.compile mode to benchmark against eager")
+    parser.add_argument("--cache-dir", default=None, help="Inductor cache directory (defaults to a temp dir)")
+    args = parser.parse_args()
+
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="inductor_")
+    os.environ["COMPILE_WARMUP_BATCH_SIZES"] = str(args.batch_size)
+    print(f"Device: {'cuda' if torch.cuda.is_available() else 'cpu'}, threads: {torch.get_num_threads()}")
+    print(f"Inductor cache: {os.environ['TORCHINDUCTOR_CACHE_DIR']}")
+
+    results = {}
+    for label, mode in [("eager", None), (f"compiled ({args.mode})", args.mode)]:
+        adapter, load_seconds = load(args.checkpoint, args.size, args.channel_multiplier, mode)
+        # One untimed step so both variants are measured in steady state
+        time_steps(adapter, args.batch_size, 1)
+        timings = time_steps(adapter, args.batch_size, args.iterations)
+        results[label] = statistics.median(timings)
+        print(f"{label:>24}: load+warm-up {load_seconds:6.1f}s | median step {results[label]:8.2f} ms | min {min(timings):8.2f} ms")
+        adapter.cleanup()
+
+    eager, compiled = results.values()
+    print(f"Speedup: {eager / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
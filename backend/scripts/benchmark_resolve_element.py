@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Ensure we can import from the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import param_graph.elements  # noqa: F401  (registers the element classes)
+from param_graph.elements.collections.batch_element import Batch  # noqa: F401
+from param_graph import registry
+from param_graph.graph import ParameterGraph
+
+
+def build_graph(n_nodes: int) -> ParameterGraph:
+    """A synthetic project: batches of generated audio and images plus a few models."""
+    graph = ParameterGraph(os.devnull)
+    for m in range(4):
+        graph.G.add_node(f"model{m}", id=f"model{m}", type="model", adapter="stable_audio_tools", name=f"model{m}",
+                         context={}, checkpoint={"path": "", "uid": f"ckpt{m}"}, config={"sample_rate": 44100})
+    for i in range(n_nodes):
+        batch = f"batch{i // 16}"
+        if i % 16 == 0:
+            graph.G.add_node(batch, id=batch, type="batch", member_type="audio", member_ids=[])
+        node_type = "audio" if i % 3 else "image"
+        graph.G.add_node(
+            f"n{i}", id=f"n{i}", type=node_type, name=f"n{i}", parent=batch,
+            context={"prompt": "a synthetic prompt", "seed": i, "model_id": f"model{i % 4}"},
+            file={"path": f"{node_type}/{i}", "uid": f"uid{i}", "extension": ".wav" if node_type == "audio" else ".png"},
+            embeddings={"clap" if node_type == "audio" else "clip": f"uid{i}"},
+        )
+    return graph
+
+
+def time_resolve(graph: ParameterGraph, repeats: int, cold: bool) -> list[float]:
+    """Returns the time (ms) to resolve every node once per repeat; cold=True drops the schema cache per call."""
+    timings = []
+    nodes = list(graph.G.nodes)
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for n in nodes:
+            if cold:
+                registry._SCHEMAS.clear()
+            graph.get_element(n)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_views(graph: ParameterGraph, repeats: int) -> list[float]:
+    """Returns the time (ms) to read type and context of every node through read-only views."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for view in graph.views():
+            view.type, view.context.get("prompt")
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ParameterGraph.get_element over a large synthetic graph.")
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    graph = build_graph(args.nodes)
+    n = graph.G.number_of_nodes()
+    print(f"Resolving {n} nodes, {args.repeats} repeats")
+
+    for label, cold in (("uncached (signature + type hints per call)", True), ("cached schemas", False)):
+        timings = time_resolve(graph, args.repeats, cold)
+        median = statistics.median(timings)
+        print(f"  {label:45s} median {median:8.1f} ms  ({1000 * median / n:6.2f} us/node)")
+
+    median = statistics.median(time_views(graph, args.repeats))
+    print(f"  {'read-only views (type + context)':45s} median {median:8.1f} ms  ({1000 * median / n:6.2f} us/node)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Ensure we can import from the backend directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from param_graph.graph import ParameterGraph
+from param_graph.const import DICT_FILE, WAL_FILE, DB_FILE
+
+
+def migrate(project_path: Path, remove_json: bool = False) -> bool:
+    if (project_path / DB_FILE).exists():
+        print(f"{project_path}: already uses {DB_FILE}, skipping.")
+        return True
+
+    source = ParameterGraph(str(project_path), storage="json")
+    if not source.load():
+        print(f"{project_path}: no {DICT_FILE} found, skipping.")
+        return False
+
+    target = ParameterGraph(str(project_path), storage="sqlite")
+    target.project_name = source.project_name
+    target.G = source.G
+    target.compact()
+
+    nodes, edges = target.store.counts()
+    if (nodes, edges) != (source.G.number_of_nodes(), source.G.number_of_edges()):
+        target.store.close()
+        (project_path / DB_FILE).unlink()
+        print(f"{project_path}: verification failed ({nodes} nodes / {edges} edges stored), migration rolled back.")
+        return False
+    target.store.close()
+    print(f"{project_path}: migrated {nodes} nodes and {edges} edges to {DB_FILE}.")
+
+    # graph.db takes precedence when both exist, so the JSON files are only kept as a backup
+    if remove_json:
+        for name in (DICT_FILE, WAL_FILE):
+            if (project_path / name).exists():
+                (project_path / name).unlink()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate graph.json projects to SQLite graph storage.")
+    parser.add_argument("projects", nargs="+", help="Project directories to migrate")
+    parser.add_argument("--remove-json", action="store_true", help=f"Delete {DICT_FILE} and {WAL_FILE} after a verified migration")
+    args = parser.parse_args()
+
+    failed = [p for p in args.projects if not migrate(Path(p), args.remove_json)]
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
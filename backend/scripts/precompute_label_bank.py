@@ -1,61 +1,61 @@
 import os
 import sys
+import argparse
 import torch
 
 # Ensure we can import from the backend directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from engine.encoders.clap_encoder import CLAPEncoder
-from utils.semantic_interrogation import SemanticInterrogator
+from engine.encoders.clap_encoder import CLAPEncoder, CLAP_MODEL_ID
+from utils.semantic_interrogation import LabelBank
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
 
 def main():
-    print("Initializing CLAPEncoder...")
-    encoder = CLAPEncoder()
-    # Force model load
-    encoder.load_model()
-    
-    # Read labels from the text file
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
-    labels_file = os.path.join(data_dir, "semantic_transitions.txt")
-    
-    if not os.path.exists(labels_file):
-        print(f"Error: Could not find labels file at {labels_file}")
+    parser = argparse.ArgumentParser(description="Incrementally build a sharded CLAP label bank from a text file of labels.")
+    parser.add_argument("--labels", default=os.path.join(DATA_DIR, "semantic_transitions.txt"), help="Text file with one label per line")
+    parser.add_argument("--bank", default=None, help="Bank name (defaults to the labels file name)")
+    parser.add_argument("--output-dir", default=os.path.join(DATA_DIR, "label_banks"))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--compact", action="store_true", help="Rewrite the bank as a single shard without removed labels")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.labels):
+        print(f"Error: Could not find labels file at {args.labels}")
         sys.exit(1)
         
-    with open(labels_file, "r", encoding="utf-8") as f:
+    with open(args.labels, "r", encoding="utf-8") as f:
         # Read lines, strip whitespace, ignore empty lines
         labels = [line.strip() for line in f if line.strip()]
-    
-    print(f"Loaded {len(labels)} labels from {labels_file}.")
-    print("Generating text embeddings...")
-    
-    # laion_clap can handle lists of strings. 
-    # Let's batch them just to be safe with memory, although this list is small enough to fit.
-    batch_size = 32
-    all_embeddings = []
-    
-    for i in range(0, len(labels), batch_size):
-        batch = labels[i : i + batch_size]
-        print(f"Processing batch {i//batch_size + 1}...")
-        
-        # Get embeddings. Shape: (batch_size, embed_dim)
-        batch_embeddings = encoder.get_text_embedding(batch)
-        all_embeddings.append(batch_embeddings)
-        
-    # Concatenate all batches
-    final_embeddings = torch.cat(all_embeddings, dim=0)
-    print(f"Generated embeddings tensor of shape: {final_embeddings.shape}")
-    
-    # Load into interrogator and save
-    print("Saving label bank to disk...")
-    interrogator = SemanticInterrogator(device="cpu")
-    interrogator.load_label_bank(labels, final_embeddings)
-    
-    # Save to the data folder
-    output_path = os.path.join(data_dir, "semantic_transitions_bank.pt")
-    
-    interrogator.save_bank(output_path)
-    print(f"Successfully saved label bank to {output_path}")
+    print(f"Loaded {len(labels)} labels from {args.labels}.")
+
+    bank_name = args.bank or os.path.splitext(os.path.basename(args.labels))[0]
+    bank = LabelBank(os.path.join(args.output_dir, bank_name), model=CLAP_MODEL_ID)
+
+    # Only labels whose hash isn't in the bank yet are embedded
+    missing = bank.missing(labels)
+    print(f"{len(missing)} new label(s) to embed, {len(labels) - len(missing)} already in bank '{bank_name}'.")
+
+    if missing:
+        print("Initializing CLAPEncoder...")
+        encoder = CLAPEncoder()
+        encoder.load_model()
+
+        all_embeddings = []
+        for i in range(0, len(missing), args.batch_size):
+            batch = missing[i : i + args.batch_size]
+            print(f"Processing batch {i // args.batch_size + 1}...")
+            # Get embeddings. Shape: (batch_size, embed_dim)
+            all_embeddings.append(encoder.get_text_embedding(batch).cpu())
+        bank.add_shard(missing, torch.cat(all_embeddings, dim=0))
+
+    bank.set_labels(labels)
+    bank.save()
+    if args.compact:
+        bank.compact()
+    print(f"Label bank '{bank_name}' saved to {bank.path} ({len(bank.labels)} labels, {len(bank.manifest['shards'])} shard(s)).")
+
 
 if __name__ == "__main__":
     main()
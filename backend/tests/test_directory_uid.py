@@ -8,6 +8,8 @@ backend_dir = Path(__file__).resolve().parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
+import xxhash
+
 from utils.uid import XXH3_64
 
 
@@ -46,5 +48,21 @@ def test_directory_uid_determinism():
         print("PASS: Directory UID determinism test passed successfully!")
 
 
+
+def test_dict_uid_of_grating_overrides():
+    uid_gen = XXH3_64()
+    overrides = [{"address": "transformer.layers.3", "metadata": {"strength": 0.5, "mode": "add"}}]
+    reordered = [{"metadata": {"mode": "add", "strength": 0.5}, "address": "transformer.layers.3"}]
+
+    uid = uid_gen.from_dict({"overrides": overrides})
+    assert uid == uid_gen.from_dict({"overrides": reordered})
+    assert uid != uid_gen.from_dict({"overrides": [{**overrides[0], "metadata": {"strength": 0.6, "mode": "add"}}]})
+    assert uid.endswith(".xxh3_64")
+
+    # Same digest as hashing the UTF-8 bytes directly
+    assert uid_gen.from_string("façade") == f"{xxhash.xxh3_64_hexdigest('façade'.encode('utf-8'))}.xxh3_64"
+
+
 if __name__ == "__main__":
     test_directory_uid_determinism()
+    test_dict_uid_of_grating_overrides()
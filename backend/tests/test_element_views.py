@@ -0,0 +1,69 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+import param_graph.elements  # noqa: F401
+from param_graph.graph import ParameterGraph
+
+
+def _graph():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.add_node("dir", id="dir", type="directory", name="dir", path="samples", context={})
+    for i in range(3):
+        graph.G.add_node(f"a{i}", id=f"a{i}", type="audio", name=f"a{i}", parent="dir",
+                         context={"seed": i}, file={"path": f"samples/a{i}.wav", "uid": f"a{i}"},
+                         embeddings={"clap": f"a{i}"})
+    return graph
+
+
+def test_views_read_the_stored_attributes_without_copying():
+    graph = _graph()
+    views = list(graph.views(parent="dir"))
+    assert [v.id for v in views] == ["a0", "a1", "a2"]
+    assert views[1].context["seed"] == 1 and views[1].embeddings == {"clap": "a1"}
+    assert views[2].path == "samples/a2.wav" and graph.view("dir").path == "samples"
+    assert [v.id for v in graph.views(["a2", "missing", "a0"])] == ["a2", "a0"]
+
+    # Later writes are visible through an existing view
+    graph.update_element("a0", {"context": {"seed": 7}})
+    assert views[0].context["seed"] == 7
+
+    with pytest.raises(ValueError):
+        graph.view("missing")
+
+
+def test_views_are_read_only():
+    view = _graph().view("a0")
+    with pytest.raises(AttributeError):
+        view.name = "renamed"
+    with pytest.raises(TypeError):
+        view.context["seed"] = 3
+
+
+def test_list_fields_come_back_frozen():
+    graph = _graph()
+    graph.G.add_node("batch", type="batch", member_ids=["a0", "a1"],
+                     context={"gratings": [{"id": "g1", "overrides": [{"address": "fc"}]}]})
+    revision = graph.G.revisions.revision
+    view = graph.view("batch")
+
+    assert view["member_ids"] == ("a0", "a1") and view.get("member_ids") == ("a0", "a1")
+    with pytest.raises(AttributeError):
+        view["member_ids"].append("a2")
+    grating = view.context["gratings"][0]
+    assert grating["id"] == "g1" and grating["overrides"][0]["address"] == "fc"
+    with pytest.raises(TypeError):
+        grating["overrides"][0]["address"] = "conv"
+    with pytest.raises(AttributeError):
+        grating["overrides"].append({})
+
+    assert graph.G.nodes["batch"]["member_ids"] == ["a0", "a1"]
+    assert graph.G.revisions.revision == revision
+    assert not hasattr(view, "__dict__")
@@ -0,0 +1,63 @@
+import sys
+import threading
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from utils.embedding_scheduler import EmbeddingUpdateScheduler
+
+
+def test_bursts_are_coalesced_into_one_pass():
+    passes = []
+    scheduler = EmbeddingUpdateScheduler(passes.append, debounce_seconds=0.2)
+
+    tickets = [scheduler.request(force=(i == 3)) for i in range(5)]
+    assert scheduler.wait(tickets[-1], timeout=5)
+
+    assert passes == [True]
+    status = scheduler.status()
+    assert status["backlog"] == 0
+    assert status["runs"] == 1
+    assert status["last_run"]["coalesced_triggers"] == 5
+
+
+def test_immediate_requests_skip_the_debounce_and_report_errors():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def run_pass(force):
+        calls.append(force)
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("boom")
+
+    scheduler = EmbeddingUpdateScheduler(run_pass, debounce_seconds=60)
+    ticket = scheduler.request(immediate=True)
+    # A trigger arriving mid-pass is picked up by the following pass
+    assert started.wait(timeout=5)
+    follow_up = scheduler.request(immediate=True)
+    release.set()
+
+    assert scheduler.wait(follow_up, timeout=5)
+    assert ticket < follow_up
+    assert len(calls) == 2
+    assert scheduler.status()["last_run"]["error"] == "boom"
+
+
+def test_passes_are_deferred_while_foreground_work_runs():
+    busy = threading.Event()
+    busy.set()
+    passes = []
+    scheduler = EmbeddingUpdateScheduler(passes.append, debounce_seconds=0, should_defer=busy.is_set, max_defer_seconds=10)
+
+    ticket = scheduler.request()
+    assert not scheduler.wait(ticket, timeout=0.5)
+    assert passes == []
+
+    busy.clear()
+    assert scheduler.wait(ticket, timeout=5)
+    assert passes == [False]
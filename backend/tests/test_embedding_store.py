@@ -0,0 +1,123 @@
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.embedding_store import EmbeddingStore
+from param_graph.graph import ParameterGraph
+from param_graph.elements.artifacts.audio_element import Audio
+from param_graph.elements.base_elements import Asset
+
+
+def test_embedding_store_roundtrip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = EmbeddingStore(tmpdir, dtype="float32")
+        vectors = np.random.rand(3, 8).astype(np.float32)
+        store.put_many("clap", ["a", "b", "c"], vectors)
+
+        # Overwrite one row in place and append another
+        store.put("clap", "b", np.ones(8))
+        store.put("clap", "d", np.zeros(8))
+        store.flush()
+
+        reopened = EmbeddingStore(tmpdir)
+        assert reopened.keys("clap") == ["a", "b", "c", "d"]
+        np.testing.assert_allclose(reopened.get("clap", "a"), vectors[0])
+        np.testing.assert_allclose(reopened.get("clap", "b"), np.ones(8))
+        np.testing.assert_allclose(reopened.get_many("clap", ["d", "c"]), np.stack([np.zeros(8), vectors[2]]))
+        assert reopened.get("clap", "missing") is None
+
+
+def test_graph_stores_embedding_references():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "test"
+        embedding = np.random.rand(512).astype(np.float32)
+        audio = Audio(
+            id="node-a",
+            name="a",
+            file=Asset(path="a.wav", uid="content-a", extension=".wav"),
+            embeddings={"clap": embedding.tolist()},
+            context={}
+        )
+        graph.add_element(audio)
+        graph.save()
+
+        # The graph only references the content key; the vector lives in the store
+        with open(Path(tmpdir) / "graph.json") as f:
+            node = json.load(f)["graph"]["elements"]["nodes"][0]["data"]
+        assert node["embeddings"] == {"clap": "content-a"}
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        np.testing.assert_allclose(reloaded.get_embedding("node-a", "clap"), embedding, rtol=1e-3, atol=1e-3)
+
+
+def test_legacy_inline_embeddings_are_migrated_on_load():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "legacy"
+        graph.G.add_node("node-a", id="node-a", type="audio", embeddings={"clap": [0.5] * 4})
+        # Bypass interning to write the legacy inline format
+        graph.save()
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert reloaded.G.nodes["node-a"]["embeddings"] == {"clap": "node-a"}
+        ids, matrix = reloaded.get_embedding_matrix(["node-a"], "clap")
+        assert ids == ["node-a"]
+        np.testing.assert_allclose(matrix, [[0.5] * 4])
+
+
+def test_compaction_drops_embeddings_nothing_references():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "test"
+        for node_id in ("node-a", "node-b", "node-c"):
+            graph.G.add_node(node_id, id=node_id, type="audio")
+            graph.set_embedding(node_id, "clap", np.full(8, ord(node_id[-1]), dtype=np.float32))
+            graph.set_window_embeddings(node_id, "clap", [0.0, 1.0, 2.0], 1.0, np.ones((3, 8)))
+        graph.compact()
+        data_file = Path(tmpdir) / "embeddings" / "clap.bin"
+        size = data_file.stat().st_size
+
+        graph.remove_element("node-a")
+        # New audio for node-b: it is stored under a new key with fewer windows
+        graph.G.nodes["node-b"]["file"] = {"uid": "content-b2"}
+        graph.set_embedding("node-b", "clap", np.zeros(8))
+        graph.set_window_embeddings("node-b", "clap", [0.0], 1.0, np.ones((1, 8)))
+        graph.save()
+        # Until the graph is rewritten the old snapshot may still reference the entries
+        assert graph.embeddings.has("clap", "node-a")
+
+        graph.compact()
+        assert sorted(graph.embeddings.keys("clap")) == ["content-b2", "node-c"]
+        assert sorted(graph.embeddings.keys("clap_windows")) == ["content-b2#0", "node-c#0", "node-c#1", "node-c#2"]
+        assert not data_file.exists()
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert sum(p.stat().st_size for p in (Path(tmpdir) / "embeddings").glob("clap.*.bin")) < size
+        np.testing.assert_allclose(reloaded.get_embedding("node-c", "clap"), np.full(8, ord("c")))
+        np.testing.assert_allclose(reloaded.get_embedding("node-b", "clap"), np.zeros(8))
+        assert reloaded.get_window_embeddings("node-c", "clap")[1].shape == (3, 8)
+
+
+def test_keys_written_again_before_the_rewrite_are_kept():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = EmbeddingStore(tmpdir, dtype="float32")
+        store.put_many("clap", ["a", "b"], np.eye(2))
+        store.schedule_removal({"clap": ["a", "b"]})
+        store.put("clap", "b", np.ones(2))
+        store.remove_scheduled()
+
+        reopened = EmbeddingStore(tmpdir)
+        assert reopened.keys("clap") == ["b"]
+        np.testing.assert_allclose(reopened.get("clap", "b"), np.ones(2))
@@ -0,0 +1,58 @@
+import sys
+import types
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from engine.encoders import registry as registry_module
+from engine.encoders.base_encoder import Encoder
+from engine.encoders.registry import EncoderRegistry
+
+
+class CountingEncoder(Encoder):
+    loads = 0
+
+    def __init__(self, device=None):
+        self.device = device
+        self._model = None
+        self._processor = None
+
+    @property
+    def name(self):
+        return "CountingEncoder"
+
+    def load_model(self):
+        if self._model is None:
+            CountingEncoder.loads += 1
+            self._model = object()
+
+    def get_embedding(self, file_path):
+        self.load_model()
+        return file_path
+
+
+def test_registry_shares_encoders_and_unloads_idle_ones(monkeypatch):
+    module = types.ModuleType("counting_encoder")
+    module.CountingEncoder = CountingEncoder
+    monkeypatch.setitem(sys.modules, "counting_encoder", module)
+    monkeypatch.setitem(registry_module.ENCODER_CLASSES, "counting", ("counting_encoder", "CountingEncoder"))
+    CountingEncoder.loads = 0
+
+    registry = EncoderRegistry(idle_timeout=0, device_policy="counting=cpu,default=cuda")
+    with registry.acquire("counting") as first:
+        # In-use encoders are never unloaded
+        registry.unload_all()
+        assert first.is_loaded
+        with registry.acquire("counting") as second:
+            assert second is first
+    assert CountingEncoder.loads == 1
+    assert first.device == "cpu"
+
+    registry.unload_all()
+    assert not first.is_loaded
+    with registry.acquire("counting") as again:
+        assert again is first and again.is_loaded
+    assert CountingEncoder.loads == 2
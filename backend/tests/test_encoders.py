@@ -0,0 +1,130 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from engine.encoders.base_encoder import Encoder
+
+
+def _vector(value: float) -> torch.Tensor:
+    return torch.tensor([value, 1.0])
+
+
+class _StubModel:
+    """Embeds decoded numbers as [value, 1]; the forward pass fails on negative inputs."""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, decoded):
+        self.batches.append(len(decoded))
+        if any(value < 0 for value in decoded):
+            raise RuntimeError("bad input")
+        return torch.stack([_vector(value) for value in decoded])
+
+
+def _decode(path):
+    if path.startswith("missing"):
+        raise FileNotFoundError(path)
+    return float(path.split("/")[-1])
+
+
+class StubEncoder(Encoder):
+    name = "StubEncoder"
+
+    def __init__(self):
+        self.model = _StubModel()
+
+    def get_embedding(self, file_path):
+        return self.get_embeddings([file_path])[0]
+
+    def get_embeddings(self, file_paths, batch_size=None):
+        embeddings = [None] * len(file_paths)
+        for i, embedding in self._iter_embedded(file_paths, _decode, self.model, batch_size):
+            embeddings[i] = embedding
+        return embeddings
+
+
+def test_failed_batches_are_retried_one_file_at_a_time():
+    encoder = StubEncoder()
+    paths = ["a/1", "a/2", "a/-3", "missing/4", "a/5", "a/6", "a/7"]
+
+    embeddings = encoder.get_embeddings(paths, batch_size=3)
+    assert [e.tolist() if e is not None else None for e in embeddings] == [
+        [1.0, 1.0], [2.0, 1.0], None, None, [5.0, 1.0], [6.0, 1.0], [7.0, 1.0],
+    ]
+    # The failing batch is retried file by file, the others run once
+    assert encoder.model.batches == [3, 1, 1, 1, 2, 1]
+
+
+def test_clip_keeps_order_when_decode_or_forward_fails(monkeypatch):
+    clip_encoder = pytest.importorskip("engine.encoders.clip_encoder")
+    encoder = clip_encoder.CLIPEncoder(device="cpu")
+    model = _StubModel()
+    encoder._model = model
+    monkeypatch.setattr(encoder, "_decode", _decode)
+    monkeypatch.setattr(encoder, "_embed_images", model)
+
+    embeddings = encoder.get_embeddings(["a/1", "missing/2", "a/-3", "a/4"], batch_size=3)
+    assert embeddings[1] is None and embeddings[2] is None
+    assert torch.equal(embeddings[0], _vector(1.0)) and torch.equal(embeddings[3], _vector(4.0))
+
+
+def test_clap_keeps_the_windows_that_could_be_embedded(monkeypatch):
+    clap_encoder = pytest.importorskip("engine.encoders.clap_encoder")
+    encoder = clap_encoder.CLAPEncoder(device="cpu")
+    model = _StubModel()
+    encoder._model = model
+    encoder.window_seconds = 1.0
+    windows = {
+        "a/1": [(0, 10, 0.0, 1.0), (10, 10, 1.0, 1.0)],
+        "a/-2": [(0, -1, 0.0, 1.0)],
+        "missing/3": [(0, -1, 0.0, 1.0)],
+        "a/4": [(0, 10, 0.0, 1.0), (10, 10, 1.0, 1.0)],
+    }
+    monkeypatch.setattr(encoder, "_plan_windows", lambda path: windows[path])
+    # The second window of a/4 fails in the forward pass
+    monkeypatch.setattr(encoder, "_decode", lambda path, frame_offset, num_frames: _decode(path) * (-1 if path == "a/4" and frame_offset else 1))
+    monkeypatch.setattr(encoder, "_embed_audio", model)
+
+    results = encoder.get_window_embeddings(list(windows), batch_size=4)
+    assert results[1] is None and results[2] is None
+    assert results[0]["starts"] == [0.0, 1.0] and torch.equal(results[0]["windows"][1], _vector(1.0))
+    assert results[3]["starts"] == [0.0] and torch.equal(results[3]["windows"][0], _vector(4.0))
+
+
+@pytest.mark.parametrize("n_windows", [1, 3])
+def test_clap_pooled_embedding_has_unit_norm(monkeypatch, n_windows):
+    clap_encoder = pytest.importorskip("engine.encoders.clap_encoder")
+    encoder = clap_encoder.CLAPEncoder(device="cpu")
+    encoder._model = object()
+    encoder.window_seconds = 1.0
+    windows = [(10 * n, 10, float(n), 1.0 if n < 2 else 0.5) for n in range(n_windows)]
+    monkeypatch.setattr(encoder, "_plan_windows", lambda path: windows)
+    monkeypatch.setattr(encoder, "_decode", lambda path, frame_offset, num_frames: frame_offset)
+    monkeypatch.setattr(encoder, "_embed_audio", lambda offsets: torch.tensor([[3.0 + offset, 4.0] for offset in offsets]))
+
+    result = encoder.get_window_embeddings(["a.wav"])[0]
+    assert result["windows"].shape == (n_windows, 2)
+    assert torch.allclose(result["embedding"].norm(), torch.tensor(1.0))
+    if n_windows == 1:
+        assert torch.allclose(result["embedding"], torch.tensor([0.6, 0.8]))
+    else:
+        # The direction is still the weighted mean of the normalised windows
+        unit = torch.nn.functional.normalize(result["windows"], dim=-1)
+        expected = unit[0] + unit[1] + 0.5 * unit[2]
+        assert torch.allclose(result["embedding"], expected / expected.norm())
+    assert torch.allclose(encoder.get_embeddings(["a.wav"])[0], result["embedding"])
+
+
+def test_clap_embeds_whole_files_unless_windowing_is_enabled(monkeypatch):
+    clap_encoder = pytest.importorskip("engine.encoders.clap_encoder")
+    monkeypatch.delenv("CLAP_WINDOW_MODE", raising=False)
+    assert clap_encoder.CLAPEncoder(device="cpu")._plan_windows("a.wav") == [(0, -1, 0.0, 1.0)]
+    monkeypatch.setenv("CLAP_WINDOW_MODE", "windowed")
+    assert clap_encoder.CLAPEncoder(device="cpu").window_mode == "windowed"
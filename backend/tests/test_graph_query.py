@@ -0,0 +1,62 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+
+
+def _graph():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.add_node("model", type="model", name="sa", layers=[{"name": "l"}] * 100)
+    for i in range(7):
+        graph.G.add_node(f"a{i}", type="audio", name=f"clip{i}", parent="batch",
+                         context={"prompt": "p"}, embeddings={"clap": f"a{i}"})
+        graph.G.add_edge("model", f"a{i}", type="model")
+        if i:
+            graph.G.add_edge(f"a{i - 1}", f"a{i}", type="audio")
+    return graph
+
+
+def test_heavy_fields_are_excluded_by_default_and_fields_project():
+    graph = _graph()
+    nodes = {e["data"]["id"]: e["data"] for e in graph.query()["elements"]["nodes"]}
+    assert "layers" not in nodes["model"] and "embeddings" not in nodes["a0"]
+    assert nodes["a0"]["context"] == {"prompt": "p"}
+
+    full = {e["data"]["id"]: e["data"] for e in graph.query(exclude=())["elements"]["nodes"]}
+    assert len(full["model"]["layers"]) == 100
+
+    projected = graph.query(fields=["context"])["elements"]["nodes"][1]["data"]
+    assert set(projected) == {"id", "type", "name", "parent", "context", "value"}
+
+
+def test_type_filter_keeps_only_edges_between_selected_nodes():
+    result = _graph().query(types=["audio"])
+    assert result["total"] == 7
+    assert {(e["data"]["source"], e["data"]["target"]) for e in result["elements"]["edges"]} == {
+        (f"a{i - 1}", f"a{i}") for i in range(1, 7)
+    }
+
+
+def test_cursor_pages_cover_every_node_and_edge_once():
+    graph = _graph()
+    nodes, edges, cursor = [], [], None
+    while True:
+        page = graph.query(limit=3, cursor=cursor)
+        nodes += [e["data"]["id"] for e in page["elements"]["nodes"]]
+        edges += [(e["data"]["source"], e["data"]["target"]) for e in page["elements"]["edges"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        if graph.G.has_node("a0"):
+            # Removing an already returned node must not shift the following pages
+            graph.G.remove_node("a0")
+
+    assert nodes == sorted(nodes) and len(nodes) == 8
+    # 6 chain edges, plus model -> a1..a6 (its page comes after a0 was removed)
+    assert len(edges) == len(set(edges)) == 12
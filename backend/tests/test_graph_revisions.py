@@ -0,0 +1,98 @@
+import sys
+import random
+import tempfile
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+
+
+class _Client:
+    """Mirrors the graph the way the frontend does: one full download, then deltas."""
+    def __init__(self, graph):
+        self.sync(graph.changes_since(-1))
+
+    def sync(self, response):
+        if response["full"]:
+            elements = response["graph_data"]["elements"]
+            self.nodes = {e["data"]["id"]: e["data"] for e in elements["nodes"]}
+            self.edges = {(e["data"]["source"], e["data"]["target"]): e["data"] for e in elements["edges"]}
+        else:
+            for n in response["removed_nodes"]:
+                self.nodes.pop(n, None)
+            for u, v in response["removed_edges"]:
+                self.edges.pop((u, v), None)
+            self.nodes.update((e["data"]["id"], e["data"]) for e in response["nodes"])
+            self.edges.update(((e["data"]["source"], e["data"]["target"]), e["data"]) for e in response["edges"])
+        self.revision, self.epoch = response["revision"], response["epoch"]
+
+
+def test_deltas_keep_a_client_in_sync():
+    rng = random.Random(1)
+    graph = ParameterGraph(tempfile.gettempdir())
+    client = _Client(graph)
+
+    for step in range(300):
+        nodes = list(graph.G.nodes)
+        op = rng.randrange(5)
+        if op <= 1 or len(nodes) < 2:
+            graph.G.add_node(f"n{step}", id=f"n{step}", type="audio")
+        elif op == 2:
+            graph.G.add_edge(*rng.sample(nodes, 2), type="audio")
+        elif op == 3:
+            graph.update_element(rng.choice(nodes), {"name": f"name{step}"})
+        else:
+            graph.G.remove_node(rng.choice(nodes))
+
+        if step % 7 == 0:
+            response = graph.changes_since(client.revision, client.epoch)
+            assert not response["full"]
+            client.sync(response)
+            full = _Client(graph)
+            assert client.nodes == full.nodes
+            assert client.edges == full.edges
+
+
+def test_old_revisions_and_other_epochs_get_a_full_resync():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "revisions"
+        graph.G.revisions.max_entries = 3
+        for i in range(5):
+            graph.G.add_node(f"n{i}", type="audio")
+
+        assert graph.changes_since(0)["full"]
+        recent = graph.changes_since(graph.G.revisions.revision - 1)
+        assert not recent["full"] and [e["data"]["id"] for e in recent["nodes"]] == ["n4"]
+
+        graph.save()
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert reloaded.changes_since(graph.G.revisions.revision, graph.G.revisions.epoch)["full"]
+        assert not reloaded.changes_since(reloaded.G.revisions.revision, reloaded.G.revisions.epoch)["full"]
+
+
+def test_deltas_and_resyncs_leave_out_heavy_fields_by_default():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.revisions.max_entries = 3
+    graph.G.add_node("a", type="audio", name="kick", embeddings={"clap": "a"}, context={"bpm": 120})
+    revision = graph.G.revisions.revision
+    graph.update_element("a", {"name": "snare"})
+
+    delta = graph.changes_since(revision)["nodes"][0]["data"]
+    assert delta["name"] == "snare" and "embeddings" not in delta and delta["context"] == {"bpm": 120}
+    assert "embeddings" in graph.changes_since(revision, exclude=())["nodes"][0]["data"]
+    assert set(graph.changes_since(revision, fields=["context"])["nodes"][0]["data"]) == {"id", "type", "name", "context", "value"}
+
+    for i in range(5):
+        graph.G.add_node(f"n{i}", type="audio")
+    full = graph.changes_since(revision)
+    assert full["full"]
+    nodes = {e["data"]["id"]: e["data"] for e in full["graph_data"]["elements"]["nodes"]}
+    assert len(nodes) == 6 and "embeddings" not in nodes["a"]
+    projected = graph.changes_since(revision, fields=[])["graph_data"]["elements"]["nodes"]
+    assert all(set(e["data"]) <= {"id", "type", "name", "parent", "value"} for e in projected)
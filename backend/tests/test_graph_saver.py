@@ -0,0 +1,62 @@
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+from utils.graph_saver import GraphSaver
+
+
+def _reload(path):
+    graph = ParameterGraph(path)
+    graph.load()
+    return graph
+
+
+def test_requests_are_coalesced_and_written_in_the_background():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lock = threading.Lock()
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "saver"
+        graph.save()
+
+        saver = GraphSaver(lock, debounce_seconds=0.2, max_delay_seconds=5)
+        for i in range(10):
+            with lock:
+                graph.G.add_node(f"n{i}", type="audio")
+                saver.request(graph)
+        assert _reload(tmpdir).G.number_of_nodes() == 0
+
+        deadline = time.monotonic() + 5
+        while saver.status()["saves"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        status = saver.status()
+        assert status["saves"] == 1 and status["last_save"]["error"] is None
+        assert _reload(tmpdir).G.number_of_nodes() == 10
+
+
+def test_flush_writes_pending_saves_of_every_graph():
+    with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+        lock = threading.Lock()
+        saver = GraphSaver(lock, debounce_seconds=60, max_delay_seconds=60)
+        graphs = [ParameterGraph(first), ParameterGraph(second)]
+        for graph in graphs:
+            graph.project_name = "flush"
+            graph.save()
+            graph.G.add_node("a", type="audio")
+            saver.request(graph)
+
+        # As on a project switch: the caller already holds the lock
+        with lock:
+            graph.G.add_node("b", type="audio")
+            saver.flush(holding_lock=True)
+
+        assert list(_reload(first).G.nodes) == ["a"]
+        assert list(_reload(second).G.nodes) == ["a", "b"]
+        assert saver.status()["pending"] == 0
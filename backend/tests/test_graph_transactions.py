@@ -0,0 +1,88 @@
+import sys
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+
+
+def _state(G):
+    # Order-insensitive: nodes restored by a rollback are re-inserted at the end
+    return (
+        sorted((n, sorted(attrs.items(), key=str)) for n, attrs in G.nodes(data=True)),
+        sorted((u, v, sorted(attrs.items())) for u, v, attrs in G.edges(data=True)),
+        sorted((u, v) for v, preds in G.pred.items() for u in preds),
+    )
+
+
+def _random_ops(graph, rng, steps):
+    for step in range(steps):
+        nodes = list(graph.G.nodes)
+        op = rng.randrange(6)
+        if op == 0 or len(nodes) < 2:
+            graph.G.add_node(f"new{step}", type="audio", parent=rng.choice(nodes) if nodes else None)
+        elif op == 1:
+            graph.G.add_edge(*rng.sample(nodes, 2), type="audio")
+        elif op == 2:
+            graph.update_element(rng.choice(nodes), {"name": f"name{step}", "parent": rng.choice(nodes)})
+        elif op == 3:
+            graph.remove_element(rng.choice(nodes))
+        elif op == 4 and graph.G.number_of_edges():
+            graph.G.remove_edge(*rng.choice(list(graph.G.edges)))
+        else:
+            graph.G.nodes[rng.choice(nodes)].pop("name", None)
+
+
+def test_rollback_restores_nodes_edges_and_indexes():
+    rng = random.Random(3)
+    graph = ParameterGraph(tempfile.gettempdir())
+    for i in range(30):
+        graph.G.add_node(f"n{i}", type="audio", name=f"n{i}", parent=f"n{i // 5}" if i >= 5 else None)
+    for i in range(1, 30):
+        graph.G.add_edge(f"n{i - 1}", f"n{i}", type="audio")
+
+    for attempt in range(20):
+        before = _state(graph.G)
+        attrs_of_n1 = graph.G.nodes["n1"] if "n1" in graph.G else None
+        parents = {n: graph.children(n) for n in graph.G}
+        revision = graph.G.revisions.revision
+
+        with pytest.raises(RuntimeError):
+            with graph.transaction():
+                _random_ops(graph, rng, 25)
+                raise RuntimeError("abort")
+
+        assert _state(graph.G) == before
+        assert {n: sorted(graph.children(n)) for n in graph.G} == {n: sorted(c) for n, c in parents.items()}
+        if attrs_of_n1 is not None:
+            assert graph.G.nodes["n1"] is attrs_of_n1
+        assert graph.G.revisions.revision == revision + 1
+
+        # Commit some changes so later attempts start from a different graph
+        with graph.transaction():
+            _random_ops(graph, rng, 5)
+
+
+def test_committed_changes_share_one_revision():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.add_node("dir", type="directory")
+    revision = graph.G.revisions.revision
+
+    with graph.transaction():
+        graph.update_elements({"dir": {"name": "samples"}, "missing": {"name": "x"}})
+        with graph.transaction():
+            for i in range(5):
+                graph.G.add_node(f"a{i}", type="audio", parent="dir")
+        assert len(graph.children("dir")) == 5  # Lookups see the deferred index updates
+
+    assert graph.G.revisions.revision == revision + 1
+    changes = graph.changes_since(revision)
+    assert [e["data"]["id"] for e in changes["nodes"]] == ["a4", "a3", "a2", "a1", "a0", "dir"]
+    assert not graph.changes_since(revision + 1)["nodes"]
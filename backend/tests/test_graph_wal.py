@@ -0,0 +1,136 @@
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import networkx as nx
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+from param_graph.const import DICT_FILE, WAL_FILE
+
+
+def _graph_state(graph):
+    # The cytoscape snapshot adds 'id'/'value'/'name' to nodes and 'source'/'target' to edges
+    return (
+        {n: {k: v for k, v in d.items() if k not in ("id", "value", "name")} for n, d in graph.G.nodes(data=True)},
+        {(u, v): {k: val for k, val in d.items() if k not in ("source", "target")} for u, v, d in graph.G.edges(data=True)},
+    )
+
+
+def test_saves_append_to_the_log_and_replay_on_load():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "wal"
+        graph.G.add_node("a", type="audio", member_ids=[])
+        graph.G.add_node("b", type="audio")
+        graph.save()  # First save writes the snapshot
+        snapshot = (Path(tmpdir) / DICT_FILE).read_text()
+
+        graph.G.add_node("c", type="audio", parent="a")
+        graph.G.add_edge("a", "b", type="audio")
+        graph.G.nodes["a"]["member_ids"] = ["c"]
+        graph.save()
+        graph.G.edges["a", "b"]["source_label"] = "loud"
+        graph.G.remove_node("b")
+        graph.G.add_edge("c", "a", type="audio")
+        graph.update_element("c", {"name": "child"})
+        graph.save()
+
+        # Only the log grew; the snapshot was left untouched
+        assert (Path(tmpdir) / DICT_FILE).read_text() == snapshot
+        assert len((Path(tmpdir) / WAL_FILE).read_text().splitlines()) == 2
+
+        reloaded = ParameterGraph(tmpdir)
+        assert reloaded.load()
+        assert _graph_state(reloaded) == _graph_state(graph)
+        assert not reloaded.G.has_node("b")
+        assert reloaded.G.nodes["c"]["name"] == "child"
+        assert reloaded.G.nodes["a"]["member_ids"] == ["c"]
+
+        # Compaction folds the log into the snapshot
+        reloaded.save(compact=True)
+        assert (Path(tmpdir) / WAL_FILE).read_text() == ""
+        compacted = ParameterGraph(tmpdir)
+        compacted.load()
+        assert _graph_state(compacted) == _graph_state(graph)
+
+
+def test_torn_final_record_is_ignored():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "wal"
+        graph.G.add_node("a", type="audio")
+        graph.save()
+        graph.G.add_node("b", type="audio")
+        graph.save()
+        expected = _graph_state(graph)
+
+        # Simulate a crash halfway through writing the next record
+        with open(Path(tmpdir) / WAL_FILE, 'a') as f:
+            f.write(json.dumps({"seq": 99, "nodes": {"c": {}}})[:20])
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert _graph_state(reloaded) == expected
+
+        # Records already contained in the snapshot are not applied twice
+        data = json.loads((Path(tmpdir) / DICT_FILE).read_text())
+        data["wal_seq"] = reloaded.wal.seq
+        data["graph"] = nx.cytoscape.cytoscape_data(nx.DiGraph(), ident='id')
+        (Path(tmpdir) / DICT_FILE).write_text(json.dumps(data))
+        empty = ParameterGraph(tmpdir)
+        empty.load()
+        assert empty.G.number_of_nodes() == 0
+
+
+def test_saves_after_a_torn_record_survive_the_next_load():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "wal"
+        graph.G.add_node("a", type="audio")
+        graph.save()
+        graph.G.add_node("b", type="audio")
+        graph.save()
+
+        # Crash halfway through a record, then keep working on the recovered graph
+        wal_path = Path(tmpdir) / WAL_FILE
+        with open(wal_path, 'a') as f:
+            f.write(json.dumps({"seq": 99, "nodes": {"x": {}}})[:20])
+        recovered = ParameterGraph(tmpdir)
+        recovered.load()
+        assert sorted(recovered.G.nodes) == ["a", "b"]
+        recovered.G.add_node("c", type="audio")
+        recovered.save()
+        recovered.G.add_node("d", type="audio")
+        recovered.save()
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert sorted(reloaded.G.nodes) == ["a", "b", "c", "d"]
+        assert all(json.loads(line) for line in wal_path.read_text().splitlines())
+
+
+def test_record_missing_only_its_newline_is_kept():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "wal"
+        graph.G.add_node("a", type="audio")
+        graph.save()
+        graph.G.add_node("b", type="audio")
+        graph.save()
+        wal_path = Path(tmpdir) / WAL_FILE
+        wal_path.write_text(wal_path.read_text().rstrip("\n"))
+
+        recovered = ParameterGraph(tmpdir)
+        recovered.load()
+        recovered.G.add_node("c", type="audio")
+        recovered.save()
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        assert sorted(reloaded.G.nodes) == ["a", "b", "c"]
@@ -0,0 +1,212 @@
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# The engine needs diffracture, torchaudio and the Stable Audio stack
+grating_cache = pytest.importorskip("engine.grating_cache")
+local_engine = pytest.importorskip("engine.local_engine")
+
+from param_graph.elements.artifacts.grating_element import Grating
+from param_graph.elements.base_elements import Asset
+from utils.uid import XXH3_64
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Replaces Diffracture's grating loader with a stub that records every disk load."""
+    loads = []
+
+    class StubGrating:
+        def __init__(self):
+            self.nodes = {"fc": SimpleNamespace(metadata={"strength": 1.0})}
+            self.device = None
+
+        @classmethod
+        def load(cls, path):
+            loads.append(path)
+            return cls()
+
+        def to(self, device):
+            self.device = device
+
+    monkeypatch.setattr(grating_cache, "DiffractureGrating", StubGrating)
+    return loads
+
+
+class _Actant:
+    """Records activations instead of registering hooks."""
+    def __init__(self, model):
+        self.model = model
+        self.active = []
+        self.activations = 0
+
+    def activate(self, grating, injection_strategy, strength):
+        self.active.append((grating, strength))
+        self.activations += 1
+
+    def deactivate(self):
+        self.active = []
+
+
+def _grating(id):
+    return Grating(id=id, name=id, context={}, file=Asset(path=f"{id}.grating", uid=id), base_model_id="model")
+
+
+def _engine(keep_active=True):
+    # Skips __init__, which starts the job worker and loads the shared models
+    engine = local_engine.LocalEngine.__new__(local_engine.LocalEngine)
+    engine.grating_cache = grating_cache.GratingCache(capacity=2)
+    engine.keep_gratings_active = keep_active
+    engine.grating_injection_strategy = "hook"
+    return engine
+
+
+def test_grating_cache_hits_per_override_configuration(loads):
+    cache = grating_cache.GratingCache(capacity=2)
+    g1 = _grating("g1")
+
+    plain = cache.get(g1, None, "cpu")
+    assert cache.get(g1, [], "cpu") is plain
+    assert plain.device == "cpu" and len(loads) == 1
+
+    overrides = [{"address": "fc", "metadata": {"strength": 0.5}}]
+    overridden = cache.get(g1, overrides, "cpu")
+    assert overridden is not plain and overridden.nodes["fc"].metadata["strength"] == 0.5
+    assert cache.get(g1, [{"metadata": {"strength": 0.5}, "address": "fc"}], "cpu") is overridden
+    assert len(loads) == 2
+
+    # A third configuration evicts the least recently used one
+    cache.get(_grating("g2"), None, "cpu")
+    assert cache.get(g1, overrides, "cpu") is overridden
+    assert cache.get(g1, None, "cpu") is not plain
+    assert len(loads) == 4
+
+
+def test_matching_jobs_keep_the_gratings_active(loads, monkeypatch):
+    monkeypatch.setattr(local_engine, "Actant", _Actant)
+    engine = _engine()
+    adapter = SimpleNamespace(model=torch.nn.Linear(4, 4))
+    job = {
+        "grating_elements": [_grating("g1")],
+        "grating_strengths": [0.5],
+        "gratings": [{"id": "g1", "overrides": [{"address": "fc", "metadata": {"strength": 0.5}}]}],
+    }
+
+    engine._apply_gratings(adapter, None, dict(job))
+    engine._apply_gratings(adapter, None, dict(job))
+    assert adapter.actant.activations == 1 and len(loads) == 1
+
+    engine._apply_gratings(adapter, None, {**job, "grating_strengths": [0.8]})
+    assert adapter.actant.activations == 2 and [s for _, s in adapter.actant.active] == [0.8]
+
+    # A job without gratings runs on the base model
+    engine._apply_gratings(adapter, None, {})
+    assert adapter.actant.active == [] and adapter.active_grating_key is None
+
+
+@pytest.mark.parametrize("keep_active", [True, False])
+def test_release_gratings_only_deactivates_when_forced_or_disabled(keep_active):
+    engine = _engine(keep_active)
+    restored = []
+    adapter = SimpleNamespace(
+        actant=_Actant(None),
+        weight_merger=SimpleNamespace(restore=lambda: restored.append(True)),
+        active_grating_key=(("g1", "", 1.0),),
+    )
+    adapter.actant.active = ["grating"]
+
+    engine._release_gratings(adapter)
+    if keep_active:
+        assert adapter.active_grating_key is not None and adapter.actant.active == ["grating"]
+        engine._release_gratings(adapter, force=True)
+    assert adapter.active_grating_key is None and adapter.actant.active == [] and restored == [True]
+
+    # Nothing left to release
+    engine._release_gratings(adapter, force=True)
+    assert restored == [True]
+
+
+class _Collector:
+    """Collects forward outputs per address, like Diffracture's activation collector."""
+    def __init__(self, model):
+        self.model = model
+        self.collected_activations = {}
+        self.handles = []
+
+    def start_collecting(self, addresses):
+        for address in addresses:
+            self.handles.append(self.model.get_submodule(address).register_forward_hook(
+                lambda module, inputs, output, address=address: self.collected_activations.setdefault(address, []).append(output)
+            ))
+
+    def stop_collecting(self):
+        for handle in self.handles:
+            handle.remove()
+
+
+class _ProbeModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc1 = torch.nn.Linear(512, 4)
+        self.fc2 = torch.nn.Linear(4, 3)
+        self.forwards = 0
+
+    def forward(self, styles, truncation=1.0):
+        self.forwards += 1
+        return self.fc2(self.fc1(styles[0]))
+
+
+def _probe_engine(tmp_path, monkeypatch, adapter=None):
+    monkeypatch.setattr(local_engine, "FeatureClusteringPipeline", lambda model, strategy_name: SimpleNamespace(collector=_Collector(model)))
+    engine = _engine()
+    engine.data_root = tmp_path
+    engine.uid_generator = XXH3_64()
+    engine.shared_models = []
+    engine._get_adapter_class = lambda adapter_name: None
+    engine.model_cache = SimpleNamespace(get=lambda model_element, adapter_class: adapter)
+    return engine
+
+
+def test_activation_cache_key_is_stable_across_identical_configs(tmp_path, monkeypatch):
+    engine = _probe_engine(tmp_path, monkeypatch)
+    model = SimpleNamespace(id="m", adapter="stylegan2")
+    probe = engine._probe_config(model)
+
+    path = engine._activation_cache_path(model, "fc1", probe)
+    assert path == engine._activation_cache_path(model, "fc1", dict(reversed(list(probe.items()))))
+    assert path == _probe_engine(tmp_path, monkeypatch)._activation_cache_path(model, "fc1", engine._probe_config(model))
+    assert path.parent == tmp_path / "activations" / "m"
+
+    assert path != engine._activation_cache_path(model, "fc2", probe)
+    assert path != engine._activation_cache_path(model, "fc1", {**probe, "num_samples": 8})
+    assert engine._probe_config(SimpleNamespace(id="a", adapter="stable_audio_tools"))["probe"] == "generate"
+    assert engine._probe_config(SimpleNamespace(id="x", adapter="other")) is None
+
+
+def test_prefetch_captures_missing_layers_in_one_probe_pass(tmp_path, monkeypatch):
+    adapter = SimpleNamespace(model=_ProbeModel(), device="cpu")
+    engine = _probe_engine(tmp_path, monkeypatch, adapter)
+    model = SimpleNamespace(id="m", adapter="stylegan2")
+
+    asyncio.run(engine.prefetch_activations(model, ["fc1", "fc2", "fc1"]))
+    assert adapter.model.forwards == 16
+    probe = engine._probe_config(model)
+    captured = torch.load(engine._activation_cache_path(model, "fc2", probe), weights_only=True)
+    assert len(captured) == 16 and captured[0].shape == (1, 3)
+
+    # Cached layers don't run the probe again
+    asyncio.run(engine.prefetch_activations(model, ["fc2", "fc1"]))
+    assert adapter.model.forwards == 16
+
+    # Adapters without a probe capture nothing
+    asyncio.run(engine.prefetch_activations(SimpleNamespace(id="x", adapter="other"), ["fc1"]))
+    assert adapter.model.forwards == 16 and not (tmp_path / "activations" / "x").exists()
@@ -0,0 +1,129 @@
+import sys
+import shutil
+from types import SimpleNamespace
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+import torch
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from engine.model_adapters.base_adapter import slerp
+from engine.model_adapters.stylegan_adapter import StyleGANAdapter
+from param_graph.elements.base_elements import Asset
+from param_graph.elements.models.stylegan_element import StyleGANModel
+
+
+def _stylegan(compile_mode=None):
+    """A random-weight 8px generator: small enough to run on CPU in a test."""
+    adapter = StyleGANAdapter()
+    adapter.device = "cpu"
+    info = StyleGANModel(
+        id="tiny", name="tiny", checkpoint=Asset(path="", uid="tiny"),
+        config={"size": 8, "channel_multiplier": 1}, compile_mode=compile_mode, context={}
+    )
+    return adapter, info
+
+
+def test_slerp_keeps_endpoints_and_norm():
+    torch.manual_seed(0)
+    a, b = torch.randn(1, 16), torch.randn(1, 16)
+    a, b = a / a.norm(), b / b.norm()
+    path = slerp(a, b, torch.linspace(0, 1, 5))
+    assert path.shape == (5, 16)
+    assert torch.allclose(path[0], a[0], atol=1e-6) and torch.allclose(path[-1], b[0], atol=1e-6)
+    assert torch.allclose(path.norm(dim=-1), torch.ones(5), atol=1e-5)
+
+    # Colinear endpoints fall back to linear interpolation
+    assert torch.allclose(slerp(a, 2 * a, torch.tensor([0.5]))[0], 1.5 * a[0], atol=1e-6)
+
+
+def test_stylegan_interpolation_matches_single_generations_in_batches():
+    adapter, info = _stylegan()
+    adapter.load_model(info, verify=False)
+
+    frames = adapter.interpolate(seed_start=3, seed_end=5, num_frames=5, batch_size=2)
+    assert [artifact.context["frame_index"] for artifact, _ in frames] == list(range(5))
+
+    # Batching doesn't change the frames, and the endpoints are the seeds' own images
+    unbatched = adapter.interpolate(seed_start=3, seed_end=5, num_frames=5, batch_size=5)
+    for (_, img), (_, expected) in zip(frames, unbatched):
+        assert torch.allclose(img, expected, atol=1e-5)
+    (first_artifact, first), (last_artifact, last) = adapter.generate(seed=3), adapter.generate(seed=5)
+    for artifact in (first_artifact, last_artifact):
+        shutil.rmtree(Path(artifact.file.path).parent, ignore_errors=True)
+    assert torch.allclose(frames[0][1], first, atol=1e-4)
+    assert torch.allclose(frames[-1][1], last, atol=1e-4)
+
+
+def test_compile_model_is_opt_in_and_keeps_module_addresses(monkeypatch):
+    adapter, info = _stylegan()
+    module = torch.nn.Sequential(torch.nn.Linear(4, 4), torch.nn.ReLU())
+    addresses = [name for name, _ in module.named_modules()]
+    x = torch.randn(2, 4)
+    expected = module(x)
+
+    monkeypatch.delenv("MODEL_COMPILE_MODE", raising=False)
+    assert not adapter.compile_model(module, info)
+    monkeypatch.setenv("MODEL_COMPILE_MODE", "off")
+    assert not adapter.compile_model(module, replace(info, compile_mode="default"))
+
+    monkeypatch.delenv("MODEL_COMPILE_MODE")
+    assert adapter.compile_model(module, replace(info, compile_mode="default"))
+    assert [name for name, _ in module.named_modules()] == addresses
+    assert torch.allclose(module(x), expected)
+
+
+def test_load_model_warms_up_the_configured_batch_sizes(monkeypatch):
+    monkeypatch.setenv("COMPILE_WARMUP_BATCH_SIZES", "1,3")
+    adapter, info = _stylegan(compile_mode="default")
+    batch_sizes = []
+
+    def compile_model(module, info):
+        # Record the warm-up passes instead of compiling the whole generator
+        module.register_forward_pre_hook(lambda m, args: batch_sizes.append(args[0][0].shape[0]))
+        return True
+
+    monkeypatch.setattr(adapter, "compile_model", compile_model)
+    adapter.load_model(info, verify=False)
+    assert batch_sizes == [1, 3]
+
+    # Models that didn't opt in skip the warm-up
+    adapter, info = _stylegan()
+    adapter.load_model(info, verify=False)
+    assert batch_sizes == [1, 3]
+
+
+def test_stable_audio_interpolation_needs_an_inverted_start_latent(tmp_path, monkeypatch):
+    stable_audio_adapter = pytest.importorskip("engine.model_adapters.stable_audio_adapter")
+    adapter = stable_audio_adapter.StableAudioAdapter()
+    adapter.device = "cpu"
+    adapter.model_info = SimpleNamespace(config={"sample_rate": 8})
+    torch.manual_seed(0)
+    elements = []
+    for name in ("start", "end"):
+        path = tmp_path / f"{name}.pt"
+        torch.save(torch.randn(1, 2, 4), path)
+        elements.append(SimpleNamespace(id=name, file=SimpleNamespace(path=str(path)), context={}))
+
+    sampled = []
+    def sample(init_latent_tensor=None, inversion_meta=None, **kwargs):
+        sampled.append((init_latent_tensor, inversion_meta))
+        return init_latent_tensor.reshape(init_latent_tensor.shape[0], 1, -1)
+    monkeypatch.setattr(adapter, "_sample", sample)
+
+    start, end = elements
+    with pytest.raises(ValueError, match="inversion_metadata"):
+        adapter.interpolate(init_latent_element=start, end_latent_element=end, num_frames=3)
+    assert not sampled
+
+    start.context = {"inversion_metadata": {"inversion_steps": 10}}
+    frames = adapter.interpolate(init_latent_element=start, end_latent_element=end, num_frames=3, batch_size=2)
+    assert len(frames) == 3 and [meta for _, meta in sampled] == [{"inversion_steps": 10}] * 2
+    latents = torch.cat([latent for latent, _ in sampled])
+    assert torch.allclose(latents[0], torch.load(tmp_path / "start.pt")[0])
+    assert not torch.equal(frames[0][1], frames[1][1])
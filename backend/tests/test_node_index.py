@@ -0,0 +1,117 @@
+import sys
+import random
+import tempfile
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+from param_graph.node_index import INDEXED_FIELDS
+
+
+def _assert_consistent(graph):
+    """The maintained indexes must equal the ones a full scan would build."""
+    expected = {field: {} for field in INDEXED_FIELDS}
+    for n, attrs in graph.G.nodes(data=True):
+        for field in INDEXED_FIELDS:
+            if isinstance(attrs.get(field), str):
+                expected[field].setdefault(attrs[field], set()).add(n)
+    actual = {field: {value: set(ids) for value, ids in graph.G.index.maps[field].items()} for field in INDEXED_FIELDS}
+    assert actual == expected
+    assert set(graph.G.index.values) == set(graph.G.nodes)
+
+
+def test_index_follows_every_kind_of_mutation():
+    rng = random.Random(0)
+    graph = ParameterGraph(tempfile.gettempdir())
+    types = ["audio", "image", "batch", "directory"]
+
+    for step in range(2000):
+        nodes = list(graph.G.nodes)
+        op = rng.randrange(9)
+        if op <= 1 or not nodes:
+            n = f"n{step}"
+            graph.G.add_node(n, type=rng.choice(types), name=f"name{rng.randrange(20)}",
+                             parent=rng.choice(nodes) if nodes and rng.random() < 0.7 else None)
+        elif op == 2:
+            graph.G.nodes[rng.choice(nodes)]["parent"] = rng.choice(nodes + [None])
+        elif op == 3:
+            graph.update_element(rng.choice(nodes), {"name": f"name{rng.randrange(20)}", "type": rng.choice(types)})
+        elif op == 4:
+            graph.G.nodes[rng.choice(nodes)].pop("name", None)
+        elif op == 5:
+            attrs = graph.G.nodes[rng.choice(nodes)]
+            attrs.clear()
+            attrs.update(type=rng.choice(types))
+        elif op == 6:
+            graph.G.remove_node(rng.choice(nodes))
+        elif op == 7:
+            graph.remove_element(rng.choice(nodes))
+        else:
+            graph.G.add_nodes_from([(rng.choice(nodes), {"type": rng.choice(types), "name": 3})])
+        _assert_consistent(graph)
+
+    graph.G.clear()
+    _assert_consistent(graph)
+
+
+def test_stale_attribute_dict_does_not_reindex_removed_node():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.add_node("a", type="audio", parent="root")
+    stale = graph.G.nodes["a"]
+    graph.G.remove_node("a")
+    stale["type"] = "image"
+    assert graph.find_nodes(type="image") == []
+    assert graph.children("root") == []
+    _assert_consistent(graph)
+
+
+def test_lookups_and_recursive_remove():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir)
+        graph.project_name = "index"
+        graph.G.add_node("dir", type="directory", name="samples")
+        graph.G.add_node("a", type="audio", name="kick", parent="dir")
+        graph.G.add_node("b", type="audio", name="kick", parent="a")
+        graph.G.add_node("c", type="image", name="cover")
+        graph.save()
+
+        reloaded = ParameterGraph(tmpdir)
+        reloaded.load()
+        _assert_consistent(reloaded)
+        assert reloaded.find_nodes(type="audio") == ["a", "b"]
+        assert reloaded.find_nodes(name="kick", parent="a") == ["b"]
+        assert reloaded.children("dir") == ["a"]
+
+        reloaded.remove_element("dir")
+        assert list(reloaded.G.nodes) == ["c"]
+        assert reloaded.find_nodes(name="kick") == []
+        _assert_consistent(reloaded)
+
+
+def test_remove_many_roots_cleans_up_batch_members():
+    graph = ParameterGraph(tempfile.gettempdir())
+    graph.G.add_node("batch", type="batch", member_ids=["a", "b", "c"])
+    for n in "abc":
+        graph.G.add_node(n, type="audio", parent="batch")
+    graph.G.add_node("dir", type="directory")
+    graph.G.add_node("sub", type="directory", parent="dir")
+    graph.G.add_node("x", type="audio", parent="sub")
+
+    assert graph.remove_elements(["a", "dir", "missing", "c"]) == ["batch"]
+    assert list(graph.G.nodes) == ["batch", "b"]
+    assert graph.G.nodes["batch"]["member_ids"] == ["b"]
+    _assert_consistent(graph)
+
+    # A child that isn't listed as a member leaves the batch as it is
+    graph.G.add_node("note", type="text", parent="batch")
+    assert graph.remove_element("note") == []
+    assert graph.G.nodes["batch"]["member_ids"] == ["b"]
+
+    # keep_children detaches the members instead of removing them
+    assert graph.remove_element("batch", keep_children=True) == []
+    assert list(graph.G.nodes) == ["b"] and graph.G.nodes["b"]["parent"] is None
+    _assert_consistent(graph)
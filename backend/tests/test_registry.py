@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+import param_graph.elements  # noqa: F401
+from param_graph import registry
+from param_graph.elements.base_elements import Asset
+from param_graph.elements.models.stable_audio_element import StableAudioModel
+
+
+def test_nested_and_optional_assets_are_resolved_from_a_cached_schema():
+    attrs = {
+        "id": "m", "type": "model", "adapter": "stable_audio_tools", "name": "m", "context": {},
+        "checkpoint": {"path": "a.ckpt", "uid": "a"},
+        "encoder": {"path": "e.ckpt", "uid": "e"},
+        "config": {"sample_rate": 44100},
+        "unknown_attribute": 1,
+    }
+    model = registry.resolve_element(attrs)
+    assert isinstance(model, StableAudioModel)
+    assert model.checkpoint == Asset(path="a.ckpt", uid="a")
+    assert model.encoder == Asset(path="e.ckpt", uid="e")   # Asset | None
+    assert model.config == {"sample_rate": 44100}
+    assert StableAudioModel in registry._SCHEMAS
+
+    # A dict that doesn't fit the nested class is passed through unchanged
+    attrs["encoder"] = {"not": "an asset"}
+    assert registry.resolve_element(attrs).encoder == {"not": "an asset"}
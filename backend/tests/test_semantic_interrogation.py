@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+import torch
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from utils.semantic_interrogation import SemanticInterrogator
+
+
+def test_batched_interrogation_matches_single_queries():
+    torch.manual_seed(0)
+    interrogator = SemanticInterrogator(device="cpu")
+    interrogator.load_label_bank([f"label_{i}" for i in range(50)], torch.randn(50, 32) * 3)
+
+    queries = torch.randn(20, 32)
+    batched = interrogator.interrogate_batch(queries, k=3, chunk_size=7)
+    for query, result in zip(queries, batched):
+        single = interrogator.interrogate(query, k=3)
+        assert [label for label, _ in result] == [label for label, _ in single]
+        for (_, a), (_, b) in zip(result, single):
+            assert abs(a - b) < 1e-5
+
+
+def test_pair_cache_is_used_and_reset_with_the_bank():
+    interrogator = SemanticInterrogator(device="cpu")
+    interrogator.load_label_bank(["up", "down"], torch.tensor([[1.0, 0.0], [-1.0, 0.0]]))
+
+    first = interrogator.interrogate_batch(torch.tensor([[1.0, 0.1]]), k=1, keys=[("a", "b")])
+    # A cached pair returns its stored labels without recomputing
+    cached = interrogator.interrogate_batch(torch.tensor([[-1.0, 0.1]]), k=1, keys=[("a", "b")])
+    assert first[0][0][0] == cached[0][0][0] == "up"
+
+    interrogator.add_to_bank(["left"], torch.tensor([[0.0, -1.0]]))
+    assert not interrogator.cache
+    fresh = interrogator.interrogate_batch(torch.tensor([[-1.0, 0.1]]), k=1, keys=[("a", "b")])
+    assert fresh[0][0][0] == "down"
+
+
+def test_label_bank_builds_incrementally_and_loads_lazily():
+    import tempfile
+    import numpy as np
+    from utils.semantic_interrogation import LabelBank
+
+    torch.manual_seed(0)
+    vectors = {label: torch.randn(16) for label in ["rise", "fall", "brighten", "darken"]}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bank = LabelBank(tmpdir, model="clap")
+        first = ["rise", "fall", "brighten"]
+        assert bank.missing(first) == first
+        bank.add_shard(first, torch.stack([vectors[l] for l in first]))
+        bank.set_labels(first)
+        bank.save()
+
+        # Only the new label needs embedding; a removed label is simply dropped from the order
+        bank = LabelBank(tmpdir, model="clap")
+        second = ["darken", "rise", "brighten"]
+        assert bank.missing(second) == ["darken"]
+        bank.add_shard(["darken"], vectors["darken"].unsqueeze(0))
+        bank.set_labels(second)
+        bank.save()
+        assert len(bank.manifest["shards"]) == 2
+
+        matrix = np.asarray(bank.matrix(), dtype=np.float32)
+        assert matrix.shape == (3, 16)
+        for row, label in zip(matrix, second):
+            expected = (vectors[label] / vectors[label].norm()).numpy()
+            np.testing.assert_allclose(row, expected, atol=1e-3)
+
+        interrogator = SemanticInterrogator(device="cpu")
+        interrogator.load_bank_from_disk(tmpdir)
+        assert interrogator.labels == second
+        assert interrogator.embeddings_norm is None
+        assert interrogator.interrogate(vectors["darken"], k=1)[0][0] == "darken"
+
+        bank.compact()
+        reopened = LabelBank(tmpdir)
+        assert len(reopened.manifest["shards"]) == 1
+        assert isinstance(reopened.matrix(), np.memmap)
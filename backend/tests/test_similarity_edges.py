@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# The app imports the engine, which needs diffracture and the Stable Audio stack
+app = pytest.importorskip("app")
+
+from param_graph.graph import ParameterGraph
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    graph = ParameterGraph(tmp_path)
+    monkeypatch.setattr(app, "param_graph", graph)
+    monkeypatch.setattr(app, "similarity_state", {})
+    rng = np.random.default_rng(0)
+    for i in range(30):
+        _add_audio(graph, f"a{i}", rng)
+    _update()
+    return graph
+
+
+def _add_audio(graph, node_id, rng):
+    graph.G.add_node(node_id, type="audio", name=node_id)
+    graph.set_embedding(node_id, "clap", rng.standard_normal(16).astype(np.float32))
+
+
+def _update(full_rebuild=False):
+    app.update_similarity_edges("audio", "clap", None, False, full_rebuild=full_rebuild)
+
+
+def _springs(graph):
+    return {
+        (u, v, d["spring_type"]): round(d["weight"], 5)
+        for u, v, d in graph.G.edges(data=True) if d.get("type") == "spring"
+    }
+
+
+def _assert_matches_full_rebuild(graph):
+    incremental = _springs(graph)
+    _update(full_rebuild=True)
+    assert incremental == _springs(graph)
+
+
+def test_adding_one_node_matches_a_full_rebuild(graph):
+    _add_audio(graph, "new", np.random.default_rng(1))
+    _update()
+    assert app.similarity_state[(str(graph.root), "audio")]["updates"] == 1
+    assert any(v == "new" for _, v, _ in _springs(graph))
+    _assert_matches_full_rebuild(graph)
+
+
+def test_removing_one_node_matches_a_full_rebuild(graph):
+    # Remove the node most others point at, so several neighbour lists are left short
+    pointed_at = [v for _, v, kind in _springs(graph) if kind == "near"]
+    removed = max(set(pointed_at), key=pointed_at.count)
+    graph.remove_element(removed)
+    assert graph.similarity_orphans["audio"]
+
+    _update()
+    assert app.similarity_state[(str(graph.root), "audio")]["updates"] == 1
+    assert not graph.similarity_orphans.get("audio")
+    _assert_matches_full_rebuild(graph)
+
+
+def test_rebuild_skips_nodes_removed_while_it_queries(graph, monkeypatch):
+    query = app._similarity_springs
+
+    def remove_during_query(*args):
+        springs = query(*args)
+        graph.remove_element("a0")
+        return springs
+
+    monkeypatch.setattr(app, "_similarity_springs", remove_during_query)
+    _update(full_rebuild=True)
+    springs = _springs(graph)
+    assert not any("a0" in (u, v) for u, v, _ in springs)
+
+    # The nodes that lost their spring to a0 are completed by the next update
+    monkeypatch.setattr(app, "_similarity_springs", query)
+    _update()
+    _assert_matches_full_rebuild(graph)
@@ -0,0 +1,131 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from utils.similarity_index import SimilarityIndex
+
+
+def _exact(vectors, k, far=False):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = unit @ unit.T
+    np.fill_diagonal(sims, np.inf if far else -np.inf)
+    order = np.argsort(sims if far else -sims, axis=1)[:, :k]
+    return order
+
+
+def test_near_and_far_queries_match_exact_search():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    ids = [f"n{i}" for i in range(len(vectors))]
+
+    index = SimilarityIndex(16, backend="ivf")
+    index.upsert(ids, vectors)
+
+    near_ids, near_sims = index.query(vectors, k=5, exclude_self=ids)
+    far_ids, far_sims = index.query(vectors, k=3, far=True, exclude_self=ids)
+
+    expected_near = _exact(vectors, 5)
+    expected_far = _exact(vectors, 3, far=True)
+    for i in range(len(vectors)):
+        assert near_ids[i] == [ids[j] for j in expected_near[i]]
+        assert far_ids[i] == [ids[j] for j in expected_far[i]]
+        assert near_sims[i][0] >= near_sims[i][-1]
+        assert far_sims[i][0] <= far_sims[i][-1]
+
+
+def test_sync_is_incremental_and_persists():
+    rng = np.random.default_rng(1)
+    vectors = {f"n{i}": rng.standard_normal(8).astype(np.float32) for i in range(10)}
+    fetched = []
+
+    def fetch(changed):
+        fetched.extend(changed)
+        return np.stack([vectors[i] for i in changed])
+
+    index = SimilarityIndex(8, backend="ivf")
+    changed, removed = index.sync(list(vectors), list(vectors), fetch)
+    assert len(changed) == 10 and removed == []
+
+    # Only new or re-keyed nodes are fetched; missing nodes are dropped
+    fetched.clear()
+    vectors["n10"] = rng.standard_normal(8).astype(np.float32)
+    del vectors["n0"]
+    versions = [("v2" if i == "n1" else i) for i in vectors]
+    changed, removed = index.sync(list(vectors), versions, fetch)
+    assert sorted(changed) == ["n1", "n10"] and removed == ["n0"]
+    assert sorted(fetched) == ["n1", "n10"]
+    assert len(index) == 10
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "clap.index"
+        index.save(path)
+        reloaded = SimilarityIndex.load(path)
+        query = vectors["n10"]
+        assert reloaded.query(query, k=3) == index.query(query, k=3)
+        assert "n0" not in reloaded.query(query, k=10)[0][0]
+
+
+def _index(backend, dim):
+    if backend == "hnsw":
+        pytest.importorskip("hnswlib")
+    return SimilarityIndex(dim, backend=backend)
+
+
+@pytest.mark.parametrize("backend", ["ivf", "hnsw"])
+def test_removed_labels_are_reused(backend):
+    rng = np.random.default_rng(2)
+    vectors = {f"n{i}": rng.standard_normal(8).astype(np.float32) for i in range(50)}
+    index = _index(backend, 8)
+    index.upsert(list(vectors), np.stack(list(vectors.values())))
+
+    # Churn: replace a fifth of the entries over and over
+    for step in range(20):
+        gone = list(vectors)[:10]
+        index.remove(gone)
+        for node_id in gone:
+            del vectors[node_id]
+        new = {f"s{step}_{i}": rng.standard_normal(8).astype(np.float32) for i in range(10)}
+        vectors.update(new)
+        index.upsert(list(new), np.stack(list(new.values())))
+
+    assert len(index) == 50 and len(index.ids) == 50 and not index.free_labels
+    if backend == "hnsw":
+        assert index.hnsw.get_max_elements() == 1024
+
+    ids = list(vectors)
+    matrix = np.stack(list(vectors.values()))
+    near_ids, _ = index.query(matrix, k=5, exclude_self=ids)
+    expected = _exact(matrix, 5)
+    assert all(near_ids[i] == [ids[j] for j in expected[i]] for i in range(len(ids)))
+
+
+@pytest.mark.parametrize("backend", ["ivf", "hnsw"])
+def test_save_compacts_mostly_removed_indexes(backend, tmp_path):
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((40, 8)).astype(np.float32)
+    ids = [f"n{i}" for i in range(len(vectors))]
+    index = _index(backend, 8)
+    index.upsert(ids, vectors, versions=ids)
+    index.remove(ids[:30])
+
+    path = tmp_path / "clap.index"
+    index.save(path)
+    reloaded = SimilarityIndex.load(path)
+    assert reloaded.ids == ids[30:] and not reloaded.free_labels
+    assert reloaded.versions == {i: i for i in ids[30:]}
+    for query in vectors[[0, 35]]:
+        assert reloaded.query(query, k=4) == index.query(query, k=4)
+        assert sorted(reloaded.query(query, k=20)[0][0]) == sorted(ids[30:])
+
+    # A few removals are kept as free labels rather than compacted
+    reloaded.remove(ids[30:32])
+    reloaded.save(path)
+    assert SimilarityIndex.load(path).free_labels == [0, 1]
@@ -0,0 +1,67 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+from param_graph.graph import ParameterGraph
+from param_graph.const import DB_FILE, DICT_FILE
+from scripts.migrate_graph_to_sqlite import migrate
+
+
+def _state(graph):
+    return (
+        {n: dict(d) for n, d in graph.G.nodes(data=True)},
+        {(u, v): dict(d) for u, v, d in graph.G.edges(data=True)},
+    )
+
+
+def test_sqlite_storage_roundtrip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir, storage="sqlite")
+        graph.project_name = "db"
+        graph.G.add_node("batch", type="batch", name="Batch", member_ids=["a"])
+        graph.G.add_node("a", type="audio", parent="batch", name="kick")
+        graph.G.add_node("b", type="audio", parent="batch", name="snare")
+        graph.G.add_edge("a", "b", type="audio", source_label="brighter")
+        graph.save()
+
+        graph.G.nodes["b"]["name"] = "clap"
+        graph.G.remove_node("a")
+        graph.G.add_edge("b", "batch", type="audio")
+        graph.save()
+
+        # The project is opened as SQLite without being told
+        reloaded = ParameterGraph(tmpdir)
+        assert reloaded.storage == "sqlite"
+        assert reloaded.load()
+        assert reloaded.project_name == "db"
+        assert _state(reloaded) == _state(graph)
+        assert reloaded.find_nodes(type="audio", parent="batch") == ["b"]
+        assert reloaded.find_nodes(name="clap") == ["b"]
+
+
+def test_migrate_json_project():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = ParameterGraph(tmpdir, storage="json")
+        graph.project_name = "legacy"
+        graph.G.add_node("a", type="audio")
+        graph.G.add_node("b", type="audio")
+        graph.save()
+        graph.G.add_edge("a", "b", type="audio")
+        graph.save()  # Only in the write-ahead log
+
+        assert migrate(Path(tmpdir), remove_json=True)
+        assert (Path(tmpdir) / DB_FILE).exists()
+        assert not (Path(tmpdir) / DICT_FILE).exists()
+
+        reloaded = ParameterGraph(tmpdir)
+        assert reloaded.load()
+        assert reloaded.storage == "sqlite"
+        assert reloaded.project_name == "legacy"
+        assert reloaded.G.has_edge("a", "b")
+        assert reloaded.G.number_of_nodes() == 2
+
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import torch
+from torch import nn
+
+# Add backend directory to sys.path
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+weight_merge = pytest.importorskip("engine.weight_merge")
+
+
+def _model():
+    torch.manual_seed(0)
+    return nn.Sequential(nn.Conv2d(3, 4, 3), nn.Flatten(), nn.Linear(4 * 6 * 6, 5))
+
+
+def _grating(*elements):
+    return SimpleNamespace(_nodes=[
+        SimpleNamespace(address=address, kernel_type=kernel_type, metadata=metadata)
+        for address, kernel_type, metadata in elements
+    ])
+
+
+def _hook(channels, gain, strength):
+    """What the forward hook computes: the kernel output blended with the activation by strength."""
+    def hook(module, inputs, output):
+        bent = output.clone()
+        bent[:, channels] = output[:, channels] * gain
+        return output + strength * (bent - output)
+    return hook
+
+
+def test_merged_weights_match_the_hooks_and_restore_exactly():
+    model = _model()
+    x = torch.randn(2, 3, 8, 8)
+    originals = {name: param.detach().clone() for name, param in model.named_parameters()}
+    strength = 0.7
+
+    handles = [
+        model[0].register_forward_hook(_hook([0, 2], 1.7, strength)),
+        model[2].register_forward_hook(_hook([1, 4], -1.0, strength)),
+    ]
+    with torch.no_grad():
+        expected = model(x)
+    for handle in handles:
+        handle.remove()
+
+    merger = weight_merge.WeightMerger(model)
+    merges, remaining = merger.plan(_grating(
+        ("0", "scalar-multiply", {"indices": [0], "cluster": 1, "multiplier": 1.7,
+                                  "cluster_map": [{"feature_index": 2, "cluster_index": 1}]}),
+        ("2", "invert", {"indices": [1, 4]}),
+    ), strength)
+    assert remaining is None and len(merges) == 2
+    merger.apply(merges)
+    with torch.no_grad():
+        assert torch.allclose(model(x), expected, atol=1e-5)
+
+    merger.restore()
+    for name, param in model.named_parameters():
+        assert torch.equal(param, originals[name])
+
+
+def test_scalar_multiply_reads_factor_or_multiplier_and_rejects_other_keys():
+    merger = weight_merge.WeightMerger(_model())
+    for key in ("factor", "multiplier"):
+        merges, _ = merger.plan(_grating(("2", "scalar-multiply", {"indices": [0], key: 3.0})), 1.0)
+        assert merges == [("2", [0], 3.0)]
+
+    with pytest.raises(ValueError, match="scalar-multiply"):
+        merger.plan(_grating(("2", "scalar-multiply", {"indices": [0], "gain": 3.0})), 1.0)
@@ -0,0 +1,125 @@
+"""
+Debounced, coalescing scheduler for embedding updates.
+"""
+import os
+import threading
+import time
+import traceback
+from typing import Callable
+
+
+class EmbeddingUpdateScheduler:
+    """
+    Runs embedding update passes on a single resident worker thread.
+
+    Triggers are cheap: request() only bumps a sequence number and wakes the worker, which waits
+    until no new trigger arrived for debounce_seconds and then runs ONE pass covering every trigger
+    received so far. A force flag on any coalesced trigger applies to the whole pass. Callers that
+    need the result can wait() on the ticket returned by request().
+
+    Passes are low priority: while should_defer() returns True (e.g. generation jobs are in
+    flight) a pass is postponed, for at most max_defer_seconds.
+    """
+    def __init__(self, run_pass: Callable[[bool], None], debounce_seconds: float = None,
+                 should_defer: Callable[[], bool] = None, max_defer_seconds: float = None):
+        self.run_pass = run_pass
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else float(os.environ.get("EMBEDDING_UPDATE_DEBOUNCE", 2.0))
+        self.should_defer = should_defer
+        self.max_defer_seconds = max_defer_seconds if max_defer_seconds is not None else float(os.environ.get("EMBEDDING_MAX_DEFER", 30.0))
+
+        self._cond = threading.Condition()
+        self._worker = None
+        self._requested = 0          # Sequence number of the latest trigger
+        self._completed = 0          # Highest trigger covered by a finished pass
+        self._pending_force = False
+        self._immediate = False
+        self._last_request_time = 0.0
+        self._running = False
+
+        self.runs = 0
+        self.last_run = None
+
+    def request(self, force: bool = False, immediate: bool = False) -> int:
+        """Queues an update and returns a ticket for wait(). immediate skips the debounce window."""
+        with self._cond:
+            self._requested += 1
+            self._pending_force = self._pending_force or force
+            self._immediate = self._immediate or immediate
+            self._last_request_time = time.monotonic()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, name="embedding-updates", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+            return self._requested
+
+    def wait(self, ticket: int, timeout: float = None) -> bool:
+        """Blocks until a pass covering the given ticket finished. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._completed >= ticket, timeout=timeout)
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "backlog": self._requested - self._completed,
+                "running": self._running,
+                "pending_force": self._pending_force,
+                "debounce_seconds": self.debounce_seconds,
+                "runs": self.runs,
+                "last_run": self.last_run,
+            }
+
+    def _deferring(self) -> bool:
+        try:
+            return bool(self.should_defer())
+        except Exception:
+            return False
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._requested > self._completed)
+
+                # Debounce: wait until the burst of triggers has settled
+                while not self._immediate:
+                    remaining = self._last_request_time + self.debounce_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(timeout=remaining)
+
+                # Yield to foreground work, re-checking once a second
+                deferred_until = time.monotonic() + self.max_defer_seconds
+                while not self._immediate and self.should_defer is not None and time.monotonic() < deferred_until:
+                    if not self._deferring():
+                        break
+                    self._cond.wait(timeout=min(1.0, deferred_until - time.monotonic()))
+
+                ticket = self._requested
+                coalesced = ticket - self._completed
+                force = self._pending_force
+                self._pending_force = False
+                self._immediate = False
+                self._running = True
+
+            started_at = time.time()
+            start = time.perf_counter()
+            error = None
+            try:
+                self.run_pass(force)
+            except Exception as e:
+                error = str(e)
+                print(f"Embedding update pass failed: {e}")
+                traceback.print_exc()
+            duration = time.perf_counter() - start
+
+            with self._cond:
+                self._running = False
+                self._completed = ticket
+                self.runs += 1
+                self.last_run = {
+                    "started_at": started_at,
+                    "duration_seconds": round(duration, 3),
+                    "coalesced_triggers": coalesced,
+                    "force": force,
+                    "error": error,
+                }
+                self._cond.notify_all()
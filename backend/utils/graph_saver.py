@@ -0,0 +1,138 @@
+"""
+Debounced background saving of parameter graphs.
+"""
+import os
+import threading
+import time
+import traceback
+
+
+class GraphSaver:
+    """
+    Persists graphs on a single background thread instead of inside every request.
+
+    request() only marks a graph dirty. The worker waits until no save was requested for
+    debounce_seconds (but never longer than max_delay_seconds after the first pending
+    request), then takes the graph lock just long enough to capture the changes with
+    ParameterGraph.prepare_save() and does the disk writes after releasing it.
+
+    flush() writes everything pending in the calling thread and waits for writes in
+    progress; call it before switching projects and on shutdown.
+    """
+    def __init__(self, lock, debounce_seconds: float = None, max_delay_seconds: float = None):
+        self.lock = lock
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else float(os.environ.get("GRAPH_SAVE_DEBOUNCE", 1.0))
+        self.max_delay_seconds = max_delay_seconds if max_delay_seconds is not None else float(os.environ.get("GRAPH_SAVE_MAX_DELAY", 10.0))
+
+        self._cond = threading.Condition()
+        self._worker = None
+        self._pending = {}          # id(graph) -> graph, in request order
+        self._first_request_time = 0.0
+        self._last_request_time = 0.0
+        self._in_flight = 0
+
+        self.saves = 0
+        self.last_save = None
+
+    def request(self, graph):
+        """Marks a graph as needing a save. Cheap enough to call while holding the graph lock."""
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_request_time = now
+            self._pending[id(graph)] = graph
+            self._last_request_time = now
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, name="graph-saver", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+
+    def flush(self, holding_lock: bool = False):
+        """
+        Saves every pending graph now and waits until no save is being written. Pass
+        holding_lock=True when the caller already holds the graph lock.
+        """
+        with self._cond:
+            graphs = list(self._pending.values())
+            self._pending.clear()
+            self._in_flight += 1
+        try:
+            for graph in graphs:
+                if holding_lock:
+                    write = graph.prepare_save()
+                else:
+                    with self.lock:
+                        write = graph.prepare_save()
+                if write is not None:
+                    write()
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+        # The worker only holds prepared writes here, which don't need the graph lock
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight == 0)
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "writing": self._in_flight > 0,
+                "saves": self.saves,
+                "last_save": self.last_save,
+            }
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._pending))
+
+                # Debounce: wait until the burst of requests has settled, within the delay cap
+                while self._pending:
+                    now = time.monotonic()
+                    deadline = min(self._last_request_time + self.debounce_seconds,
+                                   self._first_request_time + self.max_delay_seconds)
+                    if now >= deadline:
+                        break
+                    self._cond.wait(timeout=deadline - now)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            writes = []
+            error = None
+            with self.lock:
+                with self._cond:
+                    graphs = list(self._pending.values())
+                    self._pending.clear()
+                    if not graphs:
+                        continue  # A flush() got there first
+                    self._in_flight += 1
+                for graph in graphs:
+                    try:
+                        write = graph.prepare_save()
+                        if write is not None:
+                            writes.append(write)
+                    except Exception as e:
+                        error = str(e)
+                        print(f"Preparing graph save failed: {e}")
+                        traceback.print_exc()
+
+            for write in writes:
+                try:
+                    write()
+                except Exception as e:
+                    error = str(e)
+                    print(f"Graph save failed: {e}")
+                    traceback.print_exc()
+
+            with self._cond:
+                self._in_flight -= 1
+                self.saves += 1
+                self.last_save = {
+                    "started_at": started_at,
+                    "duration_seconds": round(time.perf_counter() - start, 3),
+                    "graphs": len(graphs),
+                    "error": error,
+                }
+                self._cond.notify_all()
@@ -4,19 +4,151 @@ Maps latent vectors to semantic labels using CLAP embeddings.
 """
 
 import os
+import json
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
 import torch
 import torch.nn.functional as F
-from typing import List, Tuple, Optional
+from typing import Hashable, List, Tuple, Optional
+
+from utils.uid import XXH3_64
+
+
+class LabelBank:
+    """
+    A label bank stored as a directory of memory-mappable shards:
+
+        manifest.json      {"dim", "dtype", "model", "labels": [...], "hashes": [...],
+                            "shards": [{"file": "shard-0000.npy", "hashes": [...]}]}
+        shard-0000.npy     L2-normalised (rows, dim) float16 matrix
+
+    Every label is keyed by the hash of its text, so rebuilding after editing the label list
+    only embeds the labels whose hash isn't in any shard yet and appends them as a new shard.
+    The manifest's label order defines the bank; rows of removed labels stay in their shard
+    until compact() is called.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path, model: str = None, dtype: str = "float16"):
+        self.path = Path(path)
+        self.uid_generator = XXH3_64()
+        manifest_path = self.path / self.MANIFEST
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"dim": None, "dtype": dtype, "model": model, "labels": [], "hashes": [], "shards": []}
+
+        if model and self.manifest.get("model") not in (None, model):
+            print(f"Label bank {self.path} was built with {self.manifest['model']}. Rebuilding for {model}.")
+            self.manifest = {"dim": None, "dtype": dtype, "model": model, "labels": [], "hashes": [], "shards": []}
+        self.manifest["model"] = self.manifest.get("model") or model
+
+    @property
+    def labels(self) -> List[str]:
+        return self.manifest["labels"]
+
+    def hash(self, label: str) -> str:
+        return self.uid_generator.from_string(label)
+
+    def _locations(self) -> dict:
+        """Maps label hash -> (shard index, row)."""
+        locations = {}
+        for shard_index, shard in enumerate(self.manifest["shards"]):
+            for row, label_hash in enumerate(shard["hashes"]):
+                locations[label_hash] = (shard_index, row)
+        return locations
+
+    def missing(self, labels: List[str]) -> List[str]:
+        """Returns the labels (deduplicated, in order) that have no embedding in any shard yet."""
+        locations = self._locations()
+        seen = set()
+        missing = []
+        for label in labels:
+            label_hash = self.hash(label)
+            if label_hash not in locations and label_hash not in seen:
+                seen.add(label_hash)
+                missing.append(label)
+        return missing
+
+    def add_shard(self, labels: List[str], embeddings: torch.Tensor):
+        """Writes the embeddings of new labels as a normalised shard."""
+        if not labels:
+            return
+        matrix = F.normalize(torch.as_tensor(embeddings).float(), p=2, dim=-1).cpu().numpy()
+        if self.manifest["dim"] is None:
+            self.manifest["dim"] = int(matrix.shape[1])
+        elif self.manifest["dim"] != matrix.shape[1]:
+            raise ValueError(f"Embedding dimension mismatch: bank has {self.manifest['dim']}, got {matrix.shape[1]}.")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        file_name = f"shard-{len(self.manifest['shards']):04d}.npy"
+        tmp_path = self.path / (file_name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix.astype(self.manifest["dtype"]))
+        os.replace(tmp_path, self.path / file_name)
+        self.manifest["shards"].append({"file": file_name, "hashes": [self.hash(label) for label in labels]})
+
+    def set_labels(self, labels: List[str]):
+        """Sets the label order of the bank. Every label must already be embedded."""
+        hashes = [self.hash(label) for label in labels]
+        locations = self._locations()
+        missing = [label for label, h in zip(labels, hashes) if h not in locations]
+        if missing:
+            raise ValueError(f"{len(missing)} label(s) have no embedding in the bank, e.g. '{missing[0]}'.")
+        self.manifest["labels"] = list(labels)
+        self.manifest["hashes"] = hashes
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path / (self.MANIFEST + ".tmp")
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.path / self.MANIFEST)
+
+    def matrix(self) -> np.ndarray:
+        """Returns the (num_labels, dim) matrix in label order, read through memory-mapped shards."""
+        if not self.manifest["labels"]:
+            return np.zeros((0, self.manifest["dim"] or 0), dtype=self.manifest["dtype"])
+        shards = [np.load(self.path / shard["file"], mmap_mode='r') for shard in self.manifest["shards"]]
+        locations = self._locations()
+        rows = [locations[h] for h in self.manifest["hashes"]]
+
+        # A single fully used shard in order can be returned as the memory map itself
+        if len(shards) == 1 and [r for _, r in rows] == list(range(shards[0].shape[0])):
+            return shards[0]
+        return np.stack([shards[shard_index][row] for shard_index, row in rows])
+
+    def compact(self):
+        """Rewrites the bank as a single shard holding only the current labels."""
+        matrix = np.array(self.matrix())
+        for shard in self.manifest["shards"]:
+            (self.path / shard["file"]).unlink(missing_ok=True)
+        self.manifest["shards"] = []
+        self.add_shard(self.labels, torch.from_numpy(matrix.astype(np.float32)))
+        self.save()
 
 class SemanticInterrogator:
     """
     Utility for mapping vectors to semantic text labels.
     Uses CLAP embeddings for unified audio-text similarity.
     """
-    def __init__(self, device: str = "cuda" if torch.cuda.is_available() else "cpu"):
+    def __init__(self, device: str = "cuda" if torch.cuda.is_available() else "cpu", cache_size: int = None):
         self.device = device
         self.labels: List[str] = []
         self.embeddings: Optional[torch.Tensor] = None
+        # Unit-norm copy of the bank so queries don't renormalise it on every call
+        self.embeddings_norm: Optional[torch.Tensor] = None
+        # Sharded bank directory whose matrix is only read on first use
+        self._lazy_bank: Optional[LabelBank] = None
+        # LRU cache of results per caller-supplied key (e.g. a node pair)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size if cache_size is not None else int(os.environ.get("LABEL_CACHE_SIZE", 100000))
+
+    def _bank_changed(self):
+        self.embeddings_norm = F.normalize(self.embeddings.float(), p=2, dim=-1)
+        self.cache.clear()
 
     def load_label_bank(self, labels: List[str], embeddings: torch.Tensor):
         """
@@ -28,9 +160,12 @@ class SemanticInterrogator:
         if embeddings.dim() == 1:
             embeddings = embeddings.unsqueeze(0)
         self.embeddings = embeddings.to(self.device)
+        self._lazy_bank = None
+        self._bank_changed()
 
     def add_to_bank(self, labels: List[str], embeddings: torch.Tensor):
         """Appends new labels and embeddings to the existing bank."""
+        self._ensure_bank()
         if embeddings.dim() == 1:
             embeddings = embeddings.unsqueeze(0)
         embeddings = embeddings.to(self.device)
@@ -41,9 +176,11 @@ class SemanticInterrogator:
         else:
             self.labels.extend(labels)
             self.embeddings = torch.cat([self.embeddings, embeddings], dim=0)
+        self._bank_changed()
 
     def save_bank(self, filepath: str):
         """Saves the label bank to disk for fast loading."""
+        self._ensure_bank()
         if self.embeddings is None:
             raise ValueError("No embeddings to save.")
         
@@ -56,10 +193,31 @@ class SemanticInterrogator:
         }, filepath)
 
     def load_bank_from_disk(self, filepath: str):
-        """Loads a saved label bank from disk."""
+        """
+        Loads a saved label bank from disk. A LabelBank directory is opened lazily: only
+        its manifest is read here, and the memory-mapped matrix on the first query.
+        """
+        if os.path.isdir(filepath):
+            self._lazy_bank = LabelBank(filepath)
+            self.labels = list(self._lazy_bank.labels)
+            self.embeddings = None
+            self.embeddings_norm = None
+            self.cache.clear()
+            return
+
         data = torch.load(filepath, map_location=self.device)
         self.labels = data["labels"]
         self.embeddings = data["embeddings"].to(self.device)
+        self._lazy_bank = None
+        self._bank_changed()
+
+    def _ensure_bank(self):
+        if self.embeddings_norm is None and self._lazy_bank is not None:
+            # Shards are stored normalised, so they skip the renormalisation
+            matrix = torch.from_numpy(np.asarray(self._lazy_bank.matrix(), dtype=np.float32))
+            self.embeddings = matrix.to(self.device)
+            self.embeddings_norm = self.embeddings
+            self._lazy_bank = None
 
     def interrogate(self, query: torch.Tensor, k: int = 3) -> List[Tuple[str, float]]:
         """
@@ -73,29 +231,51 @@ class SemanticInterrogator:
         Returns:
             List of tuples: [(label_name, similarity_score), ...]
         """
-        if self.embeddings is None:
+        return self.interrogate_batch(query.reshape(1, -1), k=k)[0]
+
+    def interrogate_batch(self, queries: torch.Tensor, k: int = 3, keys: Optional[List[Hashable]] = None,
+                          chunk_size: int = 8192) -> List[List[Tuple[str, float]]]:
+        """
+        Finds the top K labels for every row of a (num_queries, embed_dim) matrix with one
+        matmul + topk per chunk against the pre-normalised bank.
+
+        If keys are given (one per query, e.g. a (source, target) pair), results are cached
+        under (key, k) and only uncached queries are computed. The cache is cleared whenever
+        the bank changes.
+
+        Returns:
+            One [(label_name, similarity_score), ...] list per query.
+        """
+        self._ensure_bank()
+        if self.embeddings_norm is None:
             raise ValueError("Label bank is empty. Load embeddings first.")
-            
-        # Ensure query is on the correct device
-        query = query.to(self.device)
-        
-        # Ensure 2D shape (1, D)
-        if query.dim() == 1:
-            query = query.unsqueeze(0)
-            
-        # Normalize vectors for cosine similarity
-        query_norm = F.normalize(query, p=2, dim=-1)
-        labels_norm = F.normalize(self.embeddings, p=2, dim=-1)
-        
-        # Compute cosine similarities via dot product
-        # Shape: (1, num_labels)
-        similarities = torch.mm(query_norm, labels_norm.t()).squeeze(0)
-        
-        # Get top K indices and values
-        top_k_values, top_k_indices = torch.topk(similarities, k=min(k, len(self.labels)))
-        
-        results = []
-        for val, idx in zip(top_k_values, top_k_indices):
-            results.append((self.labels[idx.item()], val.item()))
-            
-        return results
\ No newline at end of file
+
+        queries = torch.as_tensor(queries)
+        if queries.dim() == 1:
+            queries = queries.unsqueeze(0)
+
+        k = min(k, len(self.labels))
+        results: List[Optional[List[Tuple[str, float]]]] = [None] * queries.shape[0]
+        if keys is not None:
+            for i, key in enumerate(keys):
+                cached = self.cache.get((key, k))
+                if cached is not None:
+                    self.cache.move_to_end((key, k))
+                    results[i] = cached
+        pending = [i for i, r in enumerate(results) if r is None]
+
+        for start in range(0, len(pending), chunk_size):
+            rows = pending[start:start + chunk_size]
+            # Normalize vectors for cosine similarity, shape: (chunk, num_labels)
+            query_norm = F.normalize(queries[rows].to(self.device, torch.float32), p=2, dim=-1)
+            similarities = query_norm @ self.embeddings_norm.t()
+            top_k_values, top_k_indices = torch.topk(similarities, k=k, dim=-1)
+
+            for i, values, indices in zip(rows, top_k_values.tolist(), top_k_indices.tolist()):
+                results[i] = [(self.labels[idx], val) for val, idx in zip(values, indices)]
+                if keys is not None and self.cache_size > 0:
+                    self.cache[(keys[i], k)] = results[i]
+                    if len(self.cache) > self.cache_size:
+                        self.cache.popitem(last=False)
+
+        return results
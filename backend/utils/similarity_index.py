@@ -0,0 +1,314 @@
+"""
+Persistent approximate nearest-neighbour index over L2-normalised embeddings.
+Answers both near queries (most similar) and far queries (least similar) without
+materialising an N x N distance matrix: on the unit sphere the least similar
+vectors to q are exactly the most similar vectors to -q.
+"""
+import os
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1e-10, norms)
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity index keyed by node ID with incremental insert/update/remove.
+    Uses HNSW (hnswlib) when installed; otherwise an IVF index (k-means coarse
+    quantiser with exact re-scoring of the probed lists), which is searched exactly
+    while the set is still small. Select explicitly with SIMILARITY_INDEX_BACKEND=hnsw|ivf.
+    """
+    def __init__(self, dim: int, backend: str = None):
+        self.dim = dim
+        self.backend = backend or os.environ.get("SIMILARITY_INDEX_BACKEND") or ("hnsw" if hnswlib else "ivf")
+        if self.backend == "hnsw" and hnswlib is None:
+            print("hnswlib is not installed. Falling back to the IVF similarity index.")
+            self.backend = "ivf"
+
+        self.ids = []            # label -> node ID (None once removed)
+        self.labels = {}         # node ID -> label
+        self.free_labels = []    # labels of removed entries, reused by the next inserts
+        self.versions = {}       # node ID -> content key the stored vector belongs to
+        self.dirty = False
+        # Queries may run outside the graph lock while a save compacts the index
+        self._lock = threading.RLock()
+
+        # IVF state
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+        self.nprobe = int(os.environ.get("SIMILARITY_INDEX_NPROBE", 8))
+        self.exact_threshold = int(os.environ.get("SIMILARITY_INDEX_EXACT_THRESHOLD", 20000))
+
+        # HNSW state
+        self.hnsw = None
+        if self.backend == "hnsw":
+            self._init_hnsw(1024)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    # --- HNSW helpers ---
+    def _init_hnsw(self, capacity: int):
+        self.hnsw = hnswlib.Index(space='cosine', dim=self.dim)
+        self.hnsw.init_index(max_elements=capacity, ef_construction=200, M=16, allow_replace_deleted=True)
+        self.hnsw.set_ef(64)
+
+    def _compact(self):
+        """Renumbers the live entries 0..n-1, dropping the removed labels for good."""
+        live = np.array([label for label, node_id in enumerate(self.ids) if node_id is not None], dtype=np.int64)
+        if self.backend == "hnsw":
+            vectors = np.asarray(self.hnsw.get_items(live), dtype=np.float32) if len(live) else np.zeros((0, self.dim), dtype=np.float32)
+            self._init_hnsw(max(1024, len(live)))
+            if len(live):
+                self.hnsw.add_items(vectors, np.arange(len(live)))
+        else:
+            self.vectors = self.vectors[live]
+            self.assignments = self.assignments[live]
+        self.ids = [self.ids[label] for label in live]
+        self.labels = {node_id: label for label, node_id in enumerate(self.ids)}
+        self.free_labels = []
+
+    # --- IVF helpers ---
+    def _train_ivf(self):
+        from sklearn.cluster import MiniBatchKMeans
+
+        live = np.array([i for i, node_id in enumerate(self.ids) if node_id is not None], dtype=np.int64)
+        n_lists = max(1, int(np.sqrt(len(live))))
+        sample = live if len(live) <= 50000 else np.random.default_rng(0).choice(live, 50000, replace=False)
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=3, random_state=0, batch_size=4096)
+        kmeans.fit(self.vectors[sample])
+        self.centroids = _normalize(kmeans.cluster_centers_)
+        self.assignments = np.argmax(self.vectors @ self.centroids.T, axis=1).astype(np.int32)
+        self.trained_size = len(live)
+
+    def _ivf_candidates(self, query: np.ndarray) -> np.ndarray:
+        probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+        candidates = np.flatnonzero(np.isin(self.assignments, probe))
+        return candidates[[self.ids[c] is not None for c in candidates]] if len(candidates) else candidates
+
+    # --- Public API ---
+    def upsert(self, ids: list[str], vectors, versions: list[str] = None):
+        """Inserts new vectors or replaces the vectors of existing IDs."""
+        with self._lock:
+            if not ids:
+                return
+            vectors = _normalize(vectors)
+            versions = versions or [None] * len(ids)
+
+            appended = []
+            for node_id, vector, version in zip(ids, vectors, versions):
+                label = self.labels.get(node_id)
+                if label is None and not self.free_labels:
+                    label = len(self.ids)
+                    self.ids.append(node_id)
+                    self.labels[node_id] = label
+                    appended.append(vector)
+                else:
+                    if label is None:
+                        # Take over the slot of a removed entry so the index doesn't keep growing
+                        label = self.free_labels.pop()
+                        self.ids[label] = node_id
+                        self.labels[node_id] = label
+                    if self.backend == "ivf":
+                        self.vectors[label] = vector
+                        if self.centroids is not None:
+                            self.assignments[label] = int(np.argmax(self.centroids @ vector))
+                self.versions[node_id] = version
+
+            if appended and self.backend == "ivf":
+                appended = np.stack(appended)
+                self.vectors = np.vstack([self.vectors, appended])
+                clusters = np.argmax(appended @ self.centroids.T, axis=1) if self.centroids is not None else np.zeros(len(appended))
+                self.assignments = np.concatenate([self.assignments, clusters.astype(np.int32)])
+
+            if self.backend == "hnsw":
+                labels = np.array([self.labels[i] for i in ids], dtype=np.int64)
+                needed = int(labels.max()) + 1
+                if needed > self.hnsw.get_max_elements():
+                    self.hnsw.resize_index(max(needed, 2 * self.hnsw.get_max_elements()))
+                for label in labels:
+                    try:
+                        self.hnsw.unmark_deleted(int(label))
+                    except RuntimeError:
+                        pass
+                self.hnsw.add_items(vectors, labels)
+            self.dirty = True
+
+    def remove(self, ids: list[str]):
+        with self._lock:
+            for node_id in ids:
+                label = self.labels.pop(node_id, None)
+                if label is None:
+                    continue
+                self.ids[label] = None
+                self.free_labels.append(label)
+                self.versions.pop(node_id, None)
+                if self.backend == "hnsw":
+                    self.hnsw.mark_deleted(label)
+            self.dirty = True
+
+    def invalidate(self, ids: list[str]):
+        """Marks the vectors of the given IDs as stale so the next sync() re-fetches them."""
+        for node_id in ids:
+            self.versions.pop(node_id, None)
+
+    def sync(self, ids: list[str], versions: list[str], fetch):
+        """
+        Brings the index in line with the given snapshot: removes IDs that are gone and
+        inserts IDs that are new or whose content version changed. fetch(ids) must return
+        the vectors of the given IDs and is only called for those. Returns (changed, removed):
+        the IDs that were added or updated and the IDs that were dropped.
+        """
+        current = set(ids)
+        gone = [i for i in self.labels if i not in current]
+        if gone:
+            self.remove(gone)
+        changed = [(i, v) for i, v in zip(ids, versions) if i not in self.labels or self.versions.get(i) != v]
+        if changed:
+            changed_ids = [i for i, _ in changed]
+            self.upsert(changed_ids, fetch(changed_ids), [v for _, v in changed])
+        return [i for i, _ in changed], gone
+
+    def query(self, vectors, k: int, far: bool = False, exclude_self: list[str] = None):
+        """
+        Returns (ids, similarities) lists for each query vector: the k most similar
+        entries, or the k least similar ones if far=True. Entries whose ID matches the
+        query's own ID in exclude_self are skipped.
+        """
+        with self._lock:
+            queries = _normalize(vectors)
+            search = -queries if far else queries
+            live = len(self.labels)
+            k_search = min(live, k + (1 if exclude_self else 0))
+            results_ids, results_sims = [], []
+            if k_search == 0:
+                return [[] for _ in queries], [[] for _ in queries]
+
+            if self.backend == "hnsw":
+                labels, distances = self.hnsw.knn_query(search, k=k_search)
+                # hnswlib returns cosine distances to the searched vector
+                neighbour_lists = [(row_labels, 1.0 - row_dist) for row_labels, row_dist in zip(labels, distances)]
+            else:
+                if self.centroids is not None and live > 4 * self.trained_size:
+                    self._train_ivf()
+                elif self.centroids is None and live > self.exact_threshold:
+                    self._train_ivf()
+
+                neighbour_lists = []
+                if self.centroids is None:
+                    # Exact search in blocks so memory stays O(block x N)
+                    live_labels = np.array([i for i, node_id in enumerate(self.ids) if node_id is not None], dtype=np.int64)
+                    live_vectors = self.vectors[live_labels]
+                    for start in range(0, len(search), 1024):
+                        sims = search[start:start + 1024] @ live_vectors.T
+                        top = np.argpartition(-sims, k_search - 1, axis=1)[:, :k_search] if k_search < sims.shape[1] else np.tile(np.arange(sims.shape[1]), (sims.shape[0], 1))
+                        for row, cols in zip(sims, top):
+                            order = cols[np.argsort(-row[cols])]
+                            neighbour_lists.append((live_labels[order], row[order]))
+                else:
+                    for q in search:
+                        candidates = self._ivf_candidates(q)
+                        sims = self.vectors[candidates] @ q
+                        order = np.argsort(-sims)[:k_search]
+                        neighbour_lists.append((candidates[order], sims[order]))
+
+            for n, (labels, sims) in enumerate(neighbour_lists):
+                ids, out_sims = [], []
+                for label, sim in zip(labels, sims):
+                    node_id = self.ids[int(label)] if int(label) < len(self.ids) else None
+                    if node_id is None or (exclude_self and node_id == exclude_self[n]):
+                        continue
+                    ids.append(node_id)
+                    # Report the similarity to the original query, not to its negation
+                    out_sims.append(float(-sim if far else sim))
+                    if len(ids) == k:
+                        break
+                results_ids.append(ids)
+                results_sims.append(out_sims)
+            return results_ids, results_sims
+
+    # --- Persistence ---
+    def save(self, path):
+        """
+        Writes the index next to a JSON manifest ('<path>.json'). Compacts it first if
+        more than half of its labels belong to removed entries.
+        """
+        with self._lock:
+            path = Path(path)
+            if len(self.free_labels) > len(self.labels):
+                self._compact()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            manifest = {
+                "dim": self.dim,
+                "backend": self.backend,
+                "ids": self.ids,
+                "versions": self.versions,
+                "trained_size": self.trained_size,
+            }
+            if self.backend == "hnsw":
+                tmp_index = path.with_name(path.name + ".tmp")
+                self.hnsw.save_index(str(tmp_index))
+                os.replace(tmp_index, path)
+            else:
+                tmp_index = path.with_name(path.name + ".tmp.npz")
+                arrays = {"vectors": self.vectors, "assignments": self.assignments}
+                if self.centroids is not None:
+                    arrays["centroids"] = self.centroids
+                np.savez(tmp_index, **arrays)
+                os.replace(tmp_index, path)
+
+            tmp_manifest = path.with_name(path.name + ".json.tmp")
+            with open(tmp_manifest, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_manifest, path.with_name(path.name + ".json"))
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Loads an index saved with save(), or returns None if it's missing or unreadable."""
+        path = Path(path)
+        manifest_path = path.with_name(path.name + ".json")
+        if not path.exists() or not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest["backend"] == "hnsw" and hnswlib is None:
+                return None
+
+            index = cls(manifest["dim"], backend=manifest["backend"])
+            index.ids = manifest["ids"]
+            index.labels = {node_id: label for label, node_id in enumerate(index.ids) if node_id is not None}
+            index.free_labels = [label for label, node_id in enumerate(index.ids) if node_id is None]
+            index.versions = manifest["versions"]
+            index.trained_size = manifest.get("trained_size", 0)
+
+            if index.backend == "hnsw":
+                index.hnsw = hnswlib.Index(space='cosine', dim=index.dim)
+                index.hnsw.load_index(str(path), allow_replace_deleted=True)
+                index.hnsw.set_ef(64)
+            else:
+                with np.load(path) as arrays:
+                    index.vectors = arrays["vectors"]
+                    index.assignments = arrays["assignments"]
+                    index.centroids = arrays["centroids"] if "centroids" in arrays else None
+            return index
+        except Exception as e:
+            print(f"Could not load similarity index from {path}: {e}. It will be rebuilt.")
+            return None
@@ -61,7 +61,9 @@ class XXH3_64(UIDGenerator):
     
     def from_string(self, data: str) -> str:
         """Generates a hex string UID using XXH3."""
-        h = xxhash.xxh3_64
+        # xxhash >= 4 only accepts bytes; older versions hashed str as UTF-8
+        if isinstance(data, str):
+            data = data.encode("utf-8")
         return f"{xxhash.xxh3_64_hexdigest(data)}{self.DELIMITER}{self.get_method_name()}"
     
     def from_tensor(self, tensor: Tensor) -> str: